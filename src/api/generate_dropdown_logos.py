@@ -1,6 +1,22 @@
 import os
-from PIL import Image, ImageChops
-from src.generator.wallpaper_base import asset_path, load_small_logo
+import json
+import math
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageChops, features
+from src.generator.wallpaper_base import asset_path, load_small_logo, expand_to_frame
+
+
+MAX_SIZE = 32  # perfect UI size
+
+# Bump when the icon recipe changes so every icon is rebuilt
+# (2: icons come from the trimmed logo pyramid)
+BUILD_VERSION = 2
+
+MANIFEST_FILE = "manifest.json"
+SPRITE_IMAGE = "sprite.png"
+SPRITE_WEBP = "sprite.webp"
+SPRITE_MAP = "sprite.json"
 
 
 # ------------------------------------------------------------
@@ -47,36 +63,143 @@ def add_1px_stroke(img, stroke_color=(255, 255, 255)):
     return result
 
 
+# ------------------------------------------------------------
+# INCREMENTAL BUILD HELPERS
+# ------------------------------------------------------------
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return f"{BUILD_VERSION}:{h.hexdigest()}"
+
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def build_icon(job):
+    """Worker: render one dropdown icon. Returns (file, error)."""
+    input_path, output_path = job
+    try:
+        img = expand_to_frame(load_small_logo(input_path, max_size=MAX_SIZE))
+        img = add_1px_stroke(img)  # pixel-perfect 1px outline
+        img.save(output_path)
+        return os.path.basename(input_path), None
+
+    except Exception as e:
+        return os.path.basename(input_path), str(e)
+
+
+# ------------------------------------------------------------
+# SPRITE SHEET
+# ------------------------------------------------------------
+def build_sprite_sheet(out_dir, files):
+    """
+    Packs every dropdown icon into one sheet on a fixed MAX_SIZE grid
+    and writes a JSON map of {file: [x, y, w, h]} next to it.
+    """
+    files = sorted(files)
+    cols = max(1, math.ceil(math.sqrt(len(files))))
+    rows = max(1, math.ceil(len(files) / cols))
+
+    sheet = Image.new("RGBA", (cols * MAX_SIZE, rows * MAX_SIZE), (0, 0, 0, 0))
+    icons = {}
+
+    for i, file in enumerate(files):
+        with Image.open(os.path.join(out_dir, file)) as icon:
+            icon = icon.convert("RGBA")
+            x = (i % cols) * MAX_SIZE
+            y = (i // cols) * MAX_SIZE
+            sheet.paste(icon, (x, y))
+            icons[file] = [x, y, icon.width, icon.height]
+
+    sheet_path = os.path.join(out_dir, SPRITE_IMAGE)
+    sheet.save(sheet_path, optimize=True)
+
+    with open(sheet_path, "rb") as f:
+        version = hashlib.sha1(f.read()).hexdigest()[:12]
+
+    # Smaller lossless WebP copy for browsers that accept it
+    webp = None
+    if features.check("webp"):
+        webp = SPRITE_WEBP
+        sheet.save(os.path.join(out_dir, webp), lossless=True, method=6)
+
+    sprite_map = {
+        "image": SPRITE_IMAGE,
+        "webp": webp,
+        "version": version,
+        "width": sheet.width,
+        "height": sheet.height,
+        "icons": icons,
+    }
+    with open(os.path.join(out_dir, SPRITE_MAP), "w", encoding="utf-8") as f:
+        json.dump(sprite_map, f, separators=(",", ":"), sort_keys=True)
+
+    return sheet_path
+
+
 # ------------------------------------------------------------
 # GENERATE DROPDOWN ICONS
 # ------------------------------------------------------------
-def generate_dropdown_logos():
+def generate_dropdown_logos(workers=None, force=False):
     logos_dir = asset_path("data/logos")
     out_dir = asset_path("data/logos_dropdown")
 
     os.makedirs(out_dir, exist_ok=True)
 
-    max_size = 32  # perfect UI size
-
     print(f"Generating dropdown logos from: {logos_dir}")
     print(f"Saving stroked logos to: {out_dir}\n")
 
-    for file in os.listdir(logos_dir):
+    manifest = {} if force else load_manifest(out_dir)
+    hashes = {}
+    jobs = []
+
+    for file in sorted(os.listdir(logos_dir)):
         if not file.lower().endswith(".png"):
             continue
 
         input_path = os.path.join(logos_dir, file)
         output_path = os.path.join(out_dir, file)
 
-        try:
-            img = load_small_logo(input_path, max_size=max_size)
-            img = add_1px_stroke(img)  # pixel-perfect 1px outline
-            img.save(output_path)
+        hashes[file] = file_hash(input_path)
+
+        # Skip logos whose source is unchanged since the last build
+        if manifest.get(file) == hashes[file] and os.path.exists(output_path):
+            continue
+
+        jobs.append((input_path, output_path))
+
+    print(f"{len(jobs)} changed, {len(hashes) - len(jobs)} up to date")
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for file, error in pool.map(build_icon, jobs, chunksize=16):
+                if error:
+                    print("[ERROR]", file, error)
+                    hashes.pop(file, None)
+                else:
+                    print("[OK]", file)
 
-            print("[OK]", file)
+    # Logos that no longer exist fall out of the manifest
+    save_manifest(out_dir, hashes)
 
-        except Exception as e:
-            print("[ERROR]", file, e)
+    built = [f for f in hashes if os.path.exists(os.path.join(out_dir, f))]
+    sheet_path = build_sprite_sheet(out_dir, built)
+    print("Sprite sheet:", sheet_path)
 
     print("\n✔ Done generating dropdown icons!")
 
@@ -0,0 +1,437 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tarfile
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from src.generator.wallpaper_base import (
+    add_logo_stroke,
+    asset_path,
+    create_diamond_gradient,
+    create_fade_gradient,
+    create_linear_gradient,
+    create_mirror_gradient,
+    create_noise_gradient,
+    create_radial_gradient,
+    create_split_gradient,
+    expand_to_frame,
+    generate_perlin_noise,
+    load_logo,
+    load_small_logo,
+)
+from src.generator.buffers import buffer_pool
+from src.generator.logo_assets import PROJECT_ROOT, STROKE_USES
+from src.generator.render import background_args, encode_png, normalize_spec, render_wallpaper
+
+
+# ---------------------------------------------------------
+#  SETTINGS
+# ---------------------------------------------------------
+# python -m src.generator.benchmark                    # run, compare
+# python -m src.generator.benchmark --save-baseline --update-golden
+# python -m src.generator.benchmark --only gradient/ render/pc
+#
+# Every case is timed after a warm-up run (so logo/font caches are
+# warm, as they are in a running server) and compared against the
+# saved baseline; a median slower than baseline * (1 + threshold) is
+# a regression. Cases that produce an image are also compared pixel
+# by pixel against the golden copy, so an optimized path can be shown
+# to draw the same thing. Either failing makes the exit status 1.
+#
+# Goldens should come from the original, unoptimized renderer, not from
+# the code under test. Draw them from the "baseline" commit with
+#
+#   python -m src.generator.benchmark --golden-from 7034125
+#
+# which exports that revision to a temp dir and renders every case with
+# its per-pixel code (about a minute), then compare with
+#
+#   python -m src.generator.benchmark --tolerance 1 \
+#       --only gradient/ noise/ stroke/1400 stroke/1800 stroke/2100 stroke/2800
+#
+# Gradients and noise match to within one step (float32 color math
+# can round a channel differently from the original float64), as do
+# hero strokes. Grid-size logos (the small strokes and the full
+# renders) are read through the trimmed mip pyramid, which resamples
+# from the nearest level above rather than the source (see
+# logo_assets), so they show edge differences against these goldens
+# by design. --update-golden instead snapshots the current renderer,
+# to catch later drift in every case rather than prove equivalence.
+
+OUT_DIR = asset_path("benchmarks")
+BASELINE_PATH = os.path.join(OUT_DIR, "baseline.json")
+GOLDEN_DIR = os.path.join(OUT_DIR, "golden")
+BASELINE_VERSION = 1
+
+# The commit whose renderer draws the reference goldens
+GOLDEN_REF = "7034125"
+
+REPEAT = 5
+THRESHOLD = 0.15
+
+# Gradients are drawn at the PC size
+SIZE = (2560, 1440)
+COLOR1, COLOR2 = (158, 27, 50), (255, 255, 255)
+ANGLE = 30
+
+# Noise is random; every run reseeds so the output is repeatable
+SEED = 1234
+
+LOGO = "data/logos/Alabama.png"
+TEAM = "Alabama"
+
+# Render cases name their colors, so they draw the same thing whatever
+# the team-color lookup returns
+TEAM_COLOR1, TEAM_COLOR2 = "9E1B32", "FFFFFF"
+
+GRADIENTS = (
+    ("linear", create_linear_gradient, (COLOR1, COLOR2, ANGLE)),
+    ("radial", create_radial_gradient, (COLOR1, COLOR2)),
+    ("diamond", create_diamond_gradient, (COLOR1, COLOR2)),
+    ("fade", create_fade_gradient, (COLOR1,)),
+    ("split", create_split_gradient, (COLOR1, COLOR2, ANGLE)),
+    ("mirror", create_mirror_gradient, (COLOR1, COLOR2, ANGLE)),
+    ("noise", create_noise_gradient, (COLOR1, COLOR2)),
+)
+
+
+# ---------------------------------------------------------
+#  CASES
+# ---------------------------------------------------------
+# A case is (name, setup). setup() does the untimed preparation and
+# returns (run, release): run() is the timed call and returns the
+# image to check (or None), release(result) hands buffers back.
+
+def _pooled(img, device=None):
+    buffer_pool.release(img, device)
+
+
+def _keep(_):
+    pass
+
+
+def _gradient(make, *args):
+    def run():
+        np.random.seed(SEED)
+        return make(*SIZE, *args)
+
+    def setup():
+        return run, _pooled
+    return setup
+
+
+def _noise():
+    def run():
+        np.random.seed(SEED)
+        noise = generate_perlin_noise(*SIZE)
+        return Image.fromarray((noise * 255).astype(np.uint8))
+    return run, _keep
+
+
+def _stroke(size, stroke):
+    def setup():
+        # Hero sizes are capped widths, the rest fit a square
+        logo = load_logo(LOGO, size) if _is_hero(size) else load_small_logo(LOGO, size)
+        return (lambda: add_logo_stroke(logo, stroke_size=stroke)), _keep
+    return setup
+
+
+def _is_hero(size):
+    return size >= 1000
+
+
+SPECS = {
+    "solid": {"color": TEAM_COLOR1},
+    "gradient": {"gradient_enabled": 1, "style": "linear", "angle": ANGLE,
+                 "color1": TEAM_COLOR1, "color2": TEAM_COLOR2},
+    "stickerbomb": {"stickerbomb": 1},
+}
+
+RENDER_DEVICES = ("pc", "mobile")
+
+
+def _render(device, mode):
+    def setup():
+        spec = normalize_spec(TEAM, device, **SPECS[mode])
+        return (lambda: render_wallpaper(spec)), (lambda img: _pooled(img, device))
+    return setup
+
+
+def _encode(device):
+    def setup():
+        img = render_wallpaper(normalize_spec(TEAM, device))
+
+        def run():
+            encode_png(img)  # bytes vary with zlib; time only
+
+        return run, _keep
+    return setup
+
+
+def build_cases():
+    cases = [(f"gradient/{style}", _gradient(make, *args)) for style, make, args in GRADIENTS]
+    cases += [("noise/perlin", _noise)]
+    cases += [(f"stroke/{size}x{stroke}", _stroke(size, stroke)) for size, stroke in STROKE_USES]
+    cases += [
+        (f"render/{device}/{mode}", _render(device, mode))
+        for device in RENDER_DEVICES
+        for mode in SPECS
+    ]
+    cases += [(f"encode/{device}", _encode(device)) for device in RENDER_DEVICES]
+    return cases
+
+
+def golden_recipes():
+    """
+    {case name: recipe} for the cases benchmark_baseline.py can draw
+    with the original renderer (see golden_from_ref).
+    """
+    recipes = {
+        f"gradient/{style}": {"kind": "gradient", "style": style, "args": args}
+        for style, _, args in GRADIENTS
+    }
+    recipes["noise/perlin"] = {"kind": "noise"}
+
+    for size, stroke in STROKE_USES:
+        recipes[f"stroke/{size}x{stroke}"] = {
+            "kind": "stroke", "logo": LOGO, "size": size, "stroke": stroke, "hero": _is_hero(size),
+        }
+
+    for device in RENDER_DEVICES:
+        for mode in SPECS:
+            spec = normalize_spec(TEAM, device, **SPECS[mode])
+            if spec["mode"] == "stickerbomb":
+                continue  # needs art the repo doesn't ship
+            recipes[f"render/{device}/{mode}"] = {
+                "kind": "render",
+                "device": device,
+                "team": TEAM,
+                "logo": LOGO,
+                "schedule": f"data/schedules/{TEAM.replace(' ', '_')}.json",
+                "kwargs": background_args(spec),
+            }
+    return recipes
+
+
+# ---------------------------------------------------------
+#  GOLDEN IMAGES
+# ---------------------------------------------------------
+
+def golden_path(golden_dir, name):
+    return os.path.join(golden_dir, name.replace("/", "__") + ".png")
+
+
+def compare_golden(img, path, tolerance=0):
+    """"match", "missing", or a description of how far off `img` is."""
+    if not os.path.exists(path):
+        return "missing"
+
+    golden = Image.open(path)
+    if golden.size != img.size or golden.mode != img.mode:
+        return f"DIFF size/mode {img.size} {img.mode} vs {golden.size} {golden.mode}"
+
+    diff = np.abs(np.asarray(img, np.int16) - np.asarray(golden, np.int16))
+    if diff.ndim == 3:
+        diff = diff.max(axis=2)
+    worst = int(diff.max())
+    if worst <= tolerance:
+        return "match"
+    return f"DIFF {int((diff > tolerance).sum())} px, max {worst}"
+
+
+def golden_from_ref(ref=GOLDEN_REF, golden_dir=GOLDEN_DIR, only=None):
+    """
+    Draws the goldens with the renderer at git revision `ref`: exports
+    it to a temp dir and runs benchmark_baseline.py there, in a separate
+    interpreter so none of this checkout's modules are involved.
+    Returns the number of goldens written.
+    """
+    recipes = {
+        name: recipe for name, recipe in golden_recipes().items()
+        if not only or any(name.startswith(prefix) for prefix in only)
+    }
+    golden_dir = os.path.abspath(golden_dir)
+    for name, recipe in recipes.items():
+        recipe["out"] = golden_path(golden_dir, name)
+
+    archive = subprocess.run(
+        ["git", "-C", PROJECT_ROOT, "archive", "--format=tar", ref],
+        check=True, capture_output=True,
+    ).stdout
+
+    with tempfile.TemporaryDirectory() as tree:
+        with tarfile.open(fileobj=BytesIO(archive)) as tar:
+            tar.extractall(tree)
+
+        drawer = os.path.join(tree, "src", "generator", "benchmark_baseline.py")
+        shutil.copyfile(os.path.join(os.path.dirname(__file__), "benchmark_baseline.py"), drawer)
+
+        payload = os.path.join(tree, "golden_payload.json")
+        with open(payload, "w", encoding="utf-8") as f:
+            json.dump({"size": SIZE, "seed": SEED, "cases": recipes}, f)
+
+        print(f"Drawing {len(recipes)} goldens with the renderer at {ref} ...")
+        subprocess.run(
+            [sys.executable, "-m", "src.generator.benchmark_baseline", payload],
+            check=True, cwd=tree, env={**os.environ, "PYTHONPATH": tree},
+        )
+
+    print(f"Goldens written to {golden_dir}")
+    return len(recipes)
+
+
+# ---------------------------------------------------------
+#  RUNNER
+# ---------------------------------------------------------
+
+def time_case(setup, repeat):
+    """(timings, image from the warm-up run)"""
+    try:
+        run, release = setup()
+        result = run()
+    except FileNotFoundError as e:
+        return None, str(e)
+
+    # Trimmed logos are compared on their full frame
+    image = expand_to_frame(result).copy() if result is not None else None
+    release(result)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - start)
+        release(result)
+    return timings, image
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != BASELINE_VERSION:
+        return {}
+    return data.get("results", {})
+
+
+def save_baseline(path, results):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = {
+        "version": BASELINE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "pillow": Image.__version__,
+        "numpy": np.__version__,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def run_benchmarks(
+    only=None,
+    repeat=REPEAT,
+    threshold=THRESHOLD,
+    baseline_path=BASELINE_PATH,
+    golden_dir=GOLDEN_DIR,
+    save=False,
+    update_golden=False,
+    tolerance=0,
+):
+    """Runs the suite and prints a table. Returns the number of failures."""
+    baseline = load_baseline(baseline_path)
+    results = {}
+    failures = 0
+
+    print(f"{'case':<28}{'median':>10}{'min':>10}{'baseline':>10}  {'change':<8}  golden")
+    for name, setup in build_cases():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+
+        timings, image = time_case(setup, repeat)
+        if timings is None:
+            print(f"{name:<28}  skipped: {image}")
+            continue
+
+        median = statistics.median(timings)
+        results[name] = {"median": round(median, 6), "min": round(min(timings), 6), "runs": repeat}
+
+        change, base = "", baseline.get(name)
+        if base:
+            ratio = median / base["median"] - 1
+            change = f"{ratio:+.0%}"
+            if ratio > threshold:
+                change += " SLOW"
+                failures += 1
+
+        golden = ""
+        if image is not None:
+            path = golden_path(golden_dir, name)
+            if update_golden:
+                os.makedirs(golden_dir, exist_ok=True)
+                image.save(path)
+                golden = "saved"
+            else:
+                golden = compare_golden(image, path, tolerance)
+                if golden.startswith("DIFF"):
+                    failures += 1
+
+        base_ms = f"{base['median'] * 1000:.1f}" if base else "-"
+        print(f"{name:<28}{median * 1000:>8.1f}ms{min(timings) * 1000:>8.1f}ms{base_ms:>8}ms  "
+              f"{change:<8}  {golden}")
+
+    if save:
+        # Keep baseline entries for cases this run filtered out
+        save_baseline(baseline_path, {**baseline, **results})
+        print(f"\nBaseline written to {baseline_path}")
+
+    if failures:
+        print(f"\n✘ {failures} regression(s) / golden mismatch(es)")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the render pipeline against a baseline.")
+    parser.add_argument("--only", nargs="+", help="case name prefixes, e.g. gradient/ render/pc")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed slowdown over baseline (0.15 = 15%%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--golden", default=GOLDEN_DIR)
+    parser.add_argument("--tolerance", type=int, default=0,
+                        help="max per-channel difference that still matches")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--update-golden", action="store_true",
+                        help="snapshot the current renderer's output as the goldens")
+    parser.add_argument("--golden-from", metavar="REF", nargs="?", const=GOLDEN_REF,
+                        help=f"draw the goldens with the renderer at git REF (default {GOLDEN_REF})")
+    args = parser.parse_args()
+
+    if args.golden_from:
+        golden_from_ref(args.golden_from, args.golden, args.only)
+        sys.exit(0)
+
+    failures = run_benchmarks(
+        only=args.only,
+        repeat=args.repeat,
+        threshold=args.threshold,
+        baseline_path=args.baseline,
+        golden_dir=args.golden,
+        save=args.save_baseline,
+        update_golden=args.update_golden,
+        tolerance=args.tolerance,
+    )
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,72 @@
+import os
+import sys
+import json
+
+import numpy as np
+from PIL import Image
+
+
+# ---------------------------------------------------------
+#  GOLDEN DRAWER
+# ---------------------------------------------------------
+# python -m src.generator.benchmark --golden-from <git ref> copies this
+# file into an export of <ref> and runs it there, so the golden images
+# come from that revision's renderer rather than the one being
+# benchmarked. It only uses the loaders, gradient generators and
+# generate_<device>_wallpaper functions the original renderer already
+# had, and takes everything else from the payload benchmark.py writes:
+#
+#   {"size": [w, h], "seed": n,
+#    "cases": {name: {"kind": ..., ..., "out": png path}}}
+
+
+def _tuples(args):
+    return [tuple(a) if isinstance(a, list) else a for a in args]
+
+
+def draw(recipe, size, seed):
+    from src.generator import wallpaper_base
+
+    kind = recipe["kind"]
+    np.random.seed(seed)
+
+    if kind == "gradient":
+        make = getattr(wallpaper_base, f"create_{recipe['style']}_gradient")
+        return make(*size, *_tuples(recipe["args"]))
+
+    if kind == "noise":
+        noise = wallpaper_base.generate_perlin_noise(*size)
+        return Image.fromarray((noise * 255).astype(np.uint8))
+
+    if kind == "stroke":
+        if recipe["hero"]:
+            logo = wallpaper_base.load_logo(recipe["logo"], recipe["size"])
+        else:
+            logo = wallpaper_base.load_small_logo(recipe["logo"], recipe["size"])
+        return wallpaper_base.add_logo_stroke(logo, stroke_size=recipe["stroke"])
+
+    if kind == "render":
+        device = recipe["device"]
+        module = __import__(f"src.generator.wallpaper_{device}", fromlist=["_"])
+        generate = getattr(module, f"generate_{device}_wallpaper")
+
+        with open(wallpaper_base.asset_path(recipe["schedule"]), "r", encoding="utf-8") as f:
+            schedule = json.load(f)
+        return generate(recipe["team"], schedule, recipe["logo"], **recipe["kwargs"])
+
+    raise ValueError(f"Unknown case kind: {kind}")
+
+
+def main(payload_path):
+    with open(payload_path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+
+    for name, recipe in payload["cases"].items():
+        img = draw(recipe, payload["size"], payload["seed"])
+        os.makedirs(os.path.dirname(recipe["out"]), exist_ok=True)
+        img.save(recipe["out"])
+        print("[OK]", name, flush=True)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
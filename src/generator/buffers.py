@@ -0,0 +1,193 @@
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+from PIL import Image
+
+
+# ---------------------------------------------------------
+#  SETTINGS
+# ---------------------------------------------------------
+
+# Total bytes of idle buffers kept for reuse (two full-size canvases)
+BUFFER_POOL_MAX_BYTES = int(os.getenv("BUFFER_POOL_MAX_BYTES", 32 * 1024 * 1024))
+
+# Idle buffers kept per (device, dtype, shape); about one per render thread
+BUFFER_POOL_PER_KEY = int(os.getenv("BUFFER_POOL_PER_KEY", 2))
+
+
+# ---------------------------------------------------------
+#  PEAK MEMORY
+# ---------------------------------------------------------
+# A render runs on one thread, so the meter is thread-local like the
+# cancel token. It counts the pooled canvases and arrays the render
+# holds at once, which is where nearly all of its memory goes; other
+# allocations (decoded logos, PIL temporaries) are not included, so
+# this is a pooled-buffer peak, not the render's RSS.
+
+class MemoryMeter:
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self.canvases = {}  # id(img) -> bytes, for canvases still out
+
+    def add(self, nbytes):
+        self.current += nbytes
+        self.peak = max(self.peak, self.current)
+
+    def sub(self, nbytes):
+        self.current -= nbytes
+
+    def hold(self, img):
+        self.canvases[id(img)] = image_nbytes(img)
+        self.add(self.canvases[id(img)])
+
+    def drop(self, img):
+        self.sub(self.canvases.pop(id(img), 0))
+
+
+_local = threading.local()
+
+
+@contextmanager
+def memory_scope(meter):
+    """Makes `meter` the one pool borrows on this thread are counted in."""
+    previous = getattr(_local, "meter", None)
+    _local.meter = meter
+    try:
+        yield meter
+    finally:
+        _local.meter = previous
+
+
+def _meter():
+    return getattr(_local, "meter", None)
+
+
+def image_nbytes(img):
+    # Pillow stores RGB with a padding byte, like RGBA
+    return img.width * img.height * (1 if img.mode in ("L", "P", "1") else 4)
+
+
+# ---------------------------------------------------------
+#  POOL
+# ---------------------------------------------------------
+
+class BufferPool:
+    """
+    Idle full-size canvases and scratch arrays keyed by (device, dtype,
+    shape), so back-to-back renders reuse memory instead of allocating
+    and dropping ~15 MB images each time. Thread-safe.
+
+    Borrowed buffers hold stale contents: callers overwrite every pixel
+    or ask for a fill color.
+    """
+
+    def __init__(self, max_bytes=BUFFER_POOL_MAX_BYTES, per_key=BUFFER_POOL_PER_KEY):
+        self.max_bytes = max_bytes
+        self.per_key = per_key
+        self.lock = threading.Lock()
+        self.idle = {}
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+        self.peak_pooled_max = 0
+        self.peak_pooled_last = 0
+
+    # ---- internals ----
+
+    def _take(self, key):
+        with self.lock:
+            free = self.idle.get(key)
+            if free:
+                buf, nbytes = free.pop()
+                self.bytes -= nbytes
+                self.hits += 1
+                return buf
+            self.misses += 1
+            return None
+
+    def _give(self, key, buf, nbytes):
+        with self.lock:
+            free = self.idle.setdefault(key, [])
+            if len(free) >= self.per_key or self.bytes + nbytes > self.max_bytes:
+                self.dropped += 1
+                return
+            free.append((buf, nbytes))
+            self.bytes += nbytes
+
+    # ---- arrays ----
+
+    @contextmanager
+    def array(self, shape, dtype=np.float32, device=None):
+        """A scratch ndarray for the body of the with-block."""
+        key = (device, np.dtype(dtype).str, tuple(shape))
+        arr = self._take(key)
+        if arr is None:
+            arr = np.empty(shape, dtype)
+
+        meter = _meter()
+        if meter is not None:
+            meter.add(arr.nbytes)
+        try:
+            yield arr
+        finally:
+            if meter is not None:
+                meter.sub(arr.nbytes)
+            self._give(key, arr, arr.nbytes)
+
+    # ---- canvases ----
+
+    def canvas(self, size, color=None, device=None, mode="RGB"):
+        """
+        A PIL image of `size`, filled with `color` if given. Hand it
+        back with release() once it has been encoded.
+        """
+        img = self._take((device, mode, tuple(size)))
+        if img is None:
+            img = Image.new(mode, size, color or 0)
+        elif color is not None:
+            img.paste(color, (0, 0) + img.size)
+
+        meter = _meter()
+        if meter is not None:
+            meter.hold(img)
+        return img
+
+    def release(self, img, device=None):
+        """
+        Returns a canvas for reuse. Images that didn't come from
+        canvas() are taken too; never release one still in use.
+        """
+        meter = _meter()
+        if meter is not None:
+            meter.drop(img)
+        img.info.clear()  # no stale PNG metadata on the next render
+        self._give((device, img.mode, img.size), img, image_nbytes(img))
+
+    # ---- reporting ----
+
+    def record_peak(self, meter):
+        """Notes a finished render's pooled-buffer peak."""
+        with self.lock:
+            self.peak_pooled_last = meter.peak
+            self.peak_pooled_max = max(self.peak_pooled_max, meter.peak)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "idle_bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "idle_buffers": sum(len(v) for v in self.idle.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "dropped": self.dropped,
+                "peak_pooled_bytes_last": self.peak_pooled_last,
+                "peak_pooled_bytes_max": self.peak_pooled_max,
+            }
+
+
+buffer_pool = BufferPool()
@@ -0,0 +1,323 @@
+import os
+import json
+import time
+import hashlib
+import argparse
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.generator.wallpaper_base import asset_path
+from src.generator.layouts import DESIGNS, DEVICES, FONT_PATH
+from src.generator.logo_assets import INDEX_PATH as MIP_INDEX_PATH
+from src.generator.logo_pack import pack_stamp
+from src.generator.teams import TEAMS_JSON
+from src.generator.render import (
+    DEVICE_TYPES,
+    GRADIENT_STYLES,
+    SpecError,
+    available_teams,
+    normalize_spec,
+    render_png,
+    spec_key,
+)
+from src.generator.shared_cache import preload_shared_cache
+
+
+# ---------------------------------------------------------
+#  SETTINGS
+# ---------------------------------------------------------
+# python -m src.generator.bulk_render --teams Alabama Auburn \
+#     --types pc mobile --styles solid linear radial \
+#     --colors team 9E1B32 9E1B32:FFFFFF --out catalog
+
+STYLES = ("solid", "stickerbomb") + GRADIENT_STYLES
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Manifest is rewritten after this many finished images
+CHECKPOINT_EVERY = 25
+
+
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------
+#  JOB MATRIX
+# ---------------------------------------------------------
+
+def parse_colors(value):
+    """'team' → (None, None), 'AAAAAA' → (AAAAAA, None), 'AAAAAA:BBBBBB' → both."""
+    if value == "team":
+        return None, None
+    first, _, second = value.partition(":")
+    return first or None, second or None
+
+
+def build_specs(teams, types, styles, colors, angle=0):
+    """Every distinct spec in the matrix, in a stable order."""
+    specs = {}
+
+    for team in teams:
+        for type_ in types:
+            for style in styles:
+                for color in colors:
+                    c1, c2 = parse_colors(color)
+
+                    if style == "stickerbomb":
+                        spec = normalize_spec(team, type_, stickerbomb=1)
+                    elif style == "solid":
+                        spec = normalize_spec(team, type_, color=c1)
+                    else:
+                        spec = normalize_spec(
+                            team, type_,
+                            gradient_enabled=1,
+                            style=style,
+                            color1=c1,
+                            color2=c2,
+                            angle=angle,
+                        )
+
+                    # Settings a style ignores collapse into one spec
+                    specs.setdefault(spec_key(spec), spec)
+
+    return list(specs.values())
+
+
+def variant_name(spec):
+    """Readable file name for a spec, e.g. linear-9E1B32-team-a45."""
+    def hex_or_team(value):
+        return value.lstrip("#") if value else "team"
+
+    if spec["mode"] == "stickerbomb":
+        return "stickerbomb"
+    if spec["mode"] == "solid":
+        return f"solid-{hex_or_team(spec['color'])}"
+
+    parts = [spec["style"], hex_or_team(spec["color1"]), hex_or_team(spec["color2"])]
+    if "angle" in spec:
+        parts.append(f"a{spec['angle']}")
+    if "noise_detail" in spec:
+        parts.append(f"n{spec['noise_detail']}")
+    return "-".join(parts)
+
+
+def output_relpath(spec):
+    team_key = spec["team"].replace(" ", "_")
+    return f"{spec['type']}/{team_key}/{variant_name(spec)}.png"
+
+
+@lru_cache(maxsize=None)
+def schedule_logos(team_key):
+    """Opponent logo files a team's schedule grid draws."""
+    try:
+        with open(asset_path(f"data/schedules/{team_key}.json"), "r", encoding="utf-8") as f:
+            schedule = json.load(f)
+    except (OSError, ValueError):
+        return ()
+    return tuple(
+        f"data/logos/{game['opponent_logo']}"
+        for game in schedule
+        if game.get("opponent") != "BYE" and game.get("opponent_logo")
+    )
+
+
+def render_sources(spec):
+    """Every file a render of `spec` reads, for input_hash()."""
+    team_key = spec["team"].replace(" ", "_")
+    sources = [
+        f"data/logos/{team_key}.png",
+        TEAMS_JSON,       # official team colors
+        MIP_INDEX_PATH,   # trimmed logo pyramid
+    ]
+
+    if spec["mode"] == "stickerbomb":
+        sources.append(DESIGNS[DEVICES[spec["type"]]["design"]]["stickerbomb"])
+    else:
+        opponents = schedule_logos(team_key)
+        sources += [f"data/schedules/{team_key}.json", FONT_PATH, *opponents]
+        if not all(os.path.exists(asset_path(p)) for p in opponents):
+            sources.append("data/logos/fallback.png")
+    return sources
+
+
+def input_hash(spec, source_hashes):
+    """
+    Changes when the spec, the renderer version (part of spec_key), any
+    file the render reads (render_sources) or the logo pack change.
+    """
+    h = hashlib.sha1(spec_key(spec).encode("utf-8"))
+    for path in render_sources(spec):
+        h.update(source_hashes(path).encode("utf-8"))
+    h.update((pack_stamp() or "no pack").encode("utf-8"))
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------
+#  MANIFEST
+# ---------------------------------------------------------
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("entries", {})
+
+
+def save_manifest(out_dir, entries):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": MANIFEST_VERSION, "entries": entries},
+            f, indent=1, sort_keys=True,
+        )
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------
+#  WORKER
+# ---------------------------------------------------------
+
+def render_job(job):
+    """Renders one spec to its output file. Returns (relpath, error, secs)."""
+    spec, out_path, relpath = job
+    start = time.perf_counter()
+
+    try:
+        png = render_png(spec)
+
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        tmp = f"{out_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(png)
+        os.replace(tmp, out_path)
+    except Exception as e:
+        return relpath, str(e), time.perf_counter() - start
+
+    return relpath, None, time.perf_counter() - start
+
+
+# ---------------------------------------------------------
+#  BULK RENDER
+# ---------------------------------------------------------
+
+def bulk_render(specs, out_dir, workers=None, force=False):
+    """
+    Renders every spec into out_dir across a process pool.
+
+    Entries whose input hash matches the manifest (and whose file still
+    exists) are skipped, so an interrupted run picks up where it left
+    off. Returns a stats dict.
+    """
+    out_dir = os.path.abspath(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+
+    manifest = {} if force else load_manifest(out_dir)
+
+    hashes = {}
+
+    def source_hash(path):
+        if path not in hashes:
+            full = asset_path(path)
+            hashes[path] = file_hash(full) if os.path.exists(full) else "missing"
+        return hashes[path]
+
+    jobs = []
+    pending = {}
+    for spec in specs:
+        relpath = output_relpath(spec)
+        digest = input_hash(spec, source_hash)
+        out_path = os.path.join(out_dir, relpath)
+
+        entry = manifest.get(relpath)
+        if entry and entry["input"] == digest and os.path.exists(out_path):
+            continue
+
+        pending[relpath] = {"spec": spec, "input": digest}
+        jobs.append((spec, out_path, relpath))
+
+    skipped = len(specs) - len(jobs)
+    workers = workers or os.cpu_count()
+    print(f"{len(specs)} images: {len(jobs)} to render, {skipped} up to date "
+          f"({workers} workers)")
+
+    rendered = failed = 0
+    busy = 0.0
+    start = time.perf_counter()
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers, initializer=preload_shared_cache) as pool:
+            futures = [pool.submit(render_job, job) for job in jobs]
+
+            for done, future in enumerate(as_completed(futures), 1):
+                relpath, error, secs = future.result()
+                busy += secs
+
+                if error:
+                    failed += 1
+                    manifest.pop(relpath, None)
+                    print("[ERROR]", relpath, error)
+                else:
+                    rendered += 1
+                    manifest[relpath] = pending[relpath]
+
+                if done % CHECKPOINT_EVERY == 0:
+                    save_manifest(out_dir, manifest)
+                    rate = done / (time.perf_counter() - start)
+                    print(f"  {done}/{len(jobs)}  {rate:.2f} images/sec")
+
+    save_manifest(out_dir, manifest)
+
+    elapsed = time.perf_counter() - start
+    rate = rendered / elapsed if rendered else 0.0
+    stats = {
+        "total": len(specs),
+        "rendered": rendered,
+        "skipped": skipped,
+        "failed": failed,
+        "workers": workers,
+        "seconds": round(elapsed, 2),
+        "images_per_sec": round(rate, 3),
+        "images_per_sec_per_worker": round(rate / workers, 3),
+        "avg_render_secs": round(busy / len(jobs), 3) if jobs else 0.0,
+    }
+
+    print(f"\n✔ {rendered} rendered, {skipped} skipped, {failed} failed "
+          f"in {elapsed:.1f}s → {rate:.2f} images/sec "
+          f"({rate / workers:.2f} per worker)")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render a wallpaper catalog.")
+    parser.add_argument("--teams", nargs="+", default=["all"],
+                        help="team names, or 'all' (default)")
+    parser.add_argument("--types", nargs="+", choices=DEVICE_TYPES, default=["pc", "mobile"])
+    parser.add_argument("--styles", nargs="+", choices=STYLES, default=["solid"])
+    parser.add_argument("--colors", nargs="+", default=["team"],
+                        help="'team', 'RRGGBB' or 'RRGGBB:RRGGBB' (gradients)")
+    parser.add_argument("--angle", type=int, default=0)
+    parser.add_argument("--out", default="catalog")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--force", action="store_true", help="ignore the manifest")
+    args = parser.parse_args()
+
+    teams = available_teams() if args.teams == ["all"] else args.teams
+
+    try:
+        specs = build_specs(teams, args.types, args.styles, args.colors, args.angle)
+    except SpecError as e:
+        parser.error(str(e))
+
+    bulk_render(specs, args.out, workers=args.workers, force=args.force)
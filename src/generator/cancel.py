@@ -0,0 +1,50 @@
+import threading
+from contextlib import contextmanager
+
+
+# ---------------------------------------------------------
+#  CANCELLATION
+# ---------------------------------------------------------
+# A render runs start to finish on one thread, so the active token is
+# kept thread-local: the generators call check_cancelled() between
+# stages without a token being passed down every call.
+
+class RenderCancelled(Exception):
+    """The render was cancelled (client gone, job cancelled)."""
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise RenderCancelled()
+
+
+_local = threading.local()
+
+
+@contextmanager
+def cancel_scope(token):
+    """Makes `token` the one check_cancelled() looks at on this thread."""
+    previous = getattr(_local, "token", None)
+    _local.token = token
+    try:
+        yield token
+    finally:
+        _local.token = previous
+
+
+def check_cancelled():
+    """Raises RenderCancelled if this thread's render was cancelled."""
+    token = getattr(_local, "token", None)
+    if token is not None:
+        token.check()
@@ -0,0 +1,354 @@
+from functools import lru_cache
+
+from PIL import Image
+from src.generator.wallpaper_base import (
+    asset_path,
+    load_stroked_small_logo,
+    load_font,
+    logo_frame,
+    hex_to_rgb,
+    create_solid_background,
+    create_gradient,
+    cover_box,
+    draw_items,
+    gradient_fill,
+    image_fill,
+    scaled,
+    solid_fill,
+)
+from src.generator.quality import FULL, tier, load_hero_logo
+from src.generator.team_colors import team_colors
+from src.generator.cancel import check_cancelled
+from src.generator.timing import stage
+
+
+# ---------------------------------------------------------
+#  LAYOUT DESIGNS
+# ---------------------------------------------------------
+# A design is one arrangement of hero logo + schedule grid, measured
+# in pixels on its reference canvas. Devices of any resolution reuse
+# a design: sizes and spacings scale with the short side of the
+# canvas, the hero and grid tops with its height, and everything is
+# centered horizontally (so ultrawide gets the 1440p layout with
+# more background either side).
+
+FONT_PATH = "src/generator/fonts/Montserrat-Bold.ttf"
+
+DESIGNS = {
+    "landscape": {
+        "size": (2560, 1440),
+        "hero": {"max_width": 1400, "stroke": 10, "top": 60},
+        "grid": {
+            "rows": 4,
+            "cols": 3,
+            "top": 680,
+            "row_spacing": 165,
+            "col_spacing": 420,
+            "logo_size": 115,
+            "logo_stroke": 3,
+            "date_gap": 14,
+            "font_size": 30,
+            "text_stroke": 2,
+        },
+        "stickerbomb": "data/stickerbomb/pc.png",
+    },
+    "portrait": {
+        "size": (1284, 2778),
+        "hero": {"max_width": 1800, "stroke": 14, "top": 300},
+        "grid": {
+            "rows": 4,
+            "cols": 3,
+            "top": 1050,
+            "row_spacing": 230,
+            "col_spacing": 300,
+            "logo_size": 150,
+            "logo_stroke": 3,
+            "date_gap": 34,
+            "font_size": 40,
+            "text_stroke": 2,
+        },
+        "stickerbomb": "data/stickerbomb/mobile.png",
+    },
+}
+
+
+# ---------------------------------------------------------
+#  DEVICES
+# ---------------------------------------------------------
+# Output types: canvas size and design. "banded" outputs are too big
+# to hold whole and are band-streamed (see render.render_banded_png).
+# A new resolution is one more line here.
+
+DEVICES = {
+    "pc": {"size": (2560, 1440), "design": "landscape"},
+    "mobile": {"size": (1284, 2778), "design": "portrait"},
+    "4k": {"size": (3840, 2160), "design": "landscape", "banded": True},
+    "5k": {"size": (5120, 2880), "design": "landscape", "banded": True},
+    "ultrawide": {"size": (5120, 1440), "design": "landscape", "banded": True},
+    "ipad": {"size": (2048, 2732), "design": "portrait"},
+    "android": {"size": (1080, 2400), "design": "portrait"},
+}
+
+
+# ---------------------------------------------------------
+#  LAYOUT PLANS
+# ---------------------------------------------------------
+
+class LayoutPlan:
+    """
+    A device's design worked out in absolute pixels at one output
+    scale: canvas size, hero placement, grid cells, logo sizes and the
+    date font. Built once per (device, scale) by layout_plan().
+    """
+
+    def __init__(self, device, scale=1.0):
+        spec = DEVICES[device]
+        design = DESIGNS[spec["design"]]
+        hero = design["hero"]
+        grid = design["grid"]
+
+        self.device = device
+        self.preview = scale != 1
+        self.banded = spec.get("banded", False)
+        self.stickerbomb_art = design["stickerbomb"]
+
+        # scale < 1 is the same layout smaller (used by /preview)
+        width, height = spec["size"]
+        self.size = (scaled(width, scale), scaled(height, scale))
+
+        # Sizes follow the short side, vertical anchors the height
+        self.unit = min(spec["size"]) / min(design["size"]) * scale
+        anchor = height / design["size"][1] * scale
+
+        self.hero_max_width = hero["max_width"]
+        self.hero_stroke = hero["stroke"]
+        self.hero_top = scaled(hero["top"], anchor)
+
+        self.logo_size = scaled(grid["logo_size"], self.unit)
+        self.logo_stroke = scaled(grid["logo_stroke"], self.unit)
+        self.date_font = load_font(asset_path(FONT_PATH), scaled(grid["font_size"], self.unit))
+        self.text_stroke = scaled(grid["text_stroke"], self.unit)
+
+        # Cell centers (x) and logo tops (y), row by row, with the
+        # y of the date under each logo
+        top = scaled(grid["top"], anchor)
+        row_spacing = scaled(grid["row_spacing"], self.unit)
+        col_spacing = scaled(grid["col_spacing"], self.unit)
+        left = self.size[0] // 2 - ((grid["cols"] - 1) * col_spacing) // 2
+        date_gap = self.logo_size + scaled(grid["date_gap"], self.unit)
+
+        self.cells = [
+            (left + c * col_spacing, top + r * row_spacing, top + r * row_spacing + date_gap)
+            for r in range(grid["rows"])
+            for c in range(grid["cols"])
+        ]
+
+    def hero(self, logo_path, quality=FULL):
+        return load_hero_logo(
+            asset_path(logo_path), self.hero_max_width, self.hero_stroke, quality, self.unit,
+            preview=self.preview,
+        )
+
+
+@lru_cache(maxsize=64)
+def layout_plan(device, scale=1.0):
+    """The cached LayoutPlan of a device type at `scale`. KeyError if unknown."""
+    return LayoutPlan(device, scale)
+
+
+# ---------------------------------------------------------
+#  WALLPAPER GENERATOR
+# ---------------------------------------------------------
+
+def generate_wallpaper(
+    device,
+    team_name,
+    schedule,
+    logo_path,
+    user_color=None,
+    gradient_enabled=False,
+    style="linear",
+    color1=None,
+    color2=None,
+    angle=0,
+    noise_detail=2,
+    stickerbomb=False,
+    show_schedule=True,
+    quality=FULL,
+    scale=1.0,
+):
+    """
+    Background first, then the logos and schedule on top. The two
+    halves are also used on their own by the live-preview socket.
+    """
+    plan = layout_plan(device, scale)
+
+    with stage("background"):
+        bg = layout_background(
+            plan,
+            logo_path,
+            user_color=user_color,
+            gradient_enabled=gradient_enabled,
+            style=style,
+            color1=color1,
+            color2=color2,
+            angle=angle,
+            noise_detail=noise_detail,
+            stickerbomb=stickerbomb,
+            quality=quality,
+        )
+    check_cancelled()
+
+    draw_foreground(
+        bg,
+        plan,
+        schedule,
+        logo_path,
+        stickerbomb=stickerbomb,
+        show_schedule=show_schedule,
+        quality=quality,
+    )
+    return bg
+
+
+def layout_background(
+    plan,
+    logo_path,
+    user_color=None,
+    gradient_enabled=False,
+    style="linear",
+    color1=None,
+    color2=None,
+    angle=0,
+    noise_detail=2,
+    stickerbomb=False,
+    quality=FULL,
+    bands=False,
+):
+    """
+    The background image, or with bands=True a band fill for it (see
+    wallpaper_base) that band-streamed renders draw a strip at a time.
+    """
+    WIDTH, HEIGHT = plan.size
+
+    # ---------------------------------------------------------
+    #  STICKER BOMB MODE
+    # ---------------------------------------------------------
+    if stickerbomb:
+        bg = Image.open(asset_path(plan.stickerbomb_art)).convert("RGB")
+        box = cover_box(bg.size, (WIDTH, HEIGHT))
+        if bands:
+            return image_fill(bg, WIDTH, HEIGHT, Image.BILINEAR, box)
+        if bg.size != (WIDTH, HEIGHT):
+            bg = bg.resize((WIDTH, HEIGHT), Image.BILINEAR, box=box)
+        return bg
+
+    # ---------------------------------------------------------
+    #  NORMAL TEAM MODE BACKGROUND
+    # ---------------------------------------------------------
+    if gradient_enabled:
+        c1 = hex_to_rgb(color1)
+        c2 = hex_to_rgb(color2)
+
+        if not c1 or not c2:
+            primary_rgb, secondary_rgb = team_colors(logo_path)
+            if not c1:
+                c1 = primary_rgb
+            if not c2:
+                c2 = secondary_rgb
+
+        make = gradient_fill if bands else create_gradient
+        return make(
+            WIDTH, HEIGHT,
+            style,
+            c1, c2,
+            angle,
+            noise_detail=noise_detail,
+            resolution=tier(quality)["bg_scale"],
+            detail_scale=plan.unit,
+            resample=tier(quality)["resample"],
+            device=plan.device,
+        )
+
+    if user_color:
+        c = hex_to_rgb(user_color)
+    else:
+        c, _ = team_colors(logo_path)
+    if bands:
+        return solid_fill(c)
+    return create_solid_background(WIDTH, HEIGHT, c, device=plan.device)
+
+
+def draw_foreground(
+    canvas,
+    plan,
+    schedule,
+    logo_path,
+    stickerbomb=False,
+    show_schedule=True,
+    quality=FULL,
+):
+    items = overlay_items(
+        plan,
+        schedule,
+        logo_path,
+        stickerbomb=stickerbomb,
+        show_schedule=show_schedule,
+        quality=quality,
+    )
+    draw_items(canvas, items)
+
+
+def overlay_items(
+    plan,
+    schedule,
+    logo_path,
+    stickerbomb=False,
+    show_schedule=True,
+    quality=FULL,
+):
+    """
+    The hero, grid logos and dates as placed overlay items (see
+    wallpaper_base.draw_items).
+    """
+    WIDTH, HEIGHT = plan.size
+
+    hero_logo = plan.hero(logo_path, quality)
+    hero_w, hero_h, _, _ = logo_frame(hero_logo)
+
+    if stickerbomb or not show_schedule:
+        # 💥 BIG CENTER LOGO
+        x = (WIDTH - hero_w) // 2
+        y = (HEIGHT - hero_h) // 2
+        return [("logo", hero_logo, (x, y))]
+
+    check_cancelled()
+
+    # With schedule → hero at the top, grid underneath
+    items = [("logo", hero_logo, ((WIDTH - hero_w) // 2, plan.hero_top))]
+
+    # ---------------------------------------------------------
+    #  SCHEDULE GRID
+    # ---------------------------------------------------------
+    games = [g for g in schedule if g["opponent"] != "BYE"][:len(plan.cells)]
+
+    for item, (cell_x, cell_y, date_y) in zip(games, plan.cells):
+        check_cancelled()
+
+        opp_path = f"data/logos/{item['opponent_logo']}"
+        with stage("grid"):
+            opp_logo = load_stroked_small_logo(opp_path, max_size=plan.logo_size, stroke_size=plan.logo_stroke)
+        opp_w, _, _, _ = logo_frame(opp_logo)
+        items.append(("logo", opp_logo, (cell_x - opp_w // 2, cell_y)))
+
+        items.append((
+            "text",
+            (cell_x, date_y),
+            item["date"],
+            plan.date_font,
+            "white" if not item["home"] else "black",
+            "black" if not item["home"] else "white",
+            plan.text_stroke,
+        ))
+
+    return items
@@ -0,0 +1,242 @@
+import os
+import json
+import math
+from PIL import Image
+
+
+# ---------------------------------------------------------
+#  PATHS
+# ---------------------------------------------------------
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+LOGOS_DIR = os.path.join(PROJECT_ROOT, "data", "logos")
+MIPS_DIR = os.path.join(PROJECT_ROOT, "data", "logos_mips")
+INDEX_PATH = os.path.join(MIPS_DIR, "index.json")
+
+# Longest-side sizes of the pre-built levels (largest first)
+MIP_LEVELS = (2048, 1024, 512, 256, 128, 64)
+
+# Trimmed full-resolution copies live in this folder of MIPS_DIR
+FULL_LEVEL = "full"
+
+# (output size, stroke px) for every place a logo gets a stroke:
+# PC hero, mobile hero, 4K hero, 5K hero, PC grid, mobile grid,
+# dropdown icon, smallest sticker-bomb sticker (its 12px die-cut
+# border). Trimmed logos keep enough transparent margin for the
+# widest one.
+STROKE_USES = (
+    (1400, 10), (1800, 14), (2100, 15), (2800, 20), (115, 3), (150, 3), (32, 1), (70, 12),
+)
+
+
+# ---------------------------------------------------------
+#  SIZE MATH
+# ---------------------------------------------------------
+
+def thumbnail_size(size, box):
+    """
+    The size Image.thumbnail(box) would produce for an image of `size`,
+    or None if it would leave the image alone.
+    """
+    w, h = size
+    x, y = map(math.floor, box)
+    if x >= w and y >= h:
+        return None
+
+    def round_aspect(number, key):
+        return max(min(math.floor(number), math.ceil(number), key=key), 1)
+
+    aspect = w / h
+    if x / y >= aspect:
+        x = round_aspect(y * aspect, key=lambda n: abs(aspect - n / y))
+    else:
+        y = round_aspect(x / aspect, key=lambda n: 0 if n == 0 else abs(aspect - x / n))
+    return x, y
+
+
+# ---------------------------------------------------------
+#  INGEST + PYRAMID BUILD (python -m src.generator.logo_assets)
+# ---------------------------------------------------------
+
+def mip_path(level, filename):
+    return os.path.join(MIPS_DIR, str(level), filename)
+
+
+def stroke_padding(size):
+    """Source pixels of margin needed so no stroke gets clipped."""
+    longest = max(size)
+    return max(
+        math.ceil(stroke * max(longest / out, 1))
+        for out, stroke in STROKE_USES
+    )
+
+
+def trim_box(img):
+    """Alpha bounding box plus stroke padding, clamped to the image."""
+    w, h = img.size
+    bbox = img.getchannel("A").getbbox()
+    if not bbox:
+        return 0, 0, w, h
+
+    pad = stroke_padding(img.size)
+    left, top, right, bottom = bbox
+    return (
+        max(left - pad, 0), max(top - pad, 0),
+        min(right + pad, w), min(bottom + pad, h),
+    )
+
+
+def build_logo_mips(filename):
+    """
+    Crops one logo to its alpha bbox and writes the trimmed copy plus
+    every level smaller than the source. Returns its index entry.
+    """
+    with Image.open(os.path.join(LOGOS_DIR, filename)) as src:
+        src = src.convert("RGBA")
+
+        box = trim_box(src)
+        trimmed = src.crop(box)
+
+        out = mip_path(FULL_LEVEL, filename)
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        trimmed.save(out)
+
+        levels = []
+        for level in MIP_LEVELS:
+            if level >= max(src.size):
+                continue
+
+            out = mip_path(level, filename)
+            os.makedirs(os.path.dirname(out), exist_ok=True)
+
+            # Each level comes straight from the trimmed source
+            size = scaled_crop_size(trimmed.size, level / max(src.size))
+            trimmed.resize(size, Image.LANCZOS).save(out)
+            levels.append(level)
+
+        return {"size": list(src.size), "bbox": list(box), "levels": levels}
+
+
+def build_mip_pyramid():
+    index = {}
+    saved = 0
+
+    for filename in sorted(os.listdir(LOGOS_DIR)):
+        if not filename.lower().endswith(".png"):
+            continue
+
+        try:
+            entry = build_logo_mips(filename)
+            index[filename] = entry
+
+            w, h = entry["size"]
+            left, top, right, bottom = entry["bbox"]
+            saved += w * h - (right - left) * (bottom - top)
+            print("[OK]", filename, entry["bbox"], entry["levels"])
+        except Exception as e:
+            print("[ERROR]", filename, e)
+
+    os.makedirs(MIPS_DIR, exist_ok=True)
+    with open(INDEX_PATH, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"), sort_keys=True)
+
+    print(f"\n✔ Built trimmed mip pyramid for {len(index)} logos")
+    print(f"  {saved / 1e6:.1f} MP of transparent margin removed")
+    return index
+
+
+# ---------------------------------------------------------
+#  LOOKUP
+# ---------------------------------------------------------
+
+_INDEX = None
+
+
+def load_index():
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = {}
+        if os.path.exists(INDEX_PATH):
+            with open(INDEX_PATH, "r", encoding="utf-8") as f:
+                _INDEX = json.load(f)
+    return _INDEX
+
+
+def logo_entry(path):
+    """Index entry for a logo under data/logos, or None."""
+    if os.path.dirname(os.path.abspath(path)) != LOGOS_DIR:
+        return None
+    return load_index().get(os.path.basename(path))
+
+
+def scaled_crop_size(size, scale):
+    w, h = size
+    return max(1, round(w * scale)), max(1, round(h * scale))
+
+
+def trimmed_source(path, entry, scale):
+    """
+    Smallest trimmed level whose crop is still at least as big as the
+    crop at `scale`, falling back to the trimmed full-size copy.
+    """
+    filename = os.path.basename(path)
+    longest = max(entry["size"])
+
+    for level in sorted(entry["levels"]):
+        if level / longest >= scale:
+            candidate = mip_path(level, filename)
+            if os.path.exists(candidate):
+                return candidate
+            break
+
+    return mip_path(FULL_LEVEL, filename)
+
+
+def load_trimmed(path, frame, resample=Image.LANCZOS):
+    """
+    Loads the trimmed logo scaled as if the full source had been
+    resized to `frame` (w, h). Returns None when no trimmed copy exists.
+
+    The image carries info["frame"] = (frame_w, frame_h, x, y): the
+    untrimmed size and where the trimmed pixels sit inside it.
+    """
+    entry = logo_entry(path)
+    if not entry or "bbox" not in entry:
+        return None
+
+    w, h = entry["size"]
+    fw, fh = frame
+    sx, sy = fw / w, fh / h
+
+    # Whole output pixels inside the crop, on the full frame's grid
+    left, top, right, bottom = entry["bbox"]
+    x0, y0 = math.ceil(left * sx), math.ceil(top * sy)
+    x1 = max(x0 + 1, min(math.floor(right * sx), fw))
+    y1 = max(y0 + 1, min(math.floor(bottom * sy), fh))
+
+    source = trimmed_source(path, entry, max(sx, sy))
+    if not os.path.exists(source):
+        return None
+
+    img = Image.open(source).convert("RGBA")
+
+    # Matching region of the trimmed source (fractional, so the pixel
+    # grid lines up with resizing the untrimmed logo)
+    kx = img.width / (right - left)
+    ky = img.height / (bottom - top)
+    box = (
+        (x0 / sx - left) * kx, (y0 / sy - top) * ky,
+        (x1 / sx - left) * kx, (y1 / sy - top) * ky,
+    )
+
+    target = (x1 - x0, y1 - y0)
+    if img.size != target or box != (0, 0, img.width, img.height):
+        img = img.resize(target, resample, box=box)
+
+    img.info["frame"] = (fw, fh, x0, y0)
+    return img
+
+
+if __name__ == "__main__":
+    build_mip_pyramid()
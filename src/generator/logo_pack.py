@@ -0,0 +1,250 @@
+import os
+import json
+import hashlib
+import argparse
+import numpy as np
+from PIL import Image
+
+
+# ---------------------------------------------------------
+#  PATHS + SETTINGS
+# ---------------------------------------------------------
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+LOGOS_DIR = os.path.join(PROJECT_ROOT, "data", "logos")
+PACK_DIR = os.path.join(PROJECT_ROOT, "data", "logos_pack")
+PACK_PATH = os.path.join(PACK_DIR, "logos.rgba")
+PACK_INDEX_PATH = os.path.join(PACK_DIR, "logos.json")
+PACK_STAMP_PATH = os.path.join(PACK_DIR, "logos.sha1")
+
+# Loader sizes the renderers ask for:
+#   "logo"  → load_logo(max_width)       (PC / mobile hero)
+#   "small" → load_small_logo(max_size)  (PC / mobile schedule grid)
+PACK_SIZES = {
+    "logo": (1400, 1800),
+    "small": (115, 150),
+}
+
+# Every entry is scaled with this filter; lookups asking for another
+# one miss and decode as usual
+PACK_RESAMPLE = Image.LANCZOS
+
+# Entries start on a cache-line boundary
+ALIGN = 64
+
+
+def pack_key(filename, kind, size):
+    return f"{filename}|{kind}|{size}"
+
+
+# ---------------------------------------------------------
+#  PACK FORMAT
+# ---------------------------------------------------------
+
+def write_rgba_pack(pack_path, index_path, items):
+    """
+    Writes (key, image) pairs as raw RGBA back to back into pack_path
+    and a JSON {key: {offset, size, frame}} index into index_path.
+    Identical images share bytes. Both files appear atomically.
+    Returns (entry count, bytes written).
+    """
+    from src.generator.wallpaper_base import logo_frame
+
+    tmp_path = pack_path + ".tmp"
+    index = {}
+    seen = {}
+    offset = 0
+
+    with open(tmp_path, "wb") as out:
+        for key, img in items:
+            img = img.convert("RGBA") if img.mode != "RGBA" else img
+            frame = list(logo_frame(img))
+            data = img.tobytes()
+
+            sig = (img.size, tuple(frame), hashlib.sha1(data).digest())
+            if sig not in seen:
+                pad = -offset % ALIGN
+                out.write(b"\0" * pad)
+                offset += pad
+
+                out.write(data)
+                seen[sig] = offset
+                offset += len(data)
+
+            index[key] = {
+                "offset": seen[sig],
+                "size": list(img.size),
+                "frame": frame,
+            }
+
+    os.replace(tmp_path, pack_path)
+
+    tmp_index = index_path + ".tmp"
+    with open(tmp_index, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"), sort_keys=True)
+    os.replace(tmp_index, index_path)
+
+    return len(index), offset
+
+
+def map_rgba_pack(pack_path, index_path):
+    """(memmap, index) for a pack on disk, or None if it is missing."""
+    if not (os.path.exists(pack_path) and os.path.exists(index_path)):
+        return None
+    with open(index_path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    return np.memmap(pack_path, dtype=np.uint8, mode="r"), index
+
+
+def pack_image(mm, entry):
+    """Read-only RGBA image viewing one pack entry, without copying."""
+    w, h = entry["size"]
+    start = entry["offset"]
+    buf = mm[start:start + w * h * 4]
+
+    img = Image.frombuffer("RGBA", (w, h), buf, "raw", "RGBA", 0, 1)
+    frame = tuple(entry["frame"])
+    if frame != (w, h, 0, 0):
+        img.info["frame"] = frame
+    return img
+
+
+# ---------------------------------------------------------
+#  PACKER (python -m src.generator.logo_pack)
+# ---------------------------------------------------------
+
+def pack_digest(pack_path, index_path):
+    """SHA-1 of a pack's bytes and index: changes whenever any entry does."""
+    h = hashlib.sha1()
+    for path in (index_path, pack_path):
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def logo_files():
+    return sorted(
+        f for f in os.listdir(LOGOS_DIR) if f.lower().endswith(".png")
+    )
+
+
+def build_logo_pack(kinds=None):
+    """
+    Decodes every logo at every PACK_SIZES size and writes the raw
+    RGBA pixels into one file with a JSON offset index.
+    Identical results (e.g. a 500px logo at 1400 and 1800) share bytes.
+
+    `kinds` limits the pack to some of PACK_SIZES; hero sizes alone are
+    ~550 MB raw, the schedule-grid sizes ~70 MB.
+    """
+    from src.generator import wallpaper_base
+
+    kinds = kinds or list(PACK_SIZES)
+
+    def items():
+        for filename in logo_files():
+            path = os.path.join(LOGOS_DIR, filename)
+            for kind in kinds:
+                for size in PACK_SIZES[kind]:
+                    if kind == "logo":
+                        img = wallpaper_base.load_logo(path, max_width=size, resample=PACK_RESAMPLE)
+                    else:
+                        img = wallpaper_base.load_small_logo(path, max_size=size)
+                    yield pack_key(filename, kind, size), img
+            print("[OK]", filename)
+
+    # Loaders must read real files while the pack is being rebuilt
+    global _DISABLED
+    close_pack()
+    _DISABLED = True
+
+    os.makedirs(PACK_DIR, exist_ok=True)
+    try:
+        count, size = write_rgba_pack(PACK_PATH, PACK_INDEX_PATH, items())
+    finally:
+        _DISABLED = False
+
+    # Content stamp for things derived from the pack (see pack_stamp)
+    tmp_stamp = PACK_STAMP_PATH + ".tmp"
+    with open(tmp_stamp, "w", encoding="utf-8") as f:
+        f.write(pack_digest(PACK_PATH, PACK_INDEX_PATH))
+    os.replace(tmp_stamp, PACK_STAMP_PATH)
+
+    print(f"\n✔ Packed {count} entries, {size / 1e6:.1f} MB")
+    return count
+
+
+# ---------------------------------------------------------
+#  READER
+# ---------------------------------------------------------
+
+_PACK = None
+_DISABLED = False
+
+
+def open_pack():
+    """Maps the pack once per process. Returns (memmap, index) or None."""
+    global _PACK
+    if _DISABLED:
+        return None
+
+    if _PACK is None:
+        _PACK = map_rgba_pack(PACK_PATH, PACK_INDEX_PATH)
+    return _PACK
+
+
+def close_pack():
+    global _PACK, _STAMP
+    _PACK = None
+    _STAMP = None
+
+
+_STAMP = None
+
+
+def pack_stamp():
+    """
+    Content hash of the current pack (written by build_logo_pack), or
+    None when there is no pack or it predates stamps.
+    """
+    global _STAMP
+    if open_pack() is None or not os.path.exists(PACK_STAMP_PATH):
+        return None
+
+    if _STAMP is None:
+        with open(PACK_STAMP_PATH, "r", encoding="utf-8") as f:
+            _STAMP = f.read().strip()
+    return _STAMP
+
+
+def pack_lookup(path, kind, size, resample=PACK_RESAMPLE):
+    """
+    A read-only RGBA image backed directly by the mapped pack file, or
+    None when this logo/size (scaled with `resample`) is not packed.
+    No decode, no copy: pages come from the OS page cache, shared by
+    every process.
+    """
+    if resample != PACK_RESAMPLE:
+        return None
+    if os.path.dirname(os.path.abspath(path)) != LOGOS_DIR:
+        return None
+
+    pack = open_pack()
+    if pack is None:
+        return None
+
+    mm, index = pack
+    entry = index.get(pack_key(os.path.basename(path), kind, size))
+    if entry is None:
+        return None
+    return pack_image(mm, entry)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the raw RGBA logo pack.")
+    parser.add_argument("--kinds", nargs="+", choices=sorted(PACK_SIZES))
+    args = parser.parse_args()
+
+    build_logo_pack(args.kinds)
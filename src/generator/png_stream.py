@@ -0,0 +1,109 @@
+import zlib
+import struct
+
+import numpy as np
+
+
+# ---------------------------------------------------------
+#  INCREMENTAL PNG ENCODER
+# ---------------------------------------------------------
+# Pillow only encodes whole images, so band-streamed renders write
+# their own PNG: 8-bit RGB, rows filtered per band with the usual
+# minimum-sum heuristic, deflated as they arrive and flushed to the
+# output in IDAT chunks. Only the previous row is kept.
+#
+# WebP has no row-by-row encoder (libwebp wants the whole frame), so
+# big outputs are PNG only.
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Compressed bytes collected before an IDAT chunk is written
+IDAT_SIZE = 256 * 1024
+
+FILTER_NONE, FILTER_SUB, FILTER_UP, FILTER_PAETH = 0, 1, 2, 4
+
+
+def _chunk(kind, data):
+    body = kind + data
+    return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+
+def _paeth(left, up, up_left):
+    a, b, c = (v.astype(np.int16) for v in (left, up, up_left))
+    p = a + b - c
+    pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+    return np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, up_left))
+
+
+class PNGStreamWriter:
+    """
+    Writes an RGB PNG to the file-like `out` a band of rows at a time:
+
+        png = PNGStreamWriter(out, width, height)
+        png.write_rows(rgb)  # (rows, width, 3) uint8, top to bottom
+        png.close()
+    """
+
+    def __init__(self, out, width, height, level=6):
+        self.out = out
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self.compressor = zlib.compressobj(level)
+        self.pending = []
+        self.pending_size = 0
+        self.prev = np.zeros((width, 3), np.uint8)
+
+        ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+        out.write(PNG_SIGNATURE + _chunk(b"IHDR", ihdr))
+
+    def _filtered(self, rgb):
+        """The band with its best filter applied per row, filter byte first."""
+        rows = len(rgb)
+        up = np.concatenate([self.prev[None], rgb[:-1]])
+
+        left = np.zeros_like(rgb)
+        left[:, 1:] = rgb[:, :-1]
+        up_left = np.zeros_like(rgb)
+        up_left[:, 1:] = up[:, :-1]
+
+        # uint8 arithmetic wraps mod 256, as PNG filters do
+        candidates = np.stack([
+            rgb,
+            rgb - left,
+            rgb - up,
+            rgb - _paeth(left, up, up_left),
+        ])
+        cost = np.abs(candidates.view(np.int8).astype(np.int32)).sum(axis=(2, 3))
+        best = cost.argmin(axis=0)
+
+        out = np.empty((rows, 1 + self.width * 3), np.uint8)
+        out[:, 0] = np.array([FILTER_NONE, FILTER_SUB, FILTER_UP, FILTER_PAETH], np.uint8)[best]
+        out[:, 1:] = candidates[best, np.arange(rows)].reshape(rows, -1)
+        return out
+
+    def _emit(self, data, force=False):
+        if data:
+            self.pending.append(data)
+            self.pending_size += len(data)
+        if self.pending_size >= IDAT_SIZE or (force and self.pending_size):
+            self.out.write(_chunk(b"IDAT", b"".join(self.pending)))
+            self.pending = []
+            self.pending_size = 0
+
+    def write_rows(self, rgb):
+        if len(rgb) == 0:
+            return
+        if self.rows_written + len(rgb) > self.height:
+            raise ValueError("More rows than the image height.")
+
+        self._emit(self.compressor.compress(self._filtered(rgb).tobytes()))
+        self.prev = rgb[-1].copy()
+        self.rows_written += len(rgb)
+
+    def close(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"Wrote {self.rows_written} of {self.height} rows.")
+
+        self._emit(self.compressor.flush(), force=True)
+        self.out.write(_chunk(b"IEND", b""))
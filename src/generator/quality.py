@@ -0,0 +1,78 @@
+from PIL import Image
+
+from src.generator.wallpaper_base import (
+    add_logo_stroke,
+    load_logo,
+    load_stroked_logo,
+    scaled,
+    source_size,
+)
+from src.generator.timing import stage
+
+
+# ---------------------------------------------------------
+#  QUALITY TIERS
+# ---------------------------------------------------------
+# "full" is the normal output. "degraded" is the brownout tier the
+# server falls back to under overload: same layout, cheaper pixels.
+#
+#   bg_scale    gradients are drawn at this fraction of the size and
+#               upscaled (the per-pixel styles cost ~1/scale² less)
+#   resample    filter for that upscale and for hero logo scaling
+#   hero_stroke draw the white outline around the big logo
+#   png_level   zlib level for the PNG encode
+
+FULL = "full"
+DEGRADED = "degraded"
+
+TIERS = {
+    FULL: {
+        "bg_scale": 1.0,
+        "resample": Image.LANCZOS,
+        "hero_stroke": True,
+        "png_level": 6,
+    },
+    DEGRADED: {
+        "bg_scale": 0.25,
+        "resample": Image.BILINEAR,
+        "hero_stroke": False,
+        "png_level": 1,
+    },
+}
+
+
+def tier(quality):
+    return TIERS.get(quality, TIERS[FULL])
+
+
+def load_hero_logo(path, max_width, stroke_size, quality=FULL, scale=1.0, preview=False):
+    with stage("hero_load"):
+        return _hero_logo(path, max_width, stroke_size, quality, scale, preview)
+
+
+def _hero_logo(path, max_width, stroke_size, quality, scale, preview):
+    settings = tier(quality)
+
+    if scale != 1:
+        # Logos narrower than max_width are never upscaled at full
+        # size, so scale whatever width the full render would use
+        width = scaled(min(source_size(path)[0], max_width), scale)
+
+        # Device outputs come in a few fixed sizes and their strokes
+        # are the slowest stage; those go through the cache
+        if not preview and settings["hero_stroke"]:
+            return load_stroked_logo(path, max_width=width, stroke_size=scaled(stroke_size, scale))
+
+        logo = load_logo(path, width, resample=settings["resample"])
+
+        # Preview sizes are cheap to stroke; keep them out of the
+        # small full-size hero cache
+        if preview and settings["hero_stroke"]:
+            with stage("hero_stroke"):
+                logo = add_logo_stroke(logo, stroke_size=scaled(stroke_size, scale))
+        return logo
+
+    if not settings["hero_stroke"]:
+        return load_logo(path, max_width, resample=settings["resample"])
+
+    return load_stroked_logo(path, max_width=max_width, stroke_size=stroke_size)
@@ -0,0 +1,373 @@
+import os
+import json
+import hashlib
+from io import BytesIO
+
+import numpy as np
+
+from src.generator.wallpaper_base import asset_path, hex_to_rgb
+from src.generator.quality import FULL, tier
+from src.generator.cancel import cancel_scope, check_cancelled
+from src.generator.buffers import MemoryMeter, buffer_pool, memory_scope
+from src.generator.png_stream import PNGStreamWriter
+from src.generator.timing import stage, timing_scope
+from PIL import Image
+
+from src.generator.wallpaper_base import BAND_ROWS, draw_items, item_rows
+from src.generator.layouts import (
+    DEVICES,
+    draw_foreground,
+    generate_wallpaper,
+    layout_background,
+    layout_plan,
+    overlay_items,
+)
+
+
+# ---------------------------------------------------------
+#  RENDER SPECS
+# ---------------------------------------------------------
+# A spec is the canonical form of one /generate request: every
+# parameter that can change the output, and nothing else. Two
+# requests that render the same image get the same spec and key.
+
+# Every device in layouts.DEVICES
+DEVICE_TYPES = tuple(DEVICES)
+
+GRADIENT_STYLES = ("linear", "radial", "diamond", "fade", "split", "mirror", "noise")
+
+# Spec fields that only change the background, never the overlay
+BACKGROUND_FIELDS = ("mode", "color", "style", "color1", "color2", "angle", "noise_detail")
+
+# Styles whose output depends on the angle / noise detail
+ANGLE_STYLES = ("linear", "split", "mirror")
+NOISE_STYLES = ("noise",)
+
+# Bump when renderer output changes so old cache entries are ignored
+RENDER_VERSION = 2
+
+
+class SpecError(ValueError):
+    """Invalid render parameters."""
+
+
+def normalize_color(value):
+    if not value:
+        return None
+    value = value.strip()
+    if not value.startswith("#"):
+        value = "#" + value
+    try:
+        hex_to_rgb(value)
+    except ValueError:
+        raise SpecError(f"Invalid color: {value}")
+    if len(value) != 7:
+        raise SpecError(f"Invalid color: {value}")
+    return value.upper()
+
+
+def normalize_spec(
+    team=None,
+    type=None,
+    color=None,
+    gradient_enabled=0,
+    style="linear",
+    color1=None,
+    color2=None,
+    angle=0,
+    noise_detail=2,
+    stickerbomb=0,
+):
+    """
+    Validates /generate parameters and returns the canonical spec dict.
+    Raises SpecError for bad input.
+    """
+    if type not in DEVICE_TYPES:
+        raise SpecError("Invalid wallpaper type.")
+
+    if not team:
+        raise SpecError("Team is required.")
+
+    spec = {"team": team, "type": type}
+
+    if int(stickerbomb) == 1:
+        spec["mode"] = "stickerbomb"
+        return spec
+
+    if int(gradient_enabled):
+        spec["mode"] = "gradient"
+        spec["style"] = style if style in GRADIENT_STYLES else "linear"
+        spec["color1"] = normalize_color(color1)
+        spec["color2"] = normalize_color(color2)
+
+        if spec["style"] in ANGLE_STYLES:
+            spec["angle"] = int(angle)
+        if spec["style"] in NOISE_STYLES:
+            spec["noise_detail"] = int(noise_detail)
+        return spec
+
+    spec["mode"] = "solid"
+    spec["color"] = normalize_color(color)
+    return spec
+
+
+def spec_key(spec):
+    """Stable cache key for a spec."""
+    payload = json.dumps(spec, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha1(f"{RENDER_VERSION}:{payload}".encode("utf-8")).hexdigest()
+    return f"{spec['type']}-{digest}"
+
+
+# ---------------------------------------------------------
+#  TEAMS + SCHEDULES
+# ---------------------------------------------------------
+
+def available_teams():
+    """Names of teams that have both a logo and a schedule, sorted."""
+    logos_dir = asset_path("data/logos")
+    schedules_dir = asset_path("data/schedules")
+
+    teams = []
+    for file in os.listdir(logos_dir):
+        if not file.endswith(".png"):
+            continue
+
+        team_key = file.replace(".png", "")
+        if os.path.exists(os.path.join(schedules_dir, f"{team_key}.json")):
+            teams.append(team_key.replace("_", " "))
+
+    return sorted(teams)
+
+
+def load_schedule(team_name):
+    """Schedule JSON for a team. Raises FileNotFoundError if missing."""
+    filename = team_name.replace(" ", "_") + ".json"
+    path = asset_path(f"data/schedules/{filename}")
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No schedule found for {team_name}")
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_sources(spec):
+    """Raises FileNotFoundError if a file the spec needs is missing."""
+    team_key = spec["team"].replace(" ", "_")
+
+    if not os.path.exists(asset_path(f"data/logos/{team_key}.png")):
+        raise FileNotFoundError(f"No logo found for {spec['team']}")
+
+    if spec["mode"] != "stickerbomb":
+        if not os.path.exists(asset_path(f"data/schedules/{team_key}.json")):
+            raise FileNotFoundError(f"No schedule found for {spec['team']}")
+
+
+# ---------------------------------------------------------
+#  RENDERING
+# ---------------------------------------------------------
+
+def background_args(spec):
+    """Background keyword arguments for a spec."""
+    return {
+        "user_color": spec.get("color"),
+        "gradient_enabled": spec["mode"] == "gradient",
+        "style": spec.get("style", "linear"),
+        "color1": spec.get("color1"),
+        "color2": spec.get("color2"),
+        "angle": spec.get("angle", 0),
+        "noise_detail": spec.get("noise_detail", 2),
+        "stickerbomb": spec["mode"] == "stickerbomb",
+    }
+
+
+def render_wallpaper(spec, quality=FULL, scale=1.0):
+    """Renders a spec to a PIL image at the given quality tier and scale."""
+    team = spec["team"]
+    logo_path = f"data/logos/{team.replace(' ', '_')}.png"
+    stickerbomb = spec["mode"] == "stickerbomb"
+
+    return generate_wallpaper(
+        spec["type"],
+        team,
+        None if stickerbomb else load_schedule(team),
+        logo_path,
+        show_schedule=not stickerbomb,
+        quality=quality,
+        scale=scale,
+        **background_args(spec),
+    )
+
+
+def encode_png(img, quality=FULL):
+    img_bytes = BytesIO()
+    with stage("encode"):
+        img.save(img_bytes, format="PNG", compress_level=tier(quality)["png_level"])
+    return img_bytes.getvalue()
+
+
+def render_png(spec, quality=FULL, cancel=None, meter=None, timer=None):
+    """
+    Renders a spec straight to PNG bytes. Setting `cancel` (a
+    CancelToken) stops it at the next stage with RenderCancelled.
+    `meter` (a MemoryMeter) gets the render's pooled-buffer peak,
+    `timer` (a StageTimer) the time spent in each stage.
+
+    The canvas goes back to the buffer pool once it is encoded. The
+    big "banded" devices are band-streamed instead (see below).
+    """
+    meter = meter or MemoryMeter()
+
+    if layout_plan(spec["type"]).banded:
+        with cancel_scope(cancel), memory_scope(meter), timing_scope(timer):
+            png = render_banded_png(spec, quality)
+        buffer_pool.record_peak(meter)
+        return png
+
+    with cancel_scope(cancel), memory_scope(meter), timing_scope(timer):
+        img = render_wallpaper(spec, quality)
+        if id(img) not in meter.canvases:
+            meter.hold(img)  # stickerbomb art, degraded upscale
+        try:
+            check_cancelled()
+            png = encode_png(img, quality)
+        finally:
+            buffer_pool.release(img, spec["type"])
+
+    buffer_pool.record_peak(meter)
+    return png
+
+
+# ---------------------------------------------------------
+#  BAND-STREAMED OUTPUTS (4K, 5K, ULTRAWIDE)
+# ---------------------------------------------------------
+# A full 5K frame is ~60 MB before any intermediates. These outputs
+# are drawn BAND_ROWS rows at a time instead: background band, then
+# the overlay items crossing it, then straight into the PNG encoder.
+# Peak memory is a band plus the compressed output, whatever the size.
+
+def render_banded_png(spec, quality=FULL):
+    team = spec["team"]
+    logo_path = f"data/logos/{team.replace(' ', '_')}.png"
+    stickerbomb = spec["mode"] == "stickerbomb"
+    device = spec["type"]
+    plan = layout_plan(device)
+    width, height = plan.size
+
+    items = overlay_items(
+        plan,
+        None if stickerbomb else load_schedule(team),
+        logo_path,
+        stickerbomb=stickerbomb,
+        show_schedule=not stickerbomb,
+        quality=quality,
+    )
+    spans = [item_rows(item) for item in items]
+
+    with stage("background"):
+        background = layout_background(
+            plan,
+            logo_path,
+            quality=quality,
+            bands=True,
+            **background_args(spec),
+        )
+
+    out = BytesIO()
+    png = PNGStreamWriter(out, width, height, tier(quality)["png_level"])
+
+    with background as fill, \
+            buffer_pool.array((BAND_ROWS, width, 3), np.uint8, device) as rgb_buf:
+        for y0 in range(0, height, BAND_ROWS):
+            check_cancelled()
+            y1 = min(y0 + BAND_ROWS, height)
+            rgb = rgb_buf[:y1 - y0]
+            with stage("background"):
+                fill(y0, y1, rgb)
+
+            if any(first < y1 and last > y0 for first, last in spans):
+                band = Image.fromarray(rgb)
+                draw_items(band, items, top=y0)
+                rgb = np.asarray(band)
+
+            with stage("encode"):
+                png.write_rows(rgb)
+
+    with stage("encode"):
+        png.close()
+    return out.getvalue()
+
+
+# ---------------------------------------------------------
+#  PREVIEWS
+# ---------------------------------------------------------
+
+# Allowed /preview downscale factors (1/4, 1/8 of full size)
+PREVIEW_DIVISORS = (4, 8)
+
+
+def render_preview_png(spec, divisor=4):
+    """
+    The full pipeline (same layout, colors and logos) at 1/divisor
+    size, encoded for speed rather than size.
+    """
+    img = render_wallpaper(spec, scale=1 / divisor)
+    img_bytes = BytesIO()
+    img.save(img_bytes, format="PNG", compress_level=1)
+    return img_bytes.getvalue()
+
+
+# ---------------------------------------------------------
+#  LAYERS (LIVE PREVIEW SOCKET)
+# ---------------------------------------------------------
+# A wallpaper is a background plus an overlay (hero, schedule grid,
+# dates). Tweaking colors or gradients only changes the background,
+# so the socket keeps the overlay and redraws just that part.
+
+def overlay_key(spec):
+    """Everything the overlay depends on."""
+    return spec["team"], spec["type"], spec["mode"] == "stickerbomb"
+
+
+def background_key(spec):
+    return (spec["team"], spec["type"]) + tuple(spec.get(f) for f in BACKGROUND_FIELDS)
+
+
+def render_background(spec, scale=1.0):
+    team_key = spec["team"].replace(" ", "_")
+
+    return layout_background(
+        layout_plan(spec["type"], scale),
+        f"data/logos/{team_key}.png",
+        **background_args(spec),
+    )
+
+
+def render_overlay(spec, scale=1.0):
+    """The hero + schedule layer on a transparent RGBA canvas."""
+    team = spec["team"]
+    stickerbomb = spec["mode"] == "stickerbomb"
+    plan = layout_plan(spec["type"], scale)
+
+    canvas = Image.new("RGBA", plan.size, (0, 0, 0, 0))
+    draw_foreground(
+        canvas,
+        plan,
+        None if stickerbomb else load_schedule(team),
+        f"data/logos/{team.replace(' ', '_')}.png",
+        stickerbomb=stickerbomb,
+        show_schedule=not stickerbomb,
+    )
+    return canvas
+
+
+def composite_png(background, overlay):
+    """Flattens the layers into a fast-encoded PNG."""
+    frame = background.convert("RGBA")
+    if frame.size != overlay.size:
+        frame = frame.resize(overlay.size, Image.BILINEAR)
+    frame.alpha_composite(overlay)
+
+    img_bytes = BytesIO()
+    frame.convert("RGB").save(img_bytes, format="PNG", compress_level=1)
+    return img_bytes.getvalue()
@@ -0,0 +1,143 @@
+import os
+import glob
+import tempfile
+from src.generator.logo_pack import (
+    LOGOS_DIR,
+    logo_files,
+    map_rgba_pack,
+    pack_image,
+    pack_stamp,
+    write_rgba_pack,
+)
+
+
+# ---------------------------------------------------------
+#  SETTINGS
+# ---------------------------------------------------------
+
+# "0" turns the shared store off (every worker caches on its own)
+ENABLED = os.getenv("SHARED_LOGO_CACHE", "1") != "0"
+
+# RAM-backed on Linux; plain temp dir elsewhere
+SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+# Bump when the stroke or loader recipe changes
+STORE_VERSION = 2
+
+STORE_PREFIX = "cwg-logos-"
+
+# Schedule-grid logos every render touches:
+# (max_size, stroke_size) as used by the PC and mobile grids.
+# Only the stroked copies live here; the plain decoded ones are
+# already shared through the mapped logo pack.
+GRID_SIZES = ((115, 3), (150, 3))
+
+
+def store_key(kind, filename, size, stroke=0):
+    return f"{kind}|{filename}|{size}|{stroke}"
+
+
+def store_paths(stamp):
+    """
+    Store files for the logo pack with content hash `stamp`. The name
+    changes with the pack, so stale stores are never read.
+    """
+    base = os.path.join(SHM_DIR, f"{STORE_PREFIX}v{STORE_VERSION}-{stamp[:16]}")
+    return base + ".rgba", base + ".json", base + ".lock"
+
+
+def remove_stale_stores(current):
+    """Unlinks stores built for other packs or versions."""
+    keep = set(current)
+    for path in glob.glob(os.path.join(SHM_DIR, STORE_PREFIX + "*")):
+        if path in keep or path.endswith(".tmp"):
+            continue  # ours, or another process mid-build
+        try:
+            os.remove(path)  # processes still mapping it keep their pages
+        except OSError:
+            pass
+
+
+# ---------------------------------------------------------
+#  PRELOADER
+# ---------------------------------------------------------
+
+def build_items():
+    from src.generator.wallpaper_base import load_small_logo, add_logo_stroke
+
+    for filename in logo_files():
+        path = os.path.join(LOGOS_DIR, filename)
+        for size, stroke in GRID_SIZES:
+            logo = load_small_logo(path, max_size=size)
+            yield store_key("stroked", filename, size, stroke), add_logo_stroke(logo, stroke)
+
+
+def preload_shared_cache():
+    """
+    Fills the shared store once and maps it into this process.
+
+    Every worker calls this at startup; the first one to take the lock
+    builds the store (and drops stores left over from older packs), the
+    rest wait and then just map the finished file. Needs the logo pack:
+    the store is keyed by its content hash. Off on hosts without
+    fcntl (Windows); shared_lookup then always misses.
+    """
+    global _STORE
+    if not ENABLED:
+        return False
+
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    stamp = pack_stamp()
+    if stamp is None:
+        return False
+
+    paths = store_paths(stamp)
+    pack_path, index_path, lock_path = paths
+
+    with open(lock_path, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if not os.path.exists(index_path):
+                remove_stale_stores(paths)
+                count, size = write_rgba_pack(pack_path, index_path, build_items())
+                print(f"[shared cache] built {count} entries, {size / 1e6:.1f} MB")
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+    _STORE = map_rgba_pack(pack_path, index_path)
+    return _STORE is not None
+
+
+# ---------------------------------------------------------
+#  LOOKUP
+# ---------------------------------------------------------
+
+_STORE = None
+
+
+def shared_lookup(kind, path, size, stroke=0):
+    """
+    Read-only image from the shared store, or None. Only logos under
+    data/logos are stored.
+    """
+    if _STORE is None:
+        return None
+    if os.path.dirname(os.path.abspath(path)) != LOGOS_DIR:
+        return None
+
+    mm, index = _STORE
+    entry = index.get(store_key(kind, os.path.basename(path), size, stroke))
+    if entry is None:
+        return None
+    return pack_image(mm, entry)
+
+
+if __name__ == "__main__":
+    if preload_shared_cache():
+        print("Shared store:", store_paths(pack_stamp())[0])
+    else:
+        print("Shared store off (disabled, or no logo pack: python -m src.generator.logo_pack)")
@@ -2,7 +2,9 @@
 import os
 import random
 from PIL import Image, ImageFilter, ImageOps
-from src.generator.wallpaper_base import asset_path, load_small_logo
+from src.generator.wallpaper_base import asset_path, expand_to_frame, load_small_logo
+from src.generator.sticker_layout import plan_stickers
+from src.generator.sticker_render import render_plan
 
 # Solid charcoal background
 BG_COLOR = (17, 17, 17)
@@ -95,36 +97,20 @@ def split_sec_and_others(logos):
 # PASTE LOGOS
 # ============================================================
 
-def paste_random_logo(canvas, logo_path, WIDTH, HEIGHT):
-    """Helper to paste a logo multiple times with random size/rotation."""
-    for _ in range(random.randint(5, 8)):
-        try:
-            size = random.randint(70, 180)
-
-            # Load and resize logo
-            logo = load_small_logo(logo_path, max_size=size)
-
-            # Apply sticker border
-            logo = add_sticker_border(logo, border_size=12)
-
-            # Rotate for randomness
-            logo = logo.rotate(random.randint(-25, 25), expand=True)
-
-            # Random placement
-            x = random.randint(0, WIDTH - logo.width)
-            y = random.randint(0, HEIGHT - logo.height)
-
-            canvas.paste(logo, (x, y), logo)
-
-        except Exception:
-            continue
+def make_sticker(logo_path, size, angle):
+    """Loads, borders and rotates one sticker."""
+    # Back on its full frame: room for the border, and centred the
+    # way sticker_footprint() planned it
+    logo = expand_to_frame(load_small_logo(logo_path, max_size=size))
+    logo = add_sticker_border(logo, border_size=12)
+    return logo.rotate(angle, expand=True)
 
 
 # ============================================================
 # GENERATOR
 # ============================================================
 
-def generate_sticker_bomb(conferences, wallpaper_type):
+def generate_sticker_bomb(conferences, wallpaper_type, workers=None):
     if wallpaper_type not in SIZES:
         raise ValueError("Invalid type. Use 'pc' or 'mobile'.")
 
@@ -142,13 +128,10 @@ def generate_sticker_bomb(conferences, wallpaper_type):
     random.shuffle(other_logos)
     random.shuffle(sec_logos)
 
-    # 1️⃣ Draw all other conferences first
-    for logo_path in other_logos:
-        paste_random_logo(canvas, logo_path, WIDTH, HEIGHT)
-
-    # 2️⃣ Draw SEC logos last (on top)
-    for logo_path in sec_logos:
-        paste_random_logo(canvas, logo_path, WIDTH, HEIGHT)
+    # Other conferences first, SEC last (on top).
+    # Hidden stickers are dropped before anything is loaded.
+    plan = plan_stickers([other_logos, sec_logos], WIDTH, HEIGHT)
+    render_plan(canvas, plan, make_sticker, workers=workers)
 
     # Save result
     out_dir = ensure_output_dir()
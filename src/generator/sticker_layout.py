@@ -0,0 +1,234 @@
+# --- File: src/generator/sticker_layout.py
+import math
+import random
+import numpy as np
+from PIL import Image
+
+
+# ============================================================
+# PLACEMENT SETTINGS
+# ============================================================
+
+# Occupancy bitmap resolution (pixels per cell)
+CELL_SIZE = 16
+
+# Share of a sticker's footprint we treat as solidly opaque.
+# Logos are not rectangles, so only the centre of each sticker
+# is trusted to hide what is underneath it.
+CORE_FRACTION = 0.5
+
+# Stop planning once this share of the visible canvas is covered
+TARGET_COVERAGE = 0.97
+
+# Jittered-grid spacing relative to the average sticker footprint
+GRID_SPACING = 0.6
+
+# How many grid samples to try before accepting a covered spot
+MAX_SAMPLE_TRIES = 24
+
+
+# ============================================================
+# OCCUPANCY BITMAP
+# ============================================================
+
+class OccupancyGrid:
+    """
+    Coarse bitmap of which canvas cells are already hidden
+    under an opaque sticker core.
+    """
+
+    def __init__(self, width, height, region=None, cell=CELL_SIZE):
+        self.cell = cell
+        self.cols = math.ceil(width / cell)
+        self.rows = math.ceil(height / cell)
+        self.covered = np.zeros((self.rows, self.cols), dtype=bool)
+
+        # Only cells inside the visible region count toward coverage
+        left, top, right, bottom = region or (0, 0, width, height)
+        self.visible = (
+            left // cell, top // cell,
+            math.ceil(right / cell), math.ceil(bottom / cell),
+        )
+
+    def _cells(self, box, inner=False):
+        left, top, right, bottom = box
+        if inner:
+            # Only cells fully inside the box
+            c0, r0 = math.ceil(left / self.cell), math.ceil(top / self.cell)
+            c1, r1 = int(right // self.cell), int(bottom // self.cell)
+        else:
+            # Every cell the box touches
+            c0, r0 = int(left // self.cell), int(top // self.cell)
+            c1, r1 = math.ceil(right / self.cell), math.ceil(bottom / self.cell)
+
+        vl, vt, vr, vb = self.visible
+        return max(c0, vl), max(r0, vt), min(c1, vr), min(r1, vb)
+
+    def is_hidden(self, box):
+        """True if every visible cell under box is already covered."""
+        c0, r0, c1, r1 = self._cells(box)
+        if c0 >= c1 or r0 >= r1:
+            return True  # entirely outside the visible region
+        return bool(self.covered[r0:r1, c0:c1].all())
+
+    def is_covered_point(self, x, y):
+        c, r = int(x // self.cell), int(y // self.cell)
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            return True
+        return bool(self.covered[r, c])
+
+    def mark(self, box):
+        c0, r0, c1, r1 = self._cells(box, inner=True)
+        if c0 < c1 and r0 < r1:
+            self.covered[r0:r1, c0:c1] = True
+
+    def coverage(self):
+        vl, vt, vr, vb = self.visible
+        return float(self.covered[vt:vb, vl:vr].mean())
+
+
+# ============================================================
+# SAMPLING
+# ============================================================
+
+def jittered_grid(width, height, spacing, rng):
+    """
+    Endless stream of sample points: one jittered point per grid
+    cell, cells visited in random order, a fresh pass each time.
+    """
+    cols = max(1, math.ceil(width / spacing))
+    rows = max(1, math.ceil(height / spacing))
+    cells = [(c, r) for r in range(rows) for c in range(cols)]
+
+    while True:
+        rng.shuffle(cells)
+        for c, r in cells:
+            x = min((c + rng.random()) * spacing, width - 1)
+            y = min((r + rng.random()) * spacing, height - 1)
+            yield x, y
+
+
+# ============================================================
+# STICKER FOOTPRINTS
+# ============================================================
+
+_LOGO_SIZES = {}
+
+
+def logo_size(path):
+    """Source dimensions, read from the PNG header only."""
+    if path not in _LOGO_SIZES:
+        with Image.open(path) as img:
+            _LOGO_SIZES[path] = img.size
+    return _LOGO_SIZES[path]
+
+
+def sticker_footprint(path, size, angle):
+    """
+    Approximate (w, h) of a sticker after it is thumbnailed to
+    `size` and rotated with expand=True.
+    """
+    w, h = logo_size(path)
+    ratio = min(size / w, size / h, 1)
+    w, h = w * ratio, h * ratio
+
+    rad = math.radians(angle)
+    cos, sin = abs(math.cos(rad)), abs(math.sin(rad))
+    return w * cos + h * sin, w * sin + h * cos, min(w, h)
+
+
+def sticker_origin(placement, sticker, width, height):
+    """
+    Top-left paste position for a prepared sticker image,
+    centred on the planned point and kept inside the canvas.
+    """
+    x = int(placement["x"] - sticker.width / 2)
+    y = int(placement["y"] - sticker.height / 2)
+    x = min(max(x, 0), max(width - sticker.width, 0))
+    y = min(max(y, 0), max(height - sticker.height, 0))
+    return x, y
+
+
+# ============================================================
+# PLACEMENT ENGINE
+# ============================================================
+
+def plan_stickers(
+    logo_groups,
+    width,
+    height,
+    copies=(5, 8),
+    sizes=(70, 180),
+    angles=(-25, 25),
+    region=None,
+    target_coverage=TARGET_COVERAGE,
+    seed=None,
+):
+    """
+    Builds a sticker placement plan for a canvas.
+
+    `logo_groups` is a list of logo path lists in paint order
+    (first group ends up at the bottom, last group on top).
+
+    Stickers are planned front-to-back: the top-most sticker is
+    placed first and each one below it is dropped when the cells
+    it would touch are already hidden. Planning stops once
+    `target_coverage` of the visible region is covered.
+
+    Returns a list of placements in paint order (bottom → top):
+        {"path", "size", "angle", "x", "y"}
+    where (x, y) is the sticker centre.
+    """
+    rng = random.Random(seed)
+
+    # Paint-order stack, exactly like the old paste loop built it
+    stack = []
+    for group in logo_groups:
+        for path in group:
+            for _ in range(rng.randint(*copies)):
+                stack.append({
+                    "path": path,
+                    "size": rng.randint(*sizes),
+                    "angle": rng.randint(*angles),
+                })
+
+    if not stack:
+        return []
+
+    grid = OccupancyGrid(width, height, region=region)
+    spacing = max(sum(sizes) / 2 * GRID_SPACING, CELL_SIZE)
+    points = jittered_grid(width, height, spacing, rng)
+
+    planned = []
+    for sticker in reversed(stack):
+        try:
+            fw, fh, short = sticker_footprint(
+                sticker["path"], sticker["size"], sticker["angle"]
+            )
+        except Exception:
+            continue
+
+        # Prefer sample points that still land on a gap
+        for _ in range(MAX_SAMPLE_TRIES):
+            x, y = next(points)
+            if not grid.is_covered_point(x, y):
+                break
+
+        # Keep the whole sticker on the canvas
+        x = min(max(x, fw / 2), max(width - fw / 2, fw / 2))
+        y = min(max(y, fh / 2), max(height - fh / 2, fh / 2))
+
+        box = (x - fw / 2, y - fh / 2, x + fw / 2, y + fh / 2)
+        if grid.is_hidden(box):
+            continue  # fully occluded by stickers above
+
+        core = short * CORE_FRACTION / 2
+        grid.mark((x - core, y - core, x + core, y + core))
+
+        planned.append(dict(sticker, x=x, y=y))
+
+        if grid.coverage() >= target_coverage:
+            break
+
+    planned.reverse()
+    return planned
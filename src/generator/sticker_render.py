@@ -0,0 +1,149 @@
+# --- File: src/generator/sticker_render.py
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from src.generator.sticker_layout import sticker_footprint, sticker_origin
+
+
+# ============================================================
+# SPRITE BANK
+# ============================================================
+
+# Prepared stickers keyed by (path, size, angle). The parent fills it
+# with stickers that straddle a band edge before forking, so workers
+# share those copy-on-write instead of each building their own.
+_SPRITES = {}
+
+
+def sprite_key(placement):
+    return placement["path"], placement["size"], placement["angle"]
+
+
+def get_sprite(make_sticker, placement):
+    key = sprite_key(placement)
+    if key in _SPRITES:
+        return _SPRITES[key]
+    return make_sticker(*key)
+
+
+def paste_plan(canvas, plan, make_sticker, width, height, offset_y=0):
+    """
+    Pastes placements onto `canvas`. Positions are computed on the full
+    width × height canvas and shifted up by `offset_y`, so a band only
+    receives the part of each sticker that falls inside it.
+    """
+    for placement in plan:
+        try:
+            logo = get_sprite(make_sticker, placement)
+            x, y = sticker_origin(placement, logo, width, height)
+            canvas.paste(logo, (x, y - offset_y), logo)
+
+        except Exception:
+            continue
+
+
+# ============================================================
+# BAND SPLITTING
+# ============================================================
+
+def split_bands(height, count):
+    """Even horizontal bands as (top, bottom) pairs."""
+    count = max(1, min(count, height))
+    edges = [height * i // count for i in range(count + 1)]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def plan_for_band(plan, top, bottom, margin):
+    """
+    Placements whose footprint (plus `margin` for sprite size rounding)
+    crosses the band. Paint order is kept.
+    """
+    selected = []
+    for placement in plan:
+        try:
+            _, fh, _ = sticker_footprint(
+                placement["path"], placement["size"], placement["angle"]
+            )
+        except Exception:
+            continue
+
+        half = fh / 2 + margin
+        if placement["y"] + half > top and placement["y"] - half < bottom:
+            selected.append(placement)
+    return selected
+
+
+# ============================================================
+# WORKERS
+# ============================================================
+
+def _render_band(job):
+    make_sticker, base, top, plan, width, height = job
+    mode, size, data = base
+
+    band = Image.frombytes(mode, size, data)
+    paste_plan(band, plan, make_sticker, width, height, offset_y=top)
+    return top, band.tobytes()
+
+
+def _pool_context():
+    # Fork shares the parent's sprite bank; fall back where unavailable
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+# ============================================================
+# RENDERER
+# ============================================================
+
+def render_plan(canvas, plan, make_sticker, workers=None, margin=8):
+    """
+    Renders a placement plan onto `canvas` in place.
+
+    With workers > 1 the canvas is cut into horizontal bands, each band
+    is rendered in its own process from the stickers that touch it,
+    and the bands are stitched back together. The result matches the
+    serial render because every band replays the same paint order.
+    """
+    width, height = canvas.size
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(plan) < 2:
+        paste_plan(canvas, plan, make_sticker, width, height)
+        return canvas
+
+    jobs = []
+    seen = set()
+    for top, bottom in split_bands(height, workers):
+        base = canvas.crop((0, top, width, bottom))
+        band_plan = plan_for_band(plan, top, bottom, margin)
+
+        # Stickers needed by more than one band go in the shared bank
+        for placement in band_plan:
+            key = sprite_key(placement)
+            if key in seen and key not in _SPRITES:
+                _SPRITES[key] = make_sticker(*key)
+            seen.add(key)
+
+        jobs.append((
+            make_sticker,
+            (base.mode, base.size, base.tobytes()),
+            top,
+            band_plan,
+            width,
+            height,
+        ))
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+            for (top, data), job in zip(pool.map(_render_band, jobs), jobs):
+                mode, size, _ = job[1]
+                canvas.paste(Image.frombytes(mode, size, data), (0, top))
+    finally:
+        _SPRITES.clear()
+
+    return canvas
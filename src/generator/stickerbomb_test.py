@@ -1,7 +1,9 @@
 import os
 import random
 from PIL import Image, ImageFilter
-from src.generator.wallpaper_base import asset_path, load_small_logo
+from src.generator.wallpaper_base import asset_path, expand_to_frame, load_small_logo
+from src.generator.sticker_layout import plan_stickers
+from src.generator.sticker_render import render_plan
 
 
 # ============================================================
@@ -47,44 +49,31 @@ def get_all_logos():
 # HIGH-QUALITY PASTE LOGO
 # ============================================================
 
-def paste_random_logo(canvas, logo_path, WIDTH, HEIGHT):
-    """Paste 5–8 logos randomly, no border."""
-    for _ in range(random.randint(5, 8)):
-        try:
-            size = random.randint(70, 180)
+def make_sticker(logo_path, size, angle):
+    """Load, resize and rotate one sticker, no border."""
+    # Load & resize with highest quality filter
+    logo = expand_to_frame(load_small_logo(logo_path, max_size=size))
+    logo = logo.resize(
+        (logo.width, logo.height),
+        resample=Image.Resampling.LANCZOS
+    )
 
-            # Load & resize with highest quality filter
-            logo = load_small_logo(logo_path, max_size=size)
-            logo = logo.resize(
-                (logo.width, logo.height),
-                resample=Image.Resampling.LANCZOS
-            )
+    # NO border — passthrough
+    logo = add_sticker_border(logo, border_size=0)
 
-            # NO border — passthrough
-            logo = add_sticker_border(logo, border_size=0)
-
-            # High-quality rotation
-            logo = logo.rotate(
-                random.randint(-25, 25),
-                expand=True,
-                resample=Image.Resampling.BICUBIC
-            )
-
-            # Random placement
-            x = random.randint(0, WIDTH - logo.width)
-            y = random.randint(0, HEIGHT - logo.height)
-
-            canvas.paste(logo, (x, y), logo)
-
-        except Exception:
-            continue
+    # High-quality rotation
+    return logo.rotate(
+        angle,
+        expand=True,
+        resample=Image.Resampling.BICUBIC
+    )
 
 
 # ============================================================
 # GENERATOR
 # ============================================================
 
-def generate_stickerbomb(type_):
+def generate_stickerbomb(type_, workers=None):
     if type_ not in TARGET_SIZES:
         raise ValueError("Invalid type: 'pc' or 'mobile'")
 
@@ -102,16 +91,20 @@ def generate_stickerbomb(type_):
     logos = get_all_logos()
     random.shuffle(logos)
 
-    # Paste logos with improved quality
-    for logo_path in logos:
-        paste_random_logo(canvas, logo_path, WORK_W, WORK_H)
-
-    # Crop to final resolution
+    # Final crop window
     left = (WORK_W - TRIM_W) // 2
     top = (WORK_H - TRIM_H) // 2
     right = left + TRIM_W
     bottom = top + TRIM_H
 
+    # Plan placements; stickers hidden or outside the crop are skipped
+    plan = plan_stickers(
+        [logos], WORK_W, WORK_H, region=(left, top, right, bottom)
+    )
+
+    # Paste logos with improved quality
+    render_plan(canvas, plan, make_sticker, workers=workers)
+
     final_img = canvas.crop((left, top, right, bottom))
 
     # SAVE INTO /data/stickerbomb
@@ -0,0 +1,50 @@
+import os
+
+from src.generator.teams import TEAMS_2025, match_logo_to_team
+from src.generator.wallpaper_base import get_team_colors_from_logo, hex_to_rgb
+
+
+# ---------------------------------------------------------
+#  TEAM COLOR INDEX
+# ---------------------------------------------------------
+# Default colors for a logo: the school's official `color` and
+# `alternateColor` from teams_2025.json when it has an entry (joined
+# to logo files with the teams.py matcher), else the average of the
+# logo's pixels. The official half is built once at import, so most
+# default-color renders do no image work for their colors.
+
+def _official_colors():
+    matches = []
+    for team in TEAMS_2025:
+        try:
+            primary = hex_to_rgb(team.get("color"))
+            secondary = hex_to_rgb(team.get("alternateColor"))
+        except ValueError:
+            continue
+        if primary and secondary:
+            logo = match_logo_to_team(team["school"])
+            exact = logo == team["school"].replace(" ", "_") + ".png"
+            matches.append((not exact, logo, (primary, secondary)))
+
+    # One school per logo, exact name matches first: the matcher's
+    # fuzzy fallback can point a school without a logo of its own at
+    # another school's
+    index = {}
+    for _, logo, colors in sorted(matches, key=lambda m: m[0]):
+        index.setdefault(logo, colors)
+    return index
+
+
+OFFICIAL_COLORS = _official_colors()
+
+
+def team_colors(logo_path):
+    """(primary, secondary) RGB for a logo path under data/logos."""
+    official = OFFICIAL_COLORS.get(os.path.basename(logo_path))
+    if official:
+        return official
+    return get_team_colors_from_logo(logo_path)
+
+
+def team_color_source(logo_path):
+    return "official" if os.path.basename(logo_path) in OFFICIAL_COLORS else "logo"
@@ -0,0 +1,38 @@
+from src.generator.layouts import layout_plan
+from src.generator.render import normalize_spec, render_wallpaper
+from src.generator.wallpaper_base import _stroked_logo
+
+
+# ---------------------------------------------------------
+#  TESTS
+# ---------------------------------------------------------
+
+def test_android_hero_stroke_is_cached():
+    # android's layout scale is below 1 but it's a device size, not a preview
+    assert layout_plan("android").unit < 1
+
+    spec = normalize_spec(team="Alabama", type="android")
+    _stroked_logo.cache_clear()
+
+    render_wallpaper(spec)
+    first = _stroked_logo.cache_info()
+    render_wallpaper(spec)
+    second = _stroked_logo.cache_info()
+
+    assert first.misses == 1
+    assert second.misses == 1 and second.hits == first.hits + 1
+
+
+def test_preview_hero_stays_out_of_the_cache():
+    spec = normalize_spec(team="Alabama", type="pc")
+    _stroked_logo.cache_clear()
+
+    render_wallpaper(spec, scale=1 / 4)
+    assert _stroked_logo.cache_info().currsize == 0
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print("[OK]", name)
@@ -0,0 +1,73 @@
+import time
+import threading
+from contextlib import contextmanager
+
+
+# ---------------------------------------------------------
+#  STAGE TIMERS
+# ---------------------------------------------------------
+# Where a render's time goes, by named stage:
+#
+#   background   gradient / solid / stickerbomb fill
+#   hero_load    decoding and scaling the big logo
+#   hero_stroke  its white outline
+#   grid         schedule logos: loading, stroking, pasting (the
+#                hero paste is counted here too)
+#   text         the dates
+#   encode       PNG encode
+#
+# The server adds "cache" (lookup) and "queue" (waiting for a render
+# slot). A render runs on one thread, so the timer it reports to is
+# thread-local like the cancel token. Stages are exclusive: time in a
+# stage nested inside another only counts toward the inner one.
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}  # name -> seconds
+        self.stack = []
+        self.mark = 0.0
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def _charge(self, now):
+        self.add(self.stack[-1], now - self.mark)
+        self.mark = now
+
+    @contextmanager
+    def stage(self, name):
+        now = time.perf_counter()
+        if self.stack:
+            self._charge(now)  # pause the enclosing stage
+        self.stack.append(name)
+        self.mark = now
+        try:
+            yield
+        finally:
+            self._charge(time.perf_counter())
+            self.stack.pop()
+
+
+_local = threading.local()
+
+
+@contextmanager
+def timing_scope(timer):
+    """Makes `timer` the one stages on this thread report to."""
+    previous = getattr(_local, "timer", None)
+    _local.timer = timer
+    try:
+        yield timer
+    finally:
+        _local.timer = previous
+
+
+@contextmanager
+def stage(name):
+    """Times the with-block as `name`; a no-op outside a timing_scope."""
+    timer = getattr(_local, "timer", None)
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
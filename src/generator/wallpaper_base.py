@@ -1,8 +1,16 @@
 import os
 import math
-from PIL import Image, ImageDraw, ImageFilter
+from contextlib import contextmanager
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
 from scipy.ndimage import binary_dilation
 import numpy as np
+from src.generator.logo_assets import logo_entry, load_trimmed, thumbnail_size
+from src.generator.logo_pack import pack_lookup
+from src.generator.buffers import buffer_pool
+from src.generator.cancel import check_cancelled
+from src.generator.timing import stage
+from src.generator.shared_cache import shared_lookup
 
 
 # ---------------------------------------------------------
@@ -21,6 +29,11 @@ def asset_path(relative_path):
 #  COLOR HELPERS
 # ---------------------------------------------------------
 
+def scaled(value, scale):
+    """A layout size at `scale`, never below 1px."""
+    return value if scale == 1 else max(1, round(value * scale))
+
+
 def hex_to_rgb(hex_color):
     if not hex_color:
         return None
@@ -41,20 +54,43 @@ def darken(rgb, pct):
 #  LOGO LOADING (MAIN + SMALL)
 # ---------------------------------------------------------
 
-def load_logo(path, max_width):
+def source_size(path):
+    """Original logo size, from the mip index or the PNG header."""
+    entry = logo_entry(path)
+    if entry:
+        return tuple(entry["size"])
+    with Image.open(path) as img:
+        return img.size
+
+
+def load_logo(path, max_width, resample=Image.LANCZOS):
     """
     Loads a PNG logo and scales it down preserving aspect ratio.
     Always returns RGBA.
+
+    When the trimmed pyramid is built the result only covers the
+    logo's alpha bbox; see logo_frame() / paste_logo().
     """
     path = asset_path(path) if not os.path.isabs(path) else path
 
-    img = Image.open(path).convert("RGBA")
-    w, h = img.size
+    # Already decoded in the mapped logo pack?
+    packed = pack_lookup(path, "logo", max_width, resample)
+    if packed is not None:
+        return packed
 
+    w, h = source_size(path)
+    frame = (w, h)
     if w > max_width:
         ratio = max_width / w
-        img = img.resize((int(w * ratio), int(h * ratio)), Image.LANCZOS)
+        frame = (int(w * ratio), int(h * ratio))
+
+    trimmed = load_trimmed(path, frame, resample)
+    if trimmed is not None:
+        return trimmed
 
+    img = Image.open(path).convert("RGBA")
+    if img.size != frame:
+        img = img.resize(frame, resample)
     return img
 
 
@@ -69,11 +105,120 @@ def load_small_logo(path, max_size=150):
     if not os.path.exists(absolute_path):
         absolute_path = fallback_path
 
+    packed = pack_lookup(absolute_path, "small", max_size)
+    if packed is not None:
+        return packed
+
+    size = source_size(absolute_path)
+    frame = thumbnail_size(size, (max_size, max_size)) or size
+
+    trimmed = load_trimmed(absolute_path, frame)
+    if trimmed is not None:
+        return trimmed
+
     img = Image.open(absolute_path).convert("RGBA")
     img.thumbnail((max_size, max_size), Image.LANCZOS)
     return img
 
 
+# ---------------------------------------------------------
+#  TRIMMED LOGO PLACEMENT
+# ---------------------------------------------------------
+
+def logo_frame(img):
+    """
+    (frame_w, frame_h, x, y) of a loaded logo: its untrimmed size and
+    where its pixels sit inside that frame.
+    """
+    return img.info.get("frame", (img.width, img.height, 0, 0))
+
+
+def paste_logo(bg, logo, position):
+    """Pastes a logo so that its untrimmed frame lands at `position`."""
+    _, _, ox, oy = logo_frame(logo)
+    x, y = position[0] + ox, position[1] + oy
+
+    if bg.mode == "RGBA":
+        # Transparent overlay layer: blend instead of overwriting alpha
+        bg.alpha_composite(logo, (max(x, 0), max(y, 0)), (max(-x, 0), max(-y, 0)))
+        return
+
+    bg.paste(logo, (x, y), logo)
+
+
+# ---------------------------------------------------------
+#  OVERLAY ITEMS
+# ---------------------------------------------------------
+# Foregrounds (hero, grid logos, dates) are built as a list of placed
+# items and then drawn, so a band-streamed render can draw just the
+# items that cross each band.
+#
+#   ("logo", img, (x, y))
+#   ("text", (x, y), text, font, fill, stroke_color, stroke_width)
+
+def draw_text_with_stroke(draw, position, text, font,
+                          fill, stroke_color, stroke_width=2):
+    x, y = position
+
+    for dx in (-stroke_width, 0, stroke_width):
+        for dy in (-stroke_width, 0, stroke_width):
+            if dx != 0 or dy != 0:
+                draw.text((x + dx, y + dy),
+                          text,
+                          font=font,
+                          fill=stroke_color,
+                          anchor="mm")
+
+    draw.text((x, y), text, font=font, fill=fill, anchor="mm")
+
+
+def item_rows(item):
+    """(top, bottom) canvas rows an item touches."""
+    if item[0] == "logo":
+        _, logo, (_, y) = item
+        _, _, _, oy = logo_frame(logo)
+        return y + oy, y + oy + logo.height
+
+    _, (_, y), text, font, _, _, stroke_width = item
+    _, top, _, bottom = font.getbbox(text, anchor="mm")
+    return y + top - stroke_width, y + bottom + stroke_width
+
+
+def draw_items(canvas, items, top=0):
+    """
+    Draws overlay items onto `canvas`, which holds the rows starting
+    at `top` (0 for a full frame, the band's first row for a band).
+    """
+    draw = None
+    for item in items:
+        first, last = item_rows(item)
+        if last <= top or first >= top + canvas.height:
+            continue
+
+        if item[0] == "logo":
+            _, logo, (x, y) = item
+            with stage("grid"):
+                paste_logo(canvas, logo, (x, y - top))
+        else:
+            _, (x, y), text, font, fill, stroke_color, stroke_width = item
+            draw = draw or ImageDraw.Draw(canvas)
+            with stage("text"):
+                draw_text_with_stroke(draw, (x, y - top), text, font,
+                                      fill=fill, stroke_color=stroke_color,
+                                      stroke_width=stroke_width)
+
+
+def expand_to_frame(img):
+    """Puts a trimmed logo back on its full transparent frame."""
+    fw, fh, ox, oy = logo_frame(img)
+    if (fw, fh) == img.size:
+        return img
+
+    out = Image.new("RGBA", (fw, fh), (0, 0, 0, 0))
+    out.paste(img, (ox, oy))
+    return out
+
+
 # ---------------------------------------------------------
 #  PERFECT WHITE OUTLINE STROKE
 # ---------------------------------------------------------
@@ -93,18 +238,14 @@ def add_logo_stroke(img, stroke_size=6, stroke_color=(255, 255, 255)):
     alpha = img.split()[3]
 
     # Create a mask of the stroke (solid dilation)
-    import numpy as np
-    alpha_np = np.array(alpha)
-
-    # Create structuring element for dilation
-    from scipy.ndimage import binary_dilation
+    alpha_np = np.asarray(alpha)
 
     mask = alpha_np > 0
     stroke_mask = binary_dilation(mask, iterations=stroke_size)
 
-    # Convert back to image
+    # Convert back to image (uint8 all the way, no int64 temporaries)
     stroke_img = Image.new("RGBA", (w, h), stroke_color + (0,))
-    stroke_alpha = Image.fromarray((stroke_mask * 255).astype("uint8"))
+    stroke_alpha = Image.fromarray(stroke_mask.view(np.uint8) * np.uint8(255))
     stroke_img.putalpha(stroke_alpha)
 
     # Composite stroke BELOW the logo
@@ -112,21 +253,67 @@ def add_logo_stroke(img, stroke_size=6, stroke_color=(255, 255, 255)):
     out.alpha_composite(stroke_img)
     out.alpha_composite(img)
 
+    if "frame" in img.info:
+        out.info["frame"] = img.info["frame"]
+
     return out
 
 
 
+# ---------------------------------------------------------
+#  CACHED STROKED LOGOS + FONTS
+# ---------------------------------------------------------
+# Returned images are shared between requests: paste from them,
+# never draw on them.
+
+@lru_cache(maxsize=8)
+def _stroked_logo(path, max_width, stroke_size):
+    logo = load_logo(path, max_width)
+    with stage("hero_stroke"):
+        return add_logo_stroke(logo, stroke_size=stroke_size)
+
+
+@lru_cache(maxsize=256)
+def _stroked_small_logo(path, max_size, stroke_size):
+    return add_logo_stroke(load_small_logo(path, max_size), stroke_size=stroke_size)
+
+
+def load_stroked_logo(path, max_width, stroke_size):
+    """load_logo() + add_logo_stroke(), cached per process."""
+    path = asset_path(path) if not os.path.isabs(path) else path
+    return _stroked_logo(path, max_width, stroke_size)
+
+
+def load_stroked_small_logo(path, max_size, stroke_size):
+    """
+    load_small_logo() + add_logo_stroke(). Served from the shared
+    cross-worker store when preloaded, else cached per process.
+    """
+    path = asset_path(path) if not os.path.isabs(path) else path
+    if not os.path.exists(path):
+        path = asset_path("data/logos/fallback.png")
+
+    shared = shared_lookup("stroked", path, max_size, stroke_size)
+    if shared is not None:
+        return shared
+
+    return _stroked_small_logo(path, max_size, stroke_size)
+
+
+@lru_cache(maxsize=16)
+def load_font(path, size):
+    return ImageFont.truetype(path, size)
+
+
 # ---------------------------------------------------------
 #  TEAM COLOR EXTRACTION (AVERAGE)
 # ---------------------------------------------------------
 
+@lru_cache(maxsize=128)
 def get_team_colors_from_logo(logo_path):
     path = asset_path(logo_path)
-    img = Image.open(path).convert("RGB")
-    pixels = list(img.getdata())
-    r = sum(p[0] for p in pixels) // len(pixels)
-    g = sum(p[1] for p in pixels) // len(pixels)
-    b = sum(p[2] for p in pixels) // len(pixels)
+    pixels = np.asarray(Image.open(path).convert("RGB")).reshape(-1, 3)
+    r, g, b = (int(v) for v in pixels.sum(axis=0, dtype=np.int64) // len(pixels))
     primary = (r, g, b)
     secondary = (max(r - 40, 0), max(g - 40, 0), max(b - 40, 0))
     return primary, secondary
@@ -136,186 +323,427 @@ def get_team_colors_from_logo(logo_path):
 #  SOLID BACKGROUND
 # ---------------------------------------------------------
 
-def create_solid_background(width, height, color):
-    return Image.new("RGB", (width, height), color)
+def create_solid_background(width, height, color, device=None):
+    return buffer_pool.canvas((width, height), color, device)
 
 
 # ---------------------------------------------------------
-#  GRADIENT GENERATORS
+#  BAND FILLS
 # ---------------------------------------------------------
+# Backgrounds are produced BAND_ROWS rows at a time. A fill is a
+# context manager yielding fill(y0, y1, rgb), which writes rows
+# y0..y1 into a (rows, width, 3) uint8 array; its pooled scratch
+# arrays live as long as the with-block. The full-frame generators
+# paste the bands into one canvas; band-streamed renders
+# (render.render_banded_png) encode each band as soon as it is drawn,
+# so neither ever holds a full-size float buffer.
+#
+# Color math is float32 (it ends up 8-bit anyway); the rotated styles
+# use Pillow's own fixed-point math so rows land where rotate() put them.
+
+BAND_ROWS = 64
+
+
+def _lerp_lut(color1, color2, t):
+    """(len(t), 3) uint8 colors, int(c1 * (1 - t) + c2 * t) per entry."""
+    c1 = np.array(color1, np.float64)
+    c2 = np.array(color2, np.float64)
+    t = t[:, None]
+    return (c1 * (1 - t) + c2 * t).astype(np.uint8)
+
+
+def _fill_bands(canvas, fill, device):
+    """Draws a whole canvas band by band with fill()."""
+    width, height = canvas.size
+    with buffer_pool.array((BAND_ROWS, width, 3), np.uint8, device) as rgb_buf:
+        for y0 in range(0, height, BAND_ROWS):
+            check_cancelled()
+            y1 = min(y0 + BAND_ROWS, height)
+            rgb = rgb_buf[:y1 - y0]
+            fill(y0, y1, rgb)
+            canvas.paste(Image.fromarray(rgb), (0, y0))
+
+
+def _draw(width, height, fill_cm, device):
+    """A pooled canvas drawn by the fill context manager `fill_cm`."""
+    canvas = buffer_pool.canvas((width, height), device=device)
+    with fill_cm as fill:
+        _fill_bands(canvas, fill, device)
+    return canvas
+
+
+@contextmanager
+def solid_fill(color):
+    def fill(y0, y1, rgb):
+        rgb[:] = color
+
+    yield fill
+
+
+def cover_box(src_size, size):
+    """The centered region of src_size with the aspect ratio of `size`."""
+    sw, sh = src_size
+    w, h = size
+    if sw * h > sh * w:
+        cw = sh * w / h
+        return ((sw - cw) / 2, 0, (sw + cw) / 2, sh)
+    ch = sw * h / w
+    return (0, (sh - ch) / 2, sw, (sh + ch) / 2)
+
+
+@contextmanager
+def image_fill(img, width, height, resample=Image.LANCZOS, box=None):
+    """
+    Bands of `img` (or its `box` region) resized to width x height,
+    one band at a time.
+    """
+    left, top, right, bottom = box or (0, 0) + img.size
+    sy = (bottom - top) / height
+
+    def fill(y0, y1, rgb):
+        if (right - left, bottom - top) == (width, height):
+            band = img.crop((left, top + y0, right, top + y1))
+        else:
+            band = img.resize((width, y1 - y0), resample,
+                              box=(left, top + y0 * sy, right, top + y1 * sy))
+        rgb[:] = np.asarray(band.convert("RGB"))
+
+    yield fill
+
+
+@contextmanager
+def _releasing(fill_cm, img, device=None):
+    """The fill context manager `fill_cm`; hands pooled `img` back after it."""
+    try:
+        with fill_cm as fill:
+            yield fill
+    finally:
+        buffer_pool.release(img, device)
 
-def create_linear_gradient(width, height, color1, color2, angle):
-    diag = int(math.sqrt(width ** 2 + height ** 2))
-    base = Image.new("RGB", (diag, diag))
-    draw = ImageDraw.Draw(base)
 
-    for y in range(diag):
-        t = y / (diag - 1)
-        r = int(color1[0] * (1 - t) + color2[0] * t)
-        g = int(color1[1] * (1 - t) + color2[1] * t)
-        b = int(color1[2] * (1 - t) + color2[2] * t)
-        draw.line([(0, y), (diag, y)], fill=(r, g, b))
+@contextmanager
+def _shade_fill(width, color1, color2, fill_t, device):
+    """
+    Colors c1 → c2 by a per-pixel t in [0, 1]; fill_t(y0, y1, t)
+    writes t for rows y0..y1 into a float32 band.
+    """
+    c1 = np.array(color1, np.float32)
+    step = np.array(color2, np.float32) - c1
+
+    with buffer_pool.array((BAND_ROWS, width), np.float32, device) as t_buf, \
+            buffer_pool.array((BAND_ROWS, width, 3), np.float32, device) as mix_buf:
+
+        def fill(y0, y1, rgb):
+            t, mix = t_buf[:y1 - y0], mix_buf[:y1 - y0]
+            fill_t(y0, y1, t)
+            np.multiply(t[..., None], step, out=mix)
+            mix += c1
+            np.copyto(rgb, mix, casting="unsafe")
+
+        yield fill
+
+
+def _rotate_matrix(size, angle):
+    """
+    The inverse affine matrix and output size Image.rotate(angle,
+    expand=True) uses for an image of `size` (same math, same rounding).
+    """
+    w, h = size
+    a = -math.radians(angle % 360.0)
+    m = [
+        round(math.cos(a), 15), round(math.sin(a), 15), 0.0,
+        round(-math.sin(a), 15), round(math.cos(a), 15), 0.0,
+    ]
+
+    def apply(x, y):
+        return m[0] * x + m[1] * y + m[2], m[3] * x + m[4] * y + m[5]
+
+    m[2], m[5] = apply(-w / 2, -h / 2)
+    m[2] += w / 2
+    m[5] += h / 2
+
+    xs, ys = zip(*(apply(x, y) for x, y in ((0, 0), (w, 0), (w, h), (0, h))))
+    nw = math.ceil(max(xs)) - math.floor(min(xs))
+    nh = math.ceil(max(ys)) - math.floor(min(ys))
+    m[2], m[5] = apply(-(nw - w) / 2, -(nh - h) / 2)
+    return m, (nw, nh)
+
+
+@contextmanager
+def _rotated_fill(width, height, color_rows, angle, device):
+    """
+    The width x height middle of a square image whose row y is
+    color_rows[y], rotated by `angle`: what the gradients used to draw
+    line by line, rotate(expand=True) and crop. Each pixel looks up its
+    source row directly, so neither the square nor the expanded
+    rotation is ever allocated.
+    """
+    diag = len(color_rows)
+    m, (rot_w, rot_h) = _rotate_matrix((diag, diag), angle)
+
+    # Pillow's nearest-neighbour affine runs in 16.16 fixed point;
+    # doing the same integer math gives the same pixels
+    def fix(v):
+        return math.floor(v * 65536.0 + 0.5)
+
+    a0, a1, a3, a4 = fix(m[0]), fix(m[1]), fix(m[3]), fix(m[4])
+    a2 = fix(m[2] + m[0] * 0.5 + m[1] * 0.5)
+    a5 = fix(m[5] + m[3] * 0.5 + m[4] * 0.5)
+
+    # Crop offsets into the rotated image
+    cols = np.arange(width, dtype=np.int64) + (rot_w // 2 - width // 2)
+    rows = np.arange(height, dtype=np.int64) + (rot_h // 2 - height // 2)
+    x_of_col, y_of_col = cols * a0, cols * a3
+    x_of_row, y_of_row = rows * a1 + a2, rows * a4 + a5
 
-    rotated = base.rotate(angle, expand=True)
-    cx, cy = rotated.width // 2, rotated.height // 2
-    return rotated.crop((cx - width // 2, cy - height // 2,
-                         cx + width // 2, cy + height // 2))
+    # Pixels that fall outside the square come out black, as before
+    lut = np.concatenate([color_rows, np.zeros((1, 3), np.uint8)])
 
+    with buffer_pool.array((BAND_ROWS, width), np.int64, device) as xin_buf, \
+            buffer_pool.array((BAND_ROWS, width), np.int64, device) as yin_buf:
 
-def create_radial_gradient(width, height, color1, color2):
-    img = Image.new("RGB", (width, height))
-    draw = ImageDraw.Draw(img)
+        def fill(y0, y1, rgb):
+            xin, yin = xin_buf[:y1 - y0], yin_buf[:y1 - y0]
+            np.add(x_of_row[y0:y1, None], x_of_col, out=xin)
+            np.add(y_of_row[y0:y1, None], y_of_col, out=yin)
+            xin >>= 16
+            yin >>= 16
+            yin[(xin < 0) | (xin >= diag) | (yin < 0) | (yin >= diag)] = diag
+            np.take(lut, yin, axis=0, out=rgb)
+
+        yield fill
+
+
+# ---------------------------------------------------------
+#  GRADIENT GENERATORS
+# ---------------------------------------------------------
+
+def linear_fill(width, height, color1, color2, angle, device=None):
+    diag = int(math.sqrt(width ** 2 + height ** 2))
+    t = np.arange(diag) / (diag - 1)
+    return _rotated_fill(width, height, _lerp_lut(color1, color2, t), angle, device)
+
+
+def radial_fill(width, height, color1, color2, device=None):
     diag = math.sqrt((width / 2) ** 2 + (height / 2) ** 2)
+    dx2 = np.square(np.arange(width, dtype=np.float32) - width / 2)
+    dy2 = np.square(np.arange(height, dtype=np.float32) - height / 2)
 
-    for y in range(height):
-        for x in range(width):
-            dist = math.sqrt((x - width / 2) ** 2 + (y - height / 2) ** 2)
-            t = min(dist / diag, 1)
-            r = int(color1[0] * (1 - t) + color2[0] * t)
-            g = int(color1[1] * (1 - t) + color2[1] * t)
-            b = int(color1[2] * (1 - t) + color2[2] * t)
-            draw.point((x, y), (r, g, b))
+    def fill_t(y0, y1, t):
+        np.add(dy2[y0:y1, None], dx2, out=t)
+        np.sqrt(t, out=t)
+        t /= diag
+        np.minimum(t, 1, out=t)
 
-    return img
+    return _shade_fill(width, color1, color2, fill_t, device)
 
 
-def create_diamond_gradient(width, height, color1, color2):
-    img = Image.new("RGB", (width, height))
-    draw = ImageDraw.Draw(img)
+def diamond_fill(width, height, color1, color2, device=None):
     maxdist = width / 2 + height / 2
+    dx = np.abs(np.arange(width, dtype=np.float32) - width / 2)
+    dy = np.abs(np.arange(height, dtype=np.float32) - height / 2)
 
-    for y in range(height):
-        for x in range(width):
-            t = (abs(x - width / 2) + abs(y - height / 2)) / maxdist
-            t = min(max(t, 0), 1)
-            r = int(color1[0] * (1 - t) + color2[0] * t)
-            g = int(color1[1] * (1 - t) + color2[1] * t)
-            b = int(color1[2] * (1 - t) + color2[2] * t)
-            draw.point((x, y), (r, g, b))
+    def fill_t(y0, y1, t):
+        np.add(dy[y0:y1, None], dx, out=t)
+        t /= maxdist
+        np.clip(t, 0, 1, out=t)
 
-    return img
+    return _shade_fill(width, color1, color2, fill_t, device)
 
 
-def create_fade_gradient(width, height, color1):
-    color2 = darken(color1, -40)
-    img = Image.new("RGB", (width, height))
-    draw = ImageDraw.Draw(img)
+@contextmanager
+def fade_fill(width, height, color1, device=None):
+    t = np.arange(height) / (height - 1)
+    lut = _lerp_lut(color1, darken(color1, -40), t)
 
-    for y in range(height):
-        t = y / (height - 1)
-        r = int(color1[0] * (1 - t) + color2[0] * t)
-        g = int(color1[1] * (1 - t) + color2[1] * t)
-        b = int(color1[2] * (1 - t) + color2[2] * t)
-        draw.line([(0, y), (width, y)], fill=(r, g, b))
+    def fill(y0, y1, rgb):
+        rgb[:] = lut[y0:y1, None, :]
 
-    return img
+    yield fill
 
 
-def create_split_gradient(width, height, color1, color2, angle):
+def split_fill(width, height, color1, color2, angle, device=None):
     diag = int(math.sqrt(width ** 2 + height ** 2))
-    img = Image.new("RGB", (diag, diag))
-    draw = ImageDraw.Draw(img)
+    rows = np.empty((diag, 3), np.uint8)
+    rows[:diag // 2] = color1
+    rows[diag // 2:] = color2
+    return _rotated_fill(width, height, rows, angle, device)
 
+
+def mirror_fill(width, height, color1, color2, angle, device=None):
+    diag = int(math.sqrt(width ** 2 + height ** 2))
     mid = diag // 2
-    for y in range(diag):
-        draw.line([(0, y), (diag, y)], fill=color1 if y < mid else color2)
+    y = np.arange(diag)
+    t = np.clip(np.where(y <= mid, y / mid, (diag - y) / mid), 0, 1)
+    return _rotated_fill(width, height, _lerp_lut(color1, color2, t), angle, device)
 
-    rotated = img.rotate(angle, expand=True)
-    cx, cy = rotated.width // 2, rotated.height // 2
-    return rotated.crop((cx - width // 2, cy - height // 2,
-                         cx + width // 2, cy + height // 2))
 
+def create_linear_gradient(width, height, color1, color2, angle, device=None):
+    return _draw(width, height, linear_fill(width, height, color1, color2, angle, device), device)
+
+
+def create_radial_gradient(width, height, color1, color2, device=None):
+    return _draw(width, height, radial_fill(width, height, color1, color2, device), device)
 
-def create_mirror_gradient(width, height, color1, color2, angle):
-    diag = int(math.sqrt(width ** 2 + height ** 2))
-    img = Image.new("RGB", (diag, diag))
-    draw = ImageDraw.Draw(img)
-    mid = diag // 2
 
-    for y in range(diag):
-        t = y / mid if y <= mid else (diag - y) / mid
-        t = max(0, min(t, 1))
-        r = int(color1[0] * (1 - t) + color2[0] * t)
-        g = int(color1[1] * (1 - t) + color2[1] * t)
-        b = int(color1[2] * (1 - t) + color2[2] * t)
-        draw.line([(0, y), (diag, y)], fill=(r, g, b))
+def create_diamond_gradient(width, height, color1, color2, device=None):
+    return _draw(width, height, diamond_fill(width, height, color1, color2, device), device)
 
-    rotated = img.rotate(angle, expand=True)
-    cx, cy = rotated.width // 2, rotated.height // 2
-    return rotated.crop((cx - width // 2, cy - height // 2,
-                         cx + width // 2, cy + height // 2))
+
+def create_fade_gradient(width, height, color1, device=None):
+    return _draw(width, height, fade_fill(width, height, color1, device), device)
+
+
+def create_split_gradient(width, height, color1, color2, angle, device=None):
+    return _draw(width, height, split_fill(width, height, color1, color2, angle, device), device)
+
+
+def create_mirror_gradient(width, height, color1, color2, angle, device=None):
+    return _draw(width, height, mirror_fill(width, height, color1, color2, angle, device), device)
 
 
 # ---------------------------------------------------------
 #  NOISE (PERLIN STYLE)
 # ---------------------------------------------------------
+# Bilinear interpolation is linear along each axis, so over any cell
+# (or the part of an edge cell inside the image) the noise peaks at a
+# corner: a grid point inside the image, or a pixel on its last row or
+# column. Those give the exact min/max the noise is normalized by,
+# without a full-size pass.
+
+def _perlin_values(rand_grid, gx, gy, out=None):
+    """Interpolated noise at grid coordinates gy (rows) x gx (columns)."""
+    x0 = gx.astype(np.intp)
+    sx = gx - x0
+    r0 = gy.astype(np.intp)
+    sy = (gy - r0)[:, None]
+
+    top = rand_grid[r0][:, x0] * (1 - sx) + rand_grid[r0][:, x0 + 1] * sx
+    bottom = rand_grid[r0 + 1][:, x0] * (1 - sx) + rand_grid[r0 + 1][:, x0 + 1] * sx
+    out = np.multiply(top, 1 - sy, out=out)
+    out += bottom * sy
+    return out
 
-def generate_perlin_noise(width, height, scale=16):
+
+def _perlin_grid(width, height, scale):
     grid_x = width // scale + 2
     grid_y = height // scale + 2
 
-    rand_grid = np.random.rand(grid_y, grid_x)
-    noise = np.zeros((height, width))
+    rand_grid = np.random.rand(grid_y, grid_x).astype(np.float32)
+    inside = rand_grid[:(height - 1) // scale + 1, :(width - 1) // scale + 1]
+
+    gx = np.arange(width, dtype=np.float32) / scale
+    gy = np.arange(height, dtype=np.float32) / scale
+    last_row = _perlin_values(rand_grid, gx, gy[-1:])
+    last_col = _perlin_values(rand_grid, gx[-1:], gy)
 
-    for y in range(height):
-        for x in range(width):
-            gx, gy = x / scale, y / scale
-            x0, y0 = int(gx), int(gy)
-            x1, y1 = x0 + 1, y0 + 1
+    low = min(inside.min(), last_row.min(), last_col.min())
+    high = max(inside.max(), last_row.max(), last_col.max())
+    return rand_grid, low, high
 
-            sx, sy = gx - x0, gy - y0
 
-            n0 = rand_grid[y0, x0] * (1 - sx) + rand_grid[y0, x1] * sx
-            n1 = rand_grid[y1, x0] * (1 - sx) + rand_grid[y1, x1] * sx
+def _perlin_rows(rand_grid, low, high, width, y0, y1, scale, out):
+    """Normalized noise for rows y0..y1, written into `out`."""
+    gx = np.arange(width, dtype=np.float32) / scale
+    gy = np.arange(y0, y1, dtype=np.float32) / scale
+    _perlin_values(rand_grid, gx, gy, out)
+    out -= low
+    out /= high - low
+    np.clip(out, 0, 1, out=out)  # float rounding; t feeds an unchecked uint8 cast
 
-            noise[y, x] = n0 * (1 - sy) + n1 * sy
 
-    noise = (noise - noise.min()) / (noise.max() - noise.min())
+def generate_perlin_noise(width, height, scale=16):
+    """Value noise normalized to [0, 1], as a float32 (height, width) array."""
+    rand_grid, low, high = _perlin_grid(width, height, scale)
+    noise = np.empty((height, width), np.float32)
+
+    for y0 in range(0, height, BAND_ROWS):
+        check_cancelled()
+        y1 = min(y0 + BAND_ROWS, height)
+        _perlin_rows(rand_grid, low, high, width, y0, y1, scale, noise[y0:y1])
+
     return noise
 
 
-def create_noise_gradient(width, height, color1, color2, scale=16):
-    noise = generate_perlin_noise(width, height, scale=scale)
-    img = Image.new("RGB", (width, height))
+def noise_fill(width, height, color1, color2, scale=16, device=None):
+    rand_grid, low, high = _perlin_grid(width, height, scale)
 
-    for y in range(height):
-        for x in range(width):
-            t = noise[y, x]
-            r = int(color1[0] * (1 - t) + color2[0] * t)
-            g = int(color1[1] * (1 - t) + color2[1] * t)
-            b = int(color1[2] * (1 - t) + color2[2] * t)
-            img.putpixel((x, y), (r, g, b))
+    def fill_t(y0, y1, t):
+        _perlin_rows(rand_grid, low, high, width, y0, y1, scale, t)
+
+    return _shade_fill(width, color1, color2, fill_t, device)
 
-    return img
+
+def create_noise_gradient(width, height, color1, color2, scale=16, device=None):
+    return _draw(width, height, noise_fill(width, height, color1, color2, scale, device), device)
 
 
 # ---------------------------------------------------------
 #  GRADIENT DISPATCHER
 # ---------------------------------------------------------
 
-def create_gradient(width, height, style, color1, color2, angle, **kwargs):
+def _noise_scale(kwargs):
     noise_detail = int(kwargs.get("noise_detail", 2))
-    noise_scale = 32 if noise_detail == 1 else 8 if noise_detail == 3 else 16
+    return 32 if noise_detail == 1 else 8 if noise_detail == 3 else 16
+
 
-    if style == "linear":
-        return create_linear_gradient(width, height, color1, color2, angle)
+def gradient_fill(width, height, style, color1, color2, angle,
+                  resolution=1.0, resample=Image.LANCZOS, detail_scale=1.0,
+                  device=None, **kwargs):
+    """The band fill behind create_gradient(); same arguments."""
+    if resolution < 1:
+        small = create_gradient(
+            max(2, round(width * resolution)), max(2, round(height * resolution)),
+            style, color1, color2, angle,
+            noise_px=_noise_scale(kwargs) * detail_scale * resolution,
+            device=device,
+        )
+        return _releasing(image_fill(small, width, height, resample), small, device)
+
+    noise_scale = kwargs.get("noise_px") or _noise_scale(kwargs) * detail_scale
 
     if style == "radial":
-        return create_radial_gradient(width, height, color1, color2)
+        return radial_fill(width, height, color1, color2, device)
 
     if style == "diamond":
-        return create_diamond_gradient(width, height, color1, color2)
+        return diamond_fill(width, height, color1, color2, device)
 
     if style == "fade":
-        return create_fade_gradient(width, height, color1)
+        return fade_fill(width, height, color1, device)
 
     if style == "split":
-        return create_split_gradient(width, height, color1, color2, angle)
+        return split_fill(width, height, color1, color2, angle, device)
 
     if style == "mirror":
-        return create_mirror_gradient(width, height, color1, color2, angle)
+        return mirror_fill(width, height, color1, color2, angle, device)
 
     if style == "noise":
-        return create_noise_gradient(width, height, color1, color2, scale=noise_scale)
+        return noise_fill(width, height, color1, color2,
+                          scale=max(1, round(noise_scale)), device=device)
+
+    return linear_fill(width, height, color1, color2, angle, device)
 
-    return create_linear_gradient(width, height, color1, color2, angle)
+
+def create_gradient(width, height, style, color1, color2, angle,
+                    resolution=1.0, resample=Image.LANCZOS, detail_scale=1.0,
+                    device=None, **kwargs):
+    """
+    resolution < 1 draws the gradient that much smaller and upscales
+    it with `resample` (used by the degraded quality tier).
+    detail_scale shrinks noise cells along with a scaled-down canvas.
+    The result is a pooled canvas (see buffers.BufferPool.canvas).
+    """
+    if resolution < 1:
+        small = create_gradient(
+            max(2, round(width * resolution)), max(2, round(height * resolution)),
+            style, color1, color2, angle,
+            noise_px=_noise_scale(kwargs) * detail_scale * resolution,
+            device=device,
+        )
+        img = small.resize((width, height), resample)
+        buffer_pool.release(small, device)
+        return img
+
+    fill = gradient_fill(width, height, style, color1, color2, angle,
+                         detail_scale=detail_scale, device=device, **kwargs)
+    return _draw(width, height, fill, device)
@@ -1,21 +1,93 @@
 import os
-import json
-from io import BytesIO
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse, HTMLResponse
-from fastapi.staticfiles import StaticFiles
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from fastapi import Request
+from fastapi import Request, WebSocket
+from pydantic import BaseModel
+
+from src.generator.wallpaper_base import asset_path
+from src.generator.team_colors import team_color_source, team_colors as default_team_colors
+from src.generator.render import (
+    SpecError,
+    PREVIEW_DIVISORS,
+    available_teams,
+    check_sources,
+    normalize_spec,
+    spec_key,
+    render_png,
+    render_preview_png,
+)
+from src.generator.bulk_render import output_relpath
+from src.generator.quality import DEGRADED, FULL
+from src.generator.shared_cache import preload_shared_cache
+from src.server.render_cache import MemoryRenderCache, make_render_cache
+from src.server.popularity import flush_periodically, record_access, warm_cache
+from src.generator.buffers import MemoryMeter, buffer_pool
+from src.generator.cancel import CancelToken
+from src.generator.timing import StageTimer
+from src.server.admission import (
+    PREVIEW_CONCURRENCY,
+    PREVIEW_QUEUE_MAX,
+    PREVIEW_QUEUE_TIMEOUT,
+    Admission,
+    Overloaded,
+)
+from src.server.disconnect import CLIENT_CLOSED, ClientDisconnected, unless_disconnected
+from src.server.live_preview import serve_preview_socket
+from src.server.metrics import CONTENT_TYPE, metrics_text, record_render, server_timing
+from src.server.jobs import JobQueue, QueueFull
+from src.server.render_pool import RENDER_WORKERS, run_render
+from src.server.zip_stream import stream_zip
+from src.ui.static_assets import CachedStaticFiles, asset_url
 
-from src.generator.wallpaper_pc import generate_pc_wallpaper
-from src.generator.wallpaper_mobile import generate_mobile_wallpaper
 
-from src.generator.wallpaper_base import (
-    asset_path,
-    get_team_colors_from_logo,
-)
+# ---------------------------------------------------------
+#  STARTUP
+# ---------------------------------------------------------
+
+@asynccontextmanager
+async def lifespan(app):
+    # First worker builds the shared logo store, the others just map it
+    await run_in_threadpool(preload_shared_cache)
+
+    # Re-render yesterday's popular wallpapers in the background
+    warmup = asyncio.create_task(
+        warm_cache(render_cache, render_png, is_busy=lambda: admission.busy or preview_admission.busy)
+    )
+    access_log = asyncio.create_task(flush_periodically())
+    job_queue.start()
+    yield
+    warmup.cancel()
+    access_log.cancel()
+    await job_queue.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Disk by default; RENDER_CACHE_URL=redis://... shares it across replicas
+render_cache = make_render_cache()
 
-app = FastAPI()
+# Previews are small and short-lived: keep them in this process only
+preview_cache = MemoryRenderCache(max_bytes=32 * 1024 * 1024, ttl=3600)
+
+# Caps concurrent renders; cache hits never wait for it
+admission = Admission()
+
+# Previews (HTTP and socket) queue in their own lane; see admission.py
+preview_admission = Admission(PREVIEW_CONCURRENCY, PREVIEW_QUEUE_MAX, PREVIEW_QUEUE_TIMEOUT)
+
+
+async def render_job(spec, cancel):
+    png, _ = await cached_render(spec, bounded=False, cancel=cancel)
+    return png
+
+
+job_queue = JobQueue(render_job)
 
 # ---------------------------------------------------------
 #  STATIC + TEMPLATE SETUP
@@ -24,22 +96,30 @@ app = FastAPI()
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "ui", "templates"))
+templates.env.globals["asset_url"] = asset_url
 
 app.mount(
     "/static",
-    StaticFiles(directory=os.path.join(BASE_DIR, "ui", "static")),
+    CachedStaticFiles(directory=os.path.join(BASE_DIR, "ui", "static")),
     name="static",
 )
 
+# Only the folders the UI actually loads are public
 app.mount(
-    "/data",
-    StaticFiles(directory=asset_path("data")),
-    name="data",
+    "/data/logos",
+    CachedStaticFiles(directory=asset_path("data/logos")),
+    name="logos",
+)
+
+app.mount(
+    "/data/stickerbomb",
+    CachedStaticFiles(directory=asset_path("data/stickerbomb"), check_dir=False),
+    name="stickerbomb",
 )
 
 app.mount(
     "/dropdown",
-    StaticFiles(directory=asset_path("data/logos_dropdown")),
+    CachedStaticFiles(directory=asset_path("data/logos_dropdown")),
     name="dropdown",
 )
 
@@ -50,7 +130,7 @@ app.mount(
 
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return templates.TemplateResponse(request, "index.html")
 
 
 # ---------------------------------------------------------
@@ -68,23 +148,10 @@ async def get_teams():
     if not os.path.exists(schedules_dir):
         raise HTTPException(500, "Schedules folder not found")
 
-    teams = []
-
-    for file in os.listdir(logos_dir):
-        if not file.endswith(".png"):
-            continue
-
-        team_key = file.replace(".png", "")
-        schedule_file = f"{team_key}.json"
-
-        if os.path.exists(os.path.join(schedules_dir, schedule_file)):
-            name = team_key.replace("_", " ")
-            teams.append({
-                "name": name,
-                "logo": file
-            })
-
-    teams.sort(key=lambda t: t["name"])
+    teams = [
+        {"name": name, "logo": name.replace(" ", "_") + ".png"}
+        for name in available_teams()
+    ]
     return {"teams": teams}
 
 
@@ -100,122 +167,330 @@ async def team_colors(team: str):
     if not os.path.exists(logo_path):
         raise HTTPException(404, "Team logo not found.")
 
-    primary_rgb, secondary_rgb = get_team_colors_from_logo(logo_path)
+    # Official colors when the school has them; no image decoding
+    primary_rgb, secondary_rgb = default_team_colors(logo_path)
 
     def rgb_to_hex(rgb):
         return "#{:02X}{:02X}{:02X}".format(*rgb)
 
     return {
         "primary": rgb_to_hex(primary_rgb),
-        "secondary": rgb_to_hex(secondary_rgb)
+        "secondary": rgb_to_hex(secondary_rgb),
+        "source": team_color_source(logo_path),
     }
 
 
 # ---------------------------------------------------------
-#  LOAD SCHEDULE
+#  RENDER + CACHE
 # ---------------------------------------------------------
 
-def load_schedule(team_name: str):
-    filename = team_name.replace(" ", "_") + ".json"
-    path = asset_path(f"data/schedules/{filename}")
+async def cached_render(spec, bounded=True, cancel=None, meter=None, timer=None):
+    """
+    (PNG bytes, source) for a spec; source is "cache", FULL or DEGRADED.
 
-    if not os.path.exists(path):
-        raise HTTPException(404, f"No schedule found for {team_name}")
+    Misses wait for a render slot; raises Overloaded when none frees up.
+    Under brownout, bounded (interactive) requests get a degraded render,
+    which is never written to the cache. Cancelling the `cancel` token
+    stops the render at its next stage with RenderCancelled. On a miss,
+    `meter` (a MemoryMeter) gets the render's pooled-buffer peak.
 
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    `timer` (a StageTimer) gets the cache lookup, the wait for a slot
+    and the render stages; misses also feed the /metrics histograms.
+    """
+    key = spec_key(spec)
+    timer = timer or StageTimer()
+    start = time.perf_counter()
+
+    with timer.stage("cache"):
+        png = await run_in_threadpool(render_cache.get, key)
+    if png is not None:
+        record_access(spec)
+        return png, "cache"
+
+    waited = time.perf_counter()
+    async with admission.slot(bounded):
+        timer.add("queue", time.perf_counter() - waited)
+        quality = DEGRADED if bounded and admission.brownout() else FULL
+        png = await run_render(render_png, spec, quality, cancel, meter, timer)
+
+    record_render(timer, time.perf_counter() - start, quality)
+    record_access(spec)
+    if quality == FULL:
+        await run_in_threadpool(render_cache.set, key, png)
+    else:
+        admission.degraded += 1
+    return png, quality
 
 
 # ---------------------------------------------------------
 #  GENERATE WALLPAPER (TEAM + STICKERBOMB)
 # ---------------------------------------------------------
 
+class RenderParams(BaseModel):
+    team: str | None = None
+    type: str | None = None
+    color: str | None = None
+    gradient_enabled: int = 0
+    style: str = "linear"
+    color1: str | None = None
+    color2: str | None = None
+    angle: int = 0
+    noise_detail: int = 2
+    stickerbomb: int = 0
+
+
 @app.get("/generate")
-async def generate(
-    team: str = None,
-    type: str = None,
-
-    # Color mode params
-    color: str = None,
-    gradient_enabled: int = 0,
-    style: str = "linear",
-    color1: str = None,
-    color2: str = None,
-    angle: int = 0,
-    noise_detail: int = 2,
-
-    # Stickerbomb
-    stickerbomb: int = 0,
-):
+async def generate(request: Request, params: RenderParams = Depends()):
     """
     Generates wallpapers for:
     ✔ Team Mode (with schedule)
     ✔ Sticker Bomb Mode (no schedule, fixed PNG backgrounds)
+
+    Renders are cached by their normalized spec, so a wallpaper
+    rendered by any replica is served to all of them. If the client
+    disconnects, the render stops and its slot is freed.
+    """
+
+    try:
+        spec = normalize_spec(**params.model_dump())
+    except SpecError as e:
+        raise HTTPException(400, str(e))
+
+    token = CancelToken()
+    meter = MemoryMeter()
+    timer = StageTimer()
+    start = time.perf_counter()
+    try:
+        png, source = await unless_disconnected(
+            request, cached_render(spec, cancel=token, meter=meter, timer=timer), token
+        )
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED)
+    except FileNotFoundError as e:
+        raise HTTPException(404, str(e))
+    except Overloaded as e:
+        raise HTTPException(503, str(e), headers={"Retry-After": str(e.retry_after)})
+
+    headers = {
+        "X-Cache": "HIT" if source == "cache" else "MISS",
+        "X-Render-Quality": DEGRADED if source == DEGRADED else FULL,
+        "Server-Timing": server_timing(timer, time.perf_counter() - start),
+    }
+    if source != "cache":
+        headers["X-Render-Peak-Pooled-Bytes"] = str(meter.peak)
+    if source == DEGRADED:
+        # A stand-in under load; don't let anything keep it
+        headers["Cache-Control"] = "no-store"
+
+    return Response(png, media_type="image/png", headers=headers)
+
+
+# ---------------------------------------------------------
+#  LIVE PREVIEW (LOW RESOLUTION)
+# ---------------------------------------------------------
+
+@app.get("/preview")
+async def preview(params: RenderParams = Depends(), scale: int = 4):
     """
+    The /generate pipeline at 1/scale size (4 or 8), for the live
+    preview. Renders wait in the small preview lane rather than the
+    /generate queue (503 when it is full) and are cached in this
+    process only, not in the shared render cache.
+    """
+    if scale not in PREVIEW_DIVISORS:
+        raise HTTPException(400, f"scale must be one of {PREVIEW_DIVISORS}.")
+
+    try:
+        spec = normalize_spec(**params.model_dump())
+    except SpecError as e:
+        raise HTTPException(400, str(e))
 
-    if type not in ("pc", "mobile"):
-        raise HTTPException(400, "Invalid wallpaper type.")
-
-    if not team:
-        raise HTTPException(400, "Team is required.")
-
-    logo_filename = team.replace(" ", "_") + ".png"
-    logo_path = f"data/logos/{logo_filename}"
-
-    # ---------------------------------------------------------
-    # Sticker Bomb Mode (fixed PNG backgrounds)
-    # ---------------------------------------------------------
-    if int(stickerbomb) == 1:
-        show_schedule = False
-
-        if type == "pc":
-            img = generate_pc_wallpaper(
-                team,
-                schedule=None,
-                logo_path=logo_path,
-                stickerbomb=True,
-                show_schedule=False
-            )
-        else:
-            img = generate_mobile_wallpaper(
-                team,
-                schedule=None,
-                logo_path=logo_path,
-                stickerbomb=True,
-                show_schedule=False
-            )
-
-        img_bytes = BytesIO()
-        img.save(img_bytes, format="PNG")
-        img_bytes.seek(0)
-
-        return StreamingResponse(img_bytes, media_type="image/png")
-
-    # ---------------------------------------------------------
-    # Team Mode (Normal) = schedule always ON
-    # ---------------------------------------------------------
-
-    schedule = load_schedule(team)
-
-    kwargs = dict(
-        user_color=color,
-        gradient_enabled=bool(int(gradient_enabled)),
-        style=style,
-        color1=color1,
-        color2=color2,
-        angle=int(angle),
-        noise_detail=int(noise_detail),
-        stickerbomb=False,
-        show_schedule=True,
+    key = f"{spec_key(spec)}@{scale}"
+    png = preview_cache.get(key)
+
+    if png is None:
+        try:
+            async with preview_admission.slot():
+                png = await run_render(render_preview_png, spec, scale)
+        except FileNotFoundError as e:
+            raise HTTPException(404, str(e))
+        except Overloaded as e:
+            raise HTTPException(503, str(e), headers={"Retry-After": str(e.retry_after)})
+        preview_cache.set(key, png)
+
+    return Response(png, media_type="image/png", headers={"Cache-Control": "private, max-age=300"})
+
+
+@app.websocket("/ws/preview")
+async def preview_socket(ws: WebSocket):
+    """
+    Live preview channel: each message re-renders only the layers it
+    changed (see src/server/live_preview.py for the protocol).
+    """
+    await serve_preview_socket(ws, preview_admission)
+
+
+# ---------------------------------------------------------
+#  BATCH GENERATE (ZIP)
+# ---------------------------------------------------------
+
+MAX_BATCH = 100
+
+
+class BatchRequest(BaseModel):
+    items: list[RenderParams]
+
+
+@app.post("/generate/batch")
+async def generate_batch(batch: BatchRequest):
+    """
+    Renders many specs concurrently on the render pool and streams them
+    back as a ZIP. At most 2 x RENDER_WORKERS images are held at once,
+    whatever the batch size. Renders that fail mid-stream are listed
+    in errors.txt inside the archive.
+    """
+    if not batch.items:
+        raise HTTPException(400, "No items.")
+    if len(batch.items) > MAX_BATCH:
+        raise HTTPException(400, f"At most {MAX_BATCH} items per batch.")
+
+    specs = {}
+    for i, params in enumerate(batch.items):
+        try:
+            spec = normalize_spec(**params.model_dump())
+            check_sources(spec)
+        except SpecError as e:
+            raise HTTPException(400, f"Item {i}: {e}")
+        except FileNotFoundError as e:
+            raise HTTPException(404, f"Item {i}: {e}")
+        specs.setdefault(spec_key(spec), spec)
+
+    # PC and mobile of one team back to back, so the second reuses the
+    # team colors and logo pages the first one just loaded
+    ordered = sorted(specs.values(), key=lambda s: (s["team"], s["type"]))
+
+    async def entries():
+        window = 2 * RENDER_WORKERS
+        pending = deque()
+        errors = []
+
+        token = CancelToken()
+
+        async def render_one(spec):
+            try:
+                png, _ = await cached_render(spec, bounded=False, cancel=token)
+                return output_relpath(spec), png, None
+            except Exception as e:
+                return output_relpath(spec), None, str(e)
+
+        try:
+            for spec in ordered:
+                pending.append(asyncio.create_task(render_one(spec)))
+                if len(pending) < window:
+                    continue
+
+                name, png, error = await pending.popleft()
+                if error:
+                    errors.append(f"{name}: {error}")
+                else:
+                    yield name, png
+
+            while pending:
+                name, png, error = await pending.popleft()
+                if error:
+                    errors.append(f"{name}: {error}")
+                else:
+                    yield name, png
+
+            if errors:
+                yield "errors.txt", "\n".join(errors).encode("utf-8")
+        finally:
+            # Client went away: stop running renders, skip queued ones
+            token.cancel()
+            for task in pending:
+                task.cancel()
+
+    return StreamingResponse(
+        stream_zip(entries()),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="wallpapers.zip"'},
     )
 
-    if type == "pc":
-        img = generate_pc_wallpaper(team, schedule, logo_path, **kwargs)
-    else:
-        img = generate_mobile_wallpaper(team, schedule, logo_path, **kwargs)
 
-    img_bytes = BytesIO()
-    img.save(img_bytes, format="PNG")
-    img_bytes.seek(0)
+# ---------------------------------------------------------
+#  RENDER JOBS (POLLING)
+# ---------------------------------------------------------
+
+@app.post("/jobs", status_code=202)
+async def create_job(params: RenderParams):
+    """
+    Queues a render and returns its job id right away. Poll
+    GET /jobs/{id}; once "done", fetch the PNG from its "result" URL.
+    """
+    try:
+        spec = normalize_spec(**params.model_dump())
+        check_sources(spec)
+    except SpecError as e:
+        raise HTTPException(400, str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(404, str(e))
+
+    try:
+        job, _ = job_queue.submit(spec_key(spec), spec)
+    except QueueFull:
+        raise HTTPException(503, "Render queue is full.", headers={"Retry-After": "5"})
+
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Unknown or expired job.")
+    return job.to_dict()
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancels a queued or running job."""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(404, "Unknown or expired job.")
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Unknown or expired job.")
+    if job.status != "done":
+        raise HTTPException(409, f"Job is {job.status}.")
+
+    png = await job_queue.result(job)
+    if png is None:
+        raise HTTPException(410, "Result has expired; submit the job again.")
+    return Response(png, media_type="image/png")
+
+
+# ---------------------------------------------------------
+#  STATS
+# ---------------------------------------------------------
+
+@app.get("/stats")
+async def stats():
+    return {
+        "admission": admission.stats(),
+        "preview_admission": preview_admission.stats(),
+        "render_cache": render_cache.stats(),
+        "preview_cache": preview_cache.stats(),
+        "jobs": job_queue.stats(),
+        "buffers": buffer_pool.stats(),
+    }
+
 
-    return StreamingResponse(img_bytes, media_type="image/png")
+@app.get("/metrics")
+async def metrics():
+    """/stats plus per-stage render histograms, for Prometheus."""
+    return Response(metrics_text(await stats()), media_type=CONTENT_TYPE)
@@ -0,0 +1,184 @@
+import os
+import math
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+
+from src.generator.cancel import RenderCancelled
+
+
+# ---------------------------------------------------------
+#  SETTINGS
+# ---------------------------------------------------------
+
+# Renders allowed at once in this worker
+RENDER_CONCURRENCY = int(os.getenv("RENDER_CONCURRENCY", os.cpu_count() or 1))
+
+# Requests allowed to wait for a slot; more than this get a 503
+RENDER_QUEUE_MAX = int(os.getenv("RENDER_QUEUE_MAX", 4 * RENDER_CONCURRENCY))
+
+# Longest a request waits for a slot before giving up with a 503
+RENDER_QUEUE_TIMEOUT = float(os.getenv("RENDER_QUEUE_TIMEOUT", 10))
+
+# Recent waits kept for the percentile in stats()
+WAIT_SAMPLES = 500
+
+# Brownout: switch to degraded renders when this many interactive
+# requests are waiting, or when recent waits are this slow. BROWNOUT=0 turns it off.
+BROWNOUT = os.getenv("BROWNOUT", "1") != "0"
+BROWNOUT_QUEUE_DEPTH = int(os.getenv("BROWNOUT_QUEUE_DEPTH", RENDER_CONCURRENCY))
+BROWNOUT_WAIT = float(os.getenv("BROWNOUT_WAIT", 2.0))
+
+# Waits looked at for the brownout decision: the last this many
+# successful bounded acquisitions, from the last this many seconds
+BROWNOUT_WINDOW = 20
+BROWNOUT_WINDOW_SECS = float(os.getenv("BROWNOUT_WINDOW_SECS", 30))
+
+
+# Live previews get their own small lane so slider drags can neither
+# starve /generate nor pile up on the render pool
+PREVIEW_CONCURRENCY = int(os.getenv("PREVIEW_CONCURRENCY", max(1, RENDER_CONCURRENCY // 2)))
+PREVIEW_QUEUE_MAX = int(os.getenv("PREVIEW_QUEUE_MAX", 2 * PREVIEW_CONCURRENCY))
+PREVIEW_QUEUE_TIMEOUT = float(os.getenv("PREVIEW_QUEUE_TIMEOUT", 2))
+
+
+class Overloaded(Exception):
+    """No render slot available; retry_after is a hint in seconds."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+# ---------------------------------------------------------
+#  LIMITER
+# ---------------------------------------------------------
+
+class Admission:
+    """
+    Caps concurrent renders with a FIFO semaphore and a bounded,
+    deadline-limited wait queue in front of it.
+    """
+
+    def __init__(self, limit=RENDER_CONCURRENCY, max_waiting=RENDER_QUEUE_MAX,
+                 timeout=RENDER_QUEUE_TIMEOUT):
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(limit)
+
+        self.in_flight = 0
+        self.bounded_waiting = 0    # interactive requests, capped by max_waiting
+        self.unbounded_waiting = 0  # jobs and batch items, already queued elsewhere
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.waits = deque(maxlen=WAIT_SAMPLES)
+        self.slot_waits = deque(maxlen=BROWNOUT_WINDOW)  # (monotonic time, secs)
+        self.render_secs = 1.0  # moving average
+        self.degraded = 0
+
+    @property
+    def waiting(self):
+        return self.bounded_waiting + self.unbounded_waiting
+
+    @property
+    def busy(self):
+        return self.in_flight > 0 or self.waiting > 0
+
+    def brownout(self):
+        """True when new renders should use the degraded quality tier."""
+        if not BROWNOUT:
+            return False
+        # Jobs and batches queue behind their own limits; only
+        # interactive waiters say the site is overloaded
+        if self.bounded_waiting >= BROWNOUT_QUEUE_DEPTH:
+            return True
+
+        cutoff = time.monotonic() - BROWNOUT_WINDOW_SECS
+        recent = [secs for at, secs in self.slot_waits if at >= cutoff]
+        return bool(recent) and sum(recent) / len(recent) >= BROWNOUT_WAIT
+
+    def retry_after(self):
+        """Rough seconds until the current queue drains."""
+        queued = self.waiting + self.in_flight
+        secs = self.render_secs * queued / self.limit
+        return max(1, min(math.ceil(secs), 60))
+
+    @asynccontextmanager
+    async def slot(self, bounded=True):
+        """
+        Holds one render slot for the body. bounded=False is for work
+        that is already queued elsewhere (jobs, batches): it waits as
+        long as it takes and doesn't count against the wait cap.
+        """
+        if bounded and self.bounded_waiting >= self.max_waiting:
+            self.rejected += 1
+            raise Overloaded("Render queue is full.", self.retry_after())
+
+        if bounded:
+            self.bounded_waiting += 1
+        else:
+            self.unbounded_waiting += 1
+        start = time.perf_counter()
+        try:
+            if bounded:
+                await asyncio.wait_for(self.semaphore.acquire(), self.timeout)
+            else:
+                await self.semaphore.acquire()
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise Overloaded("Timed out waiting for a render slot.", self.retry_after())
+        except asyncio.CancelledError:
+            self.cancelled += 1  # client left while queued
+            raise
+        finally:
+            if bounded:
+                self.bounded_waiting -= 1
+            else:
+                self.unbounded_waiting -= 1
+            self.waits.append(time.perf_counter() - start)
+
+        # Only waits that got a slot say how slow the queue is now
+        if bounded:
+            self.slot_waits.append((time.monotonic(), self.waits[-1]))
+
+        self.admitted += 1
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield
+        except (asyncio.CancelledError, RenderCancelled):
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.semaphore.release()
+            self.render_secs = 0.8 * self.render_secs + 0.2 * (time.perf_counter() - start)
+
+    def stats(self):
+        waits = sorted(self.waits)
+
+        def pct(p):
+            return round(waits[min(int(len(waits) * p), len(waits) - 1)], 4) if waits else 0.0
+
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "queue_depth_bounded": self.bounded_waiting,
+            "queue_max": self.max_waiting,
+            "queue_timeout": self.timeout,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "cancelled": self.cancelled,
+            "wait_p50": pct(0.5),
+            "wait_p95": pct(0.95),
+            "wait_max": round(waits[-1], 4) if waits else 0.0,
+            "avg_render_secs": round(self.render_secs, 3),
+            "brownout": self.brownout(),
+            "degraded": self.degraded,
+        }
@@ -0,0 +1,48 @@
+import asyncio
+from contextlib import suppress
+
+from src.generator.cancel import RenderCancelled
+
+
+# ---------------------------------------------------------
+#  CLIENT DISCONNECTS
+# ---------------------------------------------------------
+
+# How often a waiting request checks whether its client is still there
+POLL_INTERVAL = 0.2
+
+# Status logged for requests whose client went away (nginx convention)
+CLIENT_CLOSED = 499
+
+
+class ClientDisconnected(Exception):
+    """The client went away before the response was ready."""
+
+
+async def unless_disconnected(request, coro, token):
+    """
+    Awaits `coro`, polling request.is_disconnected() meanwhile. If the
+    client leaves first, the token is cancelled (so the render thread
+    stops at its next stage) and the coroutine is cancelled (so its
+    admission slot or queue place is released right away).
+    """
+    task = asyncio.ensure_future(coro)
+
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=POLL_INTERVAL)
+            if done:
+                return task.result()
+
+            if await request.is_disconnected():
+                break
+    except asyncio.CancelledError:
+        token.cancel()
+        task.cancel()
+        raise
+
+    token.cancel()
+    task.cancel()
+    with suppress(asyncio.CancelledError, RenderCancelled):
+        await task
+    raise ClientDisconnected()
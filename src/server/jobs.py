@@ -0,0 +1,212 @@
+import os
+import time
+import asyncio
+import secrets
+from collections import OrderedDict
+
+from src.generator.cancel import CancelToken, RenderCancelled
+from src.server.render_cache import PROJECT_ROOT, DiskRenderCache
+
+
+# ---------------------------------------------------------
+#  SETTINGS
+# ---------------------------------------------------------
+
+# Jobs waiting for a worker; submissions past this get a 503
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", 64))
+
+# Concurrent job renders (each one still runs on the render pool)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+
+# Finished jobs (and their PNGs) are kept this long...
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", 600))
+
+# ...and at most this many of them
+MAX_FINISHED_JOBS = int(os.getenv("MAX_FINISHED_JOBS", 200))
+
+# Result PNGs live on disk, keyed by spec, not in the Job objects
+JOB_RESULTS_DIR = os.path.join(PROJECT_ROOT, "cache", "jobs")
+JOB_RESULTS_MAX_BYTES = int(os.getenv("JOB_RESULTS_MAX_BYTES", 256 * 1024 * 1024))
+
+# 5K noise backgrounds come out around 12MB; room for even an
+# uncompressible 5120x2880 RGBA frame
+JOB_RESULT_MAX_ITEM_BYTES = int(os.getenv("JOB_RESULT_MAX_ITEM_BYTES", 64 * 1024 * 1024))
+
+
+class QueueFull(Exception):
+    """The job queue is at capacity."""
+
+
+class Job:
+    def __init__(self, key, spec):
+        self.id = secrets.token_urlsafe(12)
+        self.key = key
+        self.spec = spec
+        self.status = "queued"
+        self.created = time.time()
+        self.finished = None
+        self.error = None
+        self.cancel = CancelToken()
+
+    def expired(self, now):
+        return self.finished is not None and now - self.finished > JOB_RESULT_TTL
+
+    def to_dict(self):
+        out = {
+            "id": self.id,
+            "status": self.status,
+            "created": self.created,
+        }
+        if self.finished is not None:
+            out["finished"] = self.finished
+        if self.status == "done":
+            out["result"] = f"/jobs/{self.id}/result"
+            out["expires"] = self.finished + JOB_RESULT_TTL
+        if self.error:
+            out["error"] = self.error
+        return out
+
+
+# ---------------------------------------------------------
+#  QUEUE
+# ---------------------------------------------------------
+
+class JobQueue:
+    """
+    Bounded in-process render queue. Identical specs that are queued,
+    running or finished-but-not-expired share one job.
+
+    Jobs live in this process only; with several replicas, clients need
+    sticky sessions (results still land in the shared render cache).
+    Finished PNGs go to `results` (a RenderCache, by default a disk one
+    under cache/jobs) under the job's key; read them with result().
+    """
+
+    def __init__(self, render, workers=JOB_WORKERS, maxsize=JOB_QUEUE_SIZE, results=None):
+        self.render = render
+        self.workers = workers
+        self.maxsize = maxsize
+        self.results = results if results is not None else DiskRenderCache(
+            JOB_RESULTS_DIR, max_bytes=JOB_RESULTS_MAX_BYTES, ttl=JOB_RESULT_TTL,
+            max_item_bytes=JOB_RESULT_MAX_ITEM_BYTES,
+        )
+        self.queue = None
+        self.jobs = {}
+        self.by_key = {}
+        self.finished = OrderedDict()
+        self.tasks = []
+
+    # ---- lifecycle ----
+
+    def start(self):
+        # Created here so the queue belongs to the running event loop
+        self.queue = asyncio.Queue(self.maxsize)
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    # ---- API ----
+
+    def submit(self, key, spec):
+        """Returns (job, created). Raises QueueFull."""
+        self.sweep()
+
+        job = self.by_key.get(key)
+        if job is not None and job.status not in ("failed", "cancelled"):
+            return job, False
+
+        job = Job(key, spec)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFull()
+
+        self.jobs[job.id] = job
+        self.by_key[key] = job
+        return job, True
+
+    def get(self, job_id):
+        self.sweep()
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Cancels a job: a queued one is skipped when its turn comes, a
+        running one stops at its next render stage.
+        """
+        job = self.get(job_id)
+        if job is not None and job.status in ("queued", "running"):
+            job.cancel.cancel()
+            if job.status == "queued":
+                self._finish(job, "cancelled")
+        return job
+
+    async def result(self, job):
+        """
+        PNG bytes of a done job, or None once they have expired or been
+        evicted. A job without its PNG is forgotten, so submitting the
+        spec again starts a new render instead of finding this one.
+        """
+        loop = asyncio.get_running_loop()
+        png = await loop.run_in_executor(None, self.results.get, job.key)
+        if png is None:
+            self._forget(job)
+        return png
+
+    def stats(self):
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0, "cancelled": 0}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        counts["capacity"] = self.maxsize
+        return counts
+
+    # ---- internals ----
+
+    def sweep(self):
+        """Drops expired results and the oldest ones past MAX_FINISHED_JOBS."""
+        now = time.time()
+        while self.finished:
+            job = next(iter(self.finished.values()))
+            if not job.expired(now) and len(self.finished) <= MAX_FINISHED_JOBS:
+                break
+            self._forget(job)
+
+    def _forget(self, job):
+        self.finished.pop(job.id, None)
+        self.jobs.pop(job.id, None)
+        if self.by_key.get(job.key) is job:
+            del self.by_key[job.key]
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished = time.time()
+        self.finished[job.id] = job
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                if job.cancel.cancelled:
+                    continue  # cancelled while queued
+
+                job.status = "running"
+                try:
+                    png = await self.render(job.spec, job.cancel)
+                    loop = asyncio.get_running_loop()
+                    if not await loop.run_in_executor(None, self.results.set, job.key, png):
+                        raise RuntimeError("Result could not be stored.")
+                    self._finish(job, "done")
+                except RenderCancelled:
+                    self._finish(job, "cancelled")
+                except asyncio.CancelledError:
+                    self._finish(job, "cancelled")
+                    raise
+                except Exception as e:
+                    job.error = str(e)
+                    self._finish(job, "failed")
+            finally:
+                self.queue.task_done()
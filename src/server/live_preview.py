@@ -0,0 +1,154 @@
+import json
+import time
+import asyncio
+from fastapi import WebSocket, WebSocketDisconnect
+
+from src.generator.render import (
+    PREVIEW_DIVISORS,
+    SpecError,
+    background_key,
+    composite_png,
+    normalize_spec,
+    overlay_key,
+    render_background,
+    render_overlay,
+)
+from src.server.admission import Overloaded
+from src.server.render_pool import run_render
+
+
+# ---------------------------------------------------------
+#  SESSION STATE
+# ---------------------------------------------------------
+
+class PreviewSession:
+    """
+    Layers from the last frame of one socket. A tweak that only touches
+    background params reuses the overlay; one that only changes the
+    scale or team rebuilds what it has to.
+    """
+
+    def __init__(self):
+        self.overlay_key = None
+        self.overlay = None
+        self.background_key = None
+        self.background = None
+
+    def frame(self, spec, divisor):
+        """(PNG bytes, names of reused layers). Runs on the render pool."""
+        scale = 1 / divisor
+        reused = []
+
+        key = (overlay_key(spec), divisor)
+        if key == self.overlay_key:
+            reused.append("overlay")
+        else:
+            self.overlay = render_overlay(spec, scale)
+            self.overlay_key = key
+
+        key = (background_key(spec), divisor)
+        if key == self.background_key:
+            reused.append("background")
+        else:
+            self.background = render_background(spec, scale)
+            self.background_key = key
+
+        return composite_png(self.background, self.overlay), reused
+
+
+# ---------------------------------------------------------
+#  SOCKET LOOP
+# ---------------------------------------------------------
+# Client → server: JSON with the /generate params, plus "scale"
+#                  (4 or 8) and an optional "seq".
+# Server → client: a JSON header {"seq", "ms", "reused", "dropped"}
+#                  followed by the PNG frame as a binary message,
+#                  or {"seq", "error"} alone (also when the preview
+#                  lane is full; the client just sends its next tweak).
+#
+# Messages that arrive while a frame renders overwrite each other;
+# only the newest is rendered next. Anything that is not a JSON object
+# gets an error reply and the socket stays open.
+
+# Stands in for a message that did not parse
+INVALID = object()
+
+
+async def serve_preview_socket(ws: WebSocket, lane):
+    """Runs one preview socket; frames render through `lane` (an Admission)."""
+    await ws.accept()
+
+    session = PreviewSession()
+    inbox = {"msg": None, "dropped": 0}
+    wake = asyncio.Event()
+
+    async def receive():
+        while True:
+            message = await ws.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            try:
+                msg = json.loads(message.get("text") or "")
+            except ValueError:
+                msg = INVALID
+
+            if inbox["msg"] is not None:
+                inbox["dropped"] += 1
+            inbox["msg"] = msg
+            wake.set()
+
+    receiver = asyncio.create_task(receive())
+
+    try:
+        while True:
+            waiter = asyncio.create_task(wake.wait())
+            done, _ = await asyncio.wait(
+                {waiter, receiver}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if receiver in done:
+                waiter.cancel()
+                receiver.result()  # re-raises the disconnect
+                return
+
+            wake.clear()
+            msg, inbox["msg"] = inbox["msg"], None
+            dropped, inbox["dropped"] = inbox["dropped"], 0
+
+            if msg is INVALID:
+                await ws.send_json({"seq": None, "error": "Messages must be JSON text."})
+                continue
+            if not isinstance(msg, dict):
+                await ws.send_json({"seq": None, "error": "Expected a JSON object."})
+                continue
+            seq = msg.get("seq")
+
+            try:
+                divisor = int(msg.pop("scale", 4))
+                if divisor not in PREVIEW_DIVISORS:
+                    raise SpecError(f"scale must be one of {PREVIEW_DIVISORS}.")
+                msg.pop("seq", None)
+                spec = normalize_spec(**msg)
+            except (SpecError, TypeError, ValueError) as e:
+                await ws.send_json({"seq": seq, "error": str(e)})
+                continue
+
+            start = time.perf_counter()
+            try:
+                async with lane.slot():
+                    png, reused = await run_render(session.frame, spec, divisor)
+            except (FileNotFoundError, Overloaded) as e:
+                await ws.send_json({"seq": seq, "error": str(e)})
+                continue
+
+            await ws.send_json({
+                "seq": seq,
+                "ms": round((time.perf_counter() - start) * 1000, 1),
+                "reused": reused,
+                "dropped": dropped,
+            })
+            await ws.send_bytes(png)
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
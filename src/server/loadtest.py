@@ -0,0 +1,510 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import asyncio
+import argparse
+import resource
+import tempfile
+from urllib.parse import urlencode, urljoin, urlsplit
+
+from src.generator.render import GRADIENT_STYLES, available_teams
+from src.server.popularity import LOG_PATH
+
+
+# ---------------------------------------------------------
+#  SETTINGS
+# ---------------------------------------------------------
+# python -m src.server.loadtest --rps 5 --duration 60        # in-process
+# python -m src.server.loadtest --url http://127.0.0.1:8000 --pid 4242
+# python -m src.server.loadtest --replay cache/access.log --rps 20
+#
+# Requests are sent open-loop: one every 1/rps seconds (or Poisson
+# arrivals with --poisson) whether or not earlier ones finished, like
+# real users. Past --max-in-flight outstanding requests new ones are
+# counted as "shed" instead of piling up in the client.
+#
+# In-process runs start the app's lifespan and go straight through
+# ASGI. They get a scratch render cache, access log and job store in a
+# temp dir (removed afterwards), so every run starts cold and leaves
+# this checkout alone; --in-place uses the checkout's own instead.
+
+RPS = 5.0
+DURATION = 30.0
+MAX_IN_FLIGHT = 64
+INTERVAL = 5.0
+
+# Redirects HTTPClient follows before giving up
+MAX_REDIRECTS = 5
+
+# Default traffic mix; --mix takes a JSON file overriding any key.
+# Weights are relative.
+DEFAULT_MIX = {
+    "types": {"pc": 55, "mobile": 38, "4k": 3, "5k": 1, "ultrawide": 1, "ipad": 1, "android": 1},
+    "modes": {"solid": 55, "gradient": 45, "stickerbomb": 0},
+    "styles": {"linear": 40, "radial": 20, "diamond": 10, "fade": 10, "split": 8, "mirror": 7, "noise": 5},
+    "angles": {"0": 50, "45": 25, "90": 15, "135": 10},
+    # Share of requests with a picked color instead of the team's own
+    "custom_color": 0.3,
+    # Team popularity follows 1 / rank^skew over a shuffled team list
+    "team_skew": 1.1,
+}
+
+# Picked colors come from a small palette, as people mostly pick the
+# same few, so custom-color requests can still hit the cache
+PALETTE = (
+    "000000", "FFFFFF", "9E1B32", "0021A5", "FF8200", "BA0C2F", "00274C", "FFCB05",
+    "461D7C", "FDD023", "154734", "CC0000", "002855", "E31837", "4B116F", "F1B82D",
+)
+
+
+# ---------------------------------------------------------
+#  REQUEST SOURCES
+# ---------------------------------------------------------
+
+def _weighted(rng, weights):
+    keys = [k for k, w in weights.items() if w > 0]
+    return rng.choices(keys, [weights[k] for k in keys])[0]
+
+
+def mix_paths(mix, teams, rng):
+    """Endless /generate paths drawn from a weighted mix."""
+    teams = list(teams)
+    rng.shuffle(teams)
+    team_weights = {t: 1 / (rank + 1) ** mix["team_skew"] for rank, t in enumerate(teams)}
+
+    while True:
+        params = {"team": _weighted(rng, team_weights), "type": _weighted(rng, mix["types"])}
+        custom = rng.random() < mix["custom_color"]
+        mode = _weighted(rng, mix["modes"])
+
+        if mode == "stickerbomb":
+            params["stickerbomb"] = 1
+        elif mode == "gradient":
+            params["gradient_enabled"] = 1
+            params["style"] = _weighted(rng, mix["styles"])
+            params["angle"] = _weighted(rng, mix["angles"])
+            if custom:
+                params["color1"], params["color2"] = rng.sample(PALETTE, 2)
+        elif custom:
+            params["color"] = rng.choice(PALETTE)
+
+        yield "/generate?" + urlencode(params)
+
+
+# Server log line ("... "GET /generate?... HTTP/1.1" 200 ...")
+HTTP_LOG_LINE = re.compile(r'"GET (/generate\?[^ "]+)')
+
+
+def spec_params(spec):
+    """/generate query parameters for a normalized render spec."""
+    params = {"team": spec["team"], "type": spec["type"]}
+    if spec["mode"] == "stickerbomb":
+        params["stickerbomb"] = 1
+    elif spec["mode"] == "gradient":
+        params["gradient_enabled"] = 1
+        for field in ("style", "color1", "color2", "angle", "noise_detail"):
+            if spec.get(field) is not None:
+                params[field] = spec[field]
+    elif spec.get("color"):
+        params["color"] = spec["color"]
+    return {k: str(v).lstrip("#") for k, v in params.items()}
+
+
+def log_paths(path):
+    """
+    /generate paths from a recorded log, in order: the app's own
+    access log ("<ts> <spec json>", see popularity.py) or any HTTP
+    server log with the request line in quotes.
+    """
+    paths = []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            match = HTTP_LOG_LINE.search(line)
+            if match:
+                paths.append(match.group(1))
+                continue
+
+            _, _, payload = line.partition(" ")
+            try:
+                spec = json.loads(payload)
+            except ValueError:
+                continue
+            if isinstance(spec, dict) and "team" in spec and "type" in spec:
+                paths.append("/generate?" + urlencode(spec_params(spec)))
+    return paths
+
+
+def replay_paths(paths):
+    while True:
+        yield from paths
+
+
+# ---------------------------------------------------------
+#  CLIENTS
+# ---------------------------------------------------------
+# Both return (status, headers, body size). Headers are lower-cased.
+
+class ASGIClient:
+    """Calls the ASGI app directly; no sockets involved."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def get(self, path):
+        url = urlsplit(path)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": url.path,
+            "raw_path": url.path.encode(),
+            "query_string": url.query.encode(),
+            "root_path": "",
+            "headers": [(b"host", b"loadtest")],
+            "client": ("127.0.0.1", 0),
+            "server": ("loadtest", 80),
+        }
+        sent = False
+        done = asyncio.Event()
+        response = {"status": 0, "headers": {}, "size": 0}
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await done.wait()  # the client never goes away mid-response
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = {
+                    k.decode("latin-1").lower(): v.decode("latin-1") for k, v in message["headers"]
+                }
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+                if not message.get("more_body"):
+                    done.set()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            done.set()
+        return response["status"], response["headers"], response["size"]
+
+
+class HTTPClient:
+    """
+    One HTTP/1.1 connection per request (Connection: close). Bodies are
+    read by Content-Length or chunked framing (to EOF otherwise), and
+    redirects to other http:// URLs are followed.
+    """
+
+    def __init__(self, base_url):
+        url = urlsplit(base_url)
+        if url.scheme != "http":
+            raise ValueError("Only http:// URLs are supported.")
+        self.host = url.hostname or "127.0.0.1"
+        self.port = url.port or 80
+        self.prefix = url.path.rstrip("/")
+
+    async def get(self, path):
+        host, port, target = self.host, self.port, self.prefix + path
+
+        for _ in range(MAX_REDIRECTS + 1):
+            status, headers, size = await self._fetch(host, port, target)
+            location = headers.get("location")
+            if status not in (301, 302, 303, 307, 308) or not location:
+                return status, headers, size
+
+            url = urlsplit(urljoin(f"http://{host}:{port}{target}", location))
+            if url.scheme != "http":
+                return status, headers, size
+            host, port = url.hostname, url.port or 80
+            target = url.path + (f"?{url.query}" if url.query else "")
+
+        return status, headers, size
+
+    async def _fetch(self, host, port, target):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(
+                f"GET {target} HTTP/1.1\r\n"
+                f"Host: {host}:{port}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1")
+            )
+            await writer.drain()
+
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+            status = int(lines[0].split()[1])
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            return status, headers, await self._read_body(reader, headers)
+        finally:
+            writer.close()
+
+    async def _read_body(self, reader, headers):
+        """Size of the (de-chunked) body."""
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            size = 0
+            while True:
+                line = await reader.readuntil(b"\r\n")
+                length = int(line.split(b";")[0].strip(), 16)
+                if length == 0:
+                    # Trailers, up to the blank line
+                    while await reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    return size
+                await reader.readexactly(length + 2)
+                size += length
+
+        if "content-length" in headers:
+            length = int(headers["content-length"])
+            await reader.readexactly(length)
+            return length
+
+        return len(await reader.read())
+
+
+# ---------------------------------------------------------
+#  MEASUREMENT
+# ---------------------------------------------------------
+
+def rss_bytes(pid=None):
+    """Resident memory of `pid` (default this process), or None."""
+    try:
+        with open(f"/proc/{pid or 'self'}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid is None:
+        # No /proc (macOS): peak RSS is the best available
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * p), len(sorted_values) - 1)]
+
+
+def summarize(samples, seconds):
+    """samples: [(finished_at, latency, status, x_cache)]"""
+    latencies = sorted(s[1] for s in samples)
+    errors = sum(1 for s in samples if s[2] == 0 or s[2] >= 400)
+    hits = sum(1 for s in samples if s[3] == "HIT")
+    statuses = {}
+    for s in samples:
+        statuses[str(s[2])] = statuses.get(str(s[2]), 0) + 1
+
+    return {
+        "requests": len(samples),
+        "throughput": round(len(samples) / seconds, 3) if seconds else 0.0,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "cache_hit_rate": round(hits / len(samples), 4) if samples else 0.0,
+        "p50": round(percentile(latencies, 0.50), 4),
+        "p95": round(percentile(latencies, 0.95), 4),
+        "p99": round(percentile(latencies, 0.99), 4),
+        "max": round(latencies[-1], 4) if latencies else 0.0,
+        "statuses": statuses,
+    }
+
+
+def _mb(nbytes):
+    return f"{nbytes / 1024 / 1024:.0f}MB" if nbytes is not None else "-"
+
+
+# ---------------------------------------------------------
+#  RUNNER
+# ---------------------------------------------------------
+
+async def run_load(client, paths, rps=RPS, duration=DURATION, max_in_flight=MAX_IN_FLIGHT,
+                   interval=INTERVAL, pid=None, poisson=False, seed=None):
+    """
+    Sends requests from the `paths` iterator at `rps` for `duration`
+    seconds, printing a line per `interval`. Returns the report dict.
+    """
+    rng = random.Random(seed)
+    samples = []
+    timeline = []
+    shed = 0
+    in_flight = set()
+    start = time.perf_counter()
+
+    async def one(path):
+        sent = time.perf_counter()
+        try:
+            status, headers, _ = await client.get(path)
+            cache = headers.get("x-cache")
+        except Exception:
+            status, cache = 0, None  # connection error
+        now = time.perf_counter()
+        samples.append((now - start, now - sent, status, cache))
+
+    async def report():
+        seen = 0
+        while True:
+            await asyncio.sleep(interval)
+            window = samples[seen:]
+            seen = len(samples)
+            stats = summarize(window, interval)
+            point = {"t": round(time.perf_counter() - start, 1), "rss": rss_bytes(pid),
+                     "in_flight": len(in_flight), **stats}
+            timeline.append(point)
+            print(f"{point['t']:>6.1f}s  {stats['throughput']:>6.2f} req/s  "
+                  f"p50 {stats['p50'] * 1000:>7.0f}ms  p95 {stats['p95'] * 1000:>7.0f}ms  "
+                  f"p99 {stats['p99'] * 1000:>7.0f}ms  err {stats['error_rate']:.1%}  "
+                  f"hit {stats['cache_hit_rate']:.0%}  in-flight {len(in_flight):>3}  "
+                  f"rss {_mb(point['rss'])}")
+
+    reporter = asyncio.create_task(report())
+    rss_start = rss_bytes(pid)
+    sent = 0
+    next_at = 0.0
+
+    try:
+        while next_at < duration:
+            delay = start + next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            path = next(paths)
+            if len(in_flight) >= max_in_flight:
+                shed += 1
+            else:
+                task = asyncio.create_task(one(path))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                sent += 1
+
+            next_at += rng.expovariate(rps) if poisson else 1 / rps
+
+        if in_flight:
+            await asyncio.gather(*in_flight)
+    finally:
+        reporter.cancel()
+
+    elapsed = time.perf_counter() - start
+    rss = [p["rss"] for p in timeline if p["rss"] is not None]
+    result = {
+        "target_rps": rps,
+        "seconds": round(elapsed, 2),
+        "sent": sent,
+        "shed": shed,
+        **summarize(samples, elapsed),
+        "rss_start": rss_start,
+        "rss_end": rss_bytes(pid),
+        "rss_max": max(rss) if rss else None,
+        "timeline": timeline,
+    }
+
+    print(f"\n{result['requests']} requests in {elapsed:.1f}s → {result['throughput']:.2f} req/s "
+          f"(target {rps}), {shed} shed")
+    print(f"latency p50 {result['p50'] * 1000:.0f}ms  p95 {result['p95'] * 1000:.0f}ms  "
+          f"p99 {result['p99'] * 1000:.0f}ms  max {result['max'] * 1000:.0f}ms")
+    print(f"errors {result['error_rate']:.1%}  cache hits {result['cache_hit_rate']:.0%}  "
+          f"statuses {result['statuses']}")
+    print(f"rss {_mb(rss_start)} → {_mb(result['rss_end'])} (max {_mb(result['rss_max'])})")
+    return result
+
+
+async def run_in_process(paths, in_place=False, **kwargs):
+    """
+    run_load() against the app in this process. Unless `in_place`, the
+    app's render cache, access log and job results are swapped for
+    scratch ones in a temp dir for the run.
+    """
+    # Imported here so --url runs don't load the app
+    import src.main as main
+    from src.server import popularity
+    from src.server.jobs import JOB_RESULT_TTL
+    from src.server.render_cache import DiskRenderCache
+
+    if in_place:
+        async with main.app.router.lifespan_context(main.app):
+            return await run_load(ASGIClient(main.app), paths, **kwargs)
+
+    scratch = tempfile.mkdtemp(prefix="cwg-loadtest-")
+    saved = (main.render_cache, main.job_queue.results, popularity.LOG_DIR, popularity.LOG_PATH)
+
+    main.render_cache = DiskRenderCache(os.path.join(scratch, "renders"))
+    main.job_queue.results = DiskRenderCache(os.path.join(scratch, "jobs"), ttl=JOB_RESULT_TTL)
+    popularity.LOG_DIR = scratch
+    popularity.LOG_PATH = os.path.join(scratch, "access.log")
+    try:
+        async with main.app.router.lifespan_context(main.app):
+            return await run_load(ASGIClient(main.app), paths, **kwargs)
+    finally:
+        main.render_cache, main.job_queue.results, popularity.LOG_DIR, popularity.LOG_PATH = saved
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive /generate with realistic traffic.")
+    parser.add_argument("--url", help="server to load, e.g. http://127.0.0.1:8000 (default: in-process)")
+    parser.add_argument("--pid", type=int, help="server process to sample RSS from (with --url)")
+    parser.add_argument("--rps", type=float, default=RPS)
+    parser.add_argument("--duration", type=float, default=DURATION, help="seconds")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT)
+    parser.add_argument("--interval", type=float, default=INTERVAL, help="seconds per report line")
+    parser.add_argument("--poisson", action="store_true", help="random arrivals instead of evenly spaced")
+    parser.add_argument("--mix", help="JSON file overriding DEFAULT_MIX keys")
+    parser.add_argument("--replay", nargs="?", const=LOG_PATH,
+                        help="replay a recorded log instead of the mix (default: the app's access log)")
+    parser.add_argument("--in-place", action="store_true",
+                        help="in-process runs use this checkout's render cache and access log")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", help="write the report here")
+    args = parser.parse_args()
+
+    if args.replay:
+        recorded = log_paths(args.replay)
+        if not recorded:
+            parser.error(f"No /generate requests found in {args.replay}")
+        paths = replay_paths(recorded)
+        print(f"Replaying {len(recorded)} requests from {args.replay}")
+    else:
+        mix = dict(DEFAULT_MIX)
+        if args.mix:
+            with open(args.mix, "r", encoding="utf-8") as f:
+                mix.update(json.load(f))
+        unknown = set(mix["styles"]) - set(GRADIENT_STYLES)
+        if unknown:
+            parser.error(f"Unknown styles in mix: {sorted(unknown)}")
+        paths = mix_paths(mix, available_teams(), random.Random(args.seed))
+
+    options = dict(
+        rps=args.rps,
+        duration=args.duration,
+        max_in_flight=args.max_in_flight,
+        interval=args.interval,
+        pid=args.pid,
+        poisson=args.poisson,
+        seed=args.seed,
+    )
+
+    if args.url:
+        report = asyncio.run(run_load(HTTPClient(args.url), paths, **options))
+    else:
+        if args.pid:
+            parser.error("--pid only applies with --url")
+        report = asyncio.run(run_in_process(paths, in_place=args.in_place, **options))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,134 @@
+# ---------------------------------------------------------
+#  HISTOGRAMS
+# ---------------------------------------------------------
+# Render timings aggregated for /metrics, in the Prometheus text
+# format (no client library needed). Observations come from the
+# event loop only, so there is no locking.
+
+# Seconds; per-stage times run from sub-millisecond grid pastes to
+# multi-second 5K gradients
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, name, doc, label, buckets=BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.label = label
+        self.buckets = buckets
+        self.series = {}  # label value -> (bucket counts, [sum, count])
+
+    def observe(self, label_value, seconds):
+        counts, totals = self.series.setdefault(label_value, ([0] * len(self.buckets), [0.0, 0]))
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                counts[i] += 1
+        totals[0] += seconds
+        totals[1] += 1
+
+    def lines(self):
+        yield f"# HELP {self.name} {self.doc}"
+        yield f"# TYPE {self.name} histogram"
+        for value in sorted(self.series):
+            counts, (total, count) = self.series[value]
+            label = f'{self.label}="{value}"'
+            for bound, n in zip(self.buckets, counts):
+                yield f'{self.name}_bucket{{{label},le="{bound}"}} {n}'
+            yield f'{self.name}_bucket{{{label},le="+Inf"}} {count}'
+            yield f"{self.name}_sum{{{label}}} {total:.6f}"
+            yield f"{self.name}_count{{{label}}} {count}"
+
+
+stage_seconds = Histogram(
+    "wallpaper_render_stage_seconds", "Time spent in each render stage.", "stage"
+)
+render_seconds = Histogram(
+    "wallpaper_render_seconds", "Wall time of renders that missed the cache.", "quality"
+)
+
+
+def record_render(timer, seconds, quality):
+    for name, spent in timer.stages.items():
+        stage_seconds.observe(name, spent)
+    render_seconds.observe(quality, seconds)
+
+
+# ---------------------------------------------------------
+#  SERVER-TIMING
+# ---------------------------------------------------------
+
+def server_timing(timer, total=None):
+    """A Server-Timing header value (milliseconds) for a StageTimer."""
+    parts = [f"{name};dur={spent * 1000:.1f}" for name, spent in timer.stages.items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+# ---------------------------------------------------------
+#  EXPOSITION
+# ---------------------------------------------------------
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _metric(name, kind, doc, samples):
+    """samples: [(labels dict or None, value)]"""
+    yield f"# HELP {name} {doc}"
+    yield f"# TYPE {name} {kind}"
+    for labels, value in samples:
+        if isinstance(value, bool):
+            value = int(value)
+        if labels:
+            label = ",".join(f'{k}="{v}"' for k, v in labels.items())
+            yield f"{name}{{{label}}} {value}"
+        else:
+            yield f"{name} {value}"
+
+
+def metrics_text(stats):
+    """
+    The /metrics page: the render histograms plus the counters and
+    gauges from /stats (`stats` is that dict).
+    """
+    admission = stats["admission"]
+    jobs = stats["jobs"]
+    buffers = stats["buffers"]
+    caches = {"render": stats["render_cache"], "preview": stats["preview_cache"]}
+
+    lines = []
+    lines += stage_seconds.lines()
+    lines += render_seconds.lines()
+
+    lines += _metric("wallpaper_cache_hits_total", "counter", "Cache hits.",
+                     [({"cache": c}, s["hits"]) for c, s in caches.items()])
+    lines += _metric("wallpaper_cache_misses_total", "counter", "Cache misses.",
+                     [({"cache": c}, s["misses"]) for c, s in caches.items()])
+    lines += _metric("wallpaper_cache_hit_ratio", "gauge", "Hits over lookups since start.",
+                     [({"cache": c}, s["hit_rate"]) for c, s in caches.items()])
+
+    lines += _metric("wallpaper_render_in_flight", "gauge", "Renders holding a slot.",
+                     [(None, admission["in_flight"])])
+    lines += _metric("wallpaper_render_slots", "gauge", "Concurrent render limit.",
+                     [(None, admission["limit"])])
+    lines += _metric("wallpaper_admission_queue_depth", "gauge", "Requests waiting for a render slot.",
+                     [(None, admission["queue_depth"])])
+    lines += _metric("wallpaper_admission_total", "counter", "Admission outcomes.",
+                     [({"outcome": k}, admission[k])
+                      for k in ("admitted", "rejected", "timed_out", "cancelled", "degraded")])
+    lines += _metric("wallpaper_brownout", "gauge", "1 while serving degraded renders.",
+                     [(None, admission["brownout"])])
+
+    lines += _metric("wallpaper_jobs", "gauge", "Render jobs by status.",
+                     [({"status": k}, jobs[k])
+                      for k in ("queued", "running", "done", "failed", "cancelled")])
+    lines += _metric("wallpaper_job_queue_capacity", "gauge", "Job queue size limit.",
+                     [(None, jobs["capacity"])])
+
+    lines += _metric("wallpaper_buffer_pool_idle_bytes", "gauge", "Pooled buffers waiting for reuse.",
+                     [(None, buffers["idle_bytes"])])
+    lines += _metric("wallpaper_render_peak_pooled_bytes_max", "gauge",
+                     "Largest per-render peak of pooled canvases and arrays (not RSS).",
+                     [(None, buffers["peak_pooled_bytes_max"])])
+
+    return "\n".join(lines) + "\n"
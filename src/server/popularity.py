@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.generator.render import spec_key
+
+
+# ---------------------------------------------------------
+#  SETTINGS
+# ---------------------------------------------------------
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+LOG_DIR = os.path.join(PROJECT_ROOT, "cache")
+LOG_PATH = os.path.join(LOG_DIR, "access.log")
+
+# The log rolls over to access.log.1 past this size, so at most
+# twice this much is ever kept or read
+LOG_MAX_BYTES = int(os.getenv("ACCESS_LOG_MAX_BYTES", 4 * 1024 * 1024))
+
+# Requests lose half their weight every this many seconds
+HALF_LIFE = 3 * 24 * 3600
+
+# How many variants to pre-render at startup (0 = off)
+WARM_TOP_N = int(os.getenv("WARM_CACHE_TOP", 25))
+
+# Seconds the warm-up waits between checks while live renders run
+WARM_BACKOFF = 0.5
+
+
+# ---------------------------------------------------------
+#  ACCESS LOG
+# ---------------------------------------------------------
+# One line per /generate request: "<unix ts> <spec json>".
+# record_access() runs on the event loop, so it only queues the line;
+# flush_access_log() writes the batch from a background task (see
+# flush_periodically). Each batch is one O_APPEND write, so batches
+# from several workers never interleave.
+
+# Seconds between flushes
+FLUSH_INTERVAL = 2.0
+
+# Lines held while a flush is slow; past this new ones are dropped
+MAX_PENDING = 10000
+
+_pending = []
+_pending_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+
+def record_access(spec):
+    line = "%d %s\n" % (
+        time.time(),
+        json.dumps(spec, sort_keys=True, separators=(",", ":")),
+    )
+
+    with _pending_lock:
+        if len(_pending) < MAX_PENDING:
+            _pending.append(line)
+
+
+def flush_access_log():
+    """Appends the queued lines to the log. Blocking: call off the loop."""
+    global _pending
+    with _pending_lock:
+        lines, _pending = _pending, []
+    if not lines:
+        return
+
+    with _log_lock:
+        try:
+            os.makedirs(LOG_DIR, exist_ok=True)
+            with open(LOG_PATH, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+                size = f.tell()
+
+            if size > LOG_MAX_BYTES:
+                os.replace(LOG_PATH, LOG_PATH + ".1")
+        except OSError:
+            pass  # the log is best-effort
+
+
+async def flush_periodically(interval=FLUSH_INTERVAL):
+    """Flushes the access log every `interval` seconds, and once more when cancelled."""
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            await loop.run_in_executor(None, flush_access_log)
+    finally:
+        flush_access_log()
+
+
+def read_access_log():
+    """(timestamp, spec) for every logged request, oldest first."""
+    for path in (LOG_PATH + ".1", LOG_PATH):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    ts, _, payload = line.partition(" ")
+                    try:
+                        yield int(ts), json.loads(payload)
+                    except ValueError:
+                        continue  # torn line
+        except FileNotFoundError:
+            continue
+
+
+# ---------------------------------------------------------
+#  POPULARITY TABLE
+# ---------------------------------------------------------
+
+def popularity_table(now=None):
+    """
+    {key: {"spec", "hits", "score"}} where score is the request count
+    with each request decayed by its age.
+    """
+    now = now or time.time()
+    table = {}
+
+    for ts, spec in read_access_log():
+        key = spec_key(spec)
+        row = table.get(key)
+        if row is None:
+            row = table[key] = {"spec": spec, "hits": 0, "score": 0.0}
+        row["hits"] += 1
+        row["score"] += 0.5 ** (max(now - ts, 0) / HALF_LIFE)
+
+    return table
+
+
+def top_specs(n=WARM_TOP_N):
+    """The n most popular specs, most popular first."""
+    rows = sorted(popularity_table().values(), key=lambda r: r["score"], reverse=True)
+    return [r["spec"] for r in rows[:n]]
+
+
+# ---------------------------------------------------------
+#  STARTUP WARM-UP
+# ---------------------------------------------------------
+
+def _lower_priority():
+    # Linux niceness is per thread, so this only slows the warm-up thread
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+
+async def warm_cache(cache, render, is_busy, n=WARM_TOP_N):
+    """
+    Re-renders the top-n specs that are missing from the cache, most
+    popular first, on one niced thread. Waits whenever is_busy()
+    says live requests are rendering, so it never competes with them.
+
+    Only one worker per host runs it; the others return straight away.
+    Without fcntl (Windows) there is no host lock and every worker warms.
+    """
+    if n <= 0:
+        return 0
+
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+
+    os.makedirs(LOG_DIR, exist_ok=True)
+    lock = open(os.path.join(LOG_DIR, "warmup.lock"), "w")
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return 0
+
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(1, thread_name_prefix="warmup", initializer=_lower_priority)
+    warmed = 0
+
+    try:
+        specs = await loop.run_in_executor(pool, top_specs, n)
+
+        for spec in specs:
+            key = spec_key(spec)
+            if await loop.run_in_executor(pool, cache.has, key):
+                continue
+
+            while is_busy():
+                await asyncio.sleep(WARM_BACKOFF)
+
+            try:
+                png = await loop.run_in_executor(pool, render, spec)
+            except Exception as e:
+                print(f"[warm-up] {key} failed: {e}")
+                continue
+
+            await loop.run_in_executor(pool, cache.set, key, png)
+            warmed += 1
+
+        print(f"[warm-up] rendered {warmed} of top {len(specs)} variants")
+        return warmed
+    finally:
+        pool.shutdown(wait=False)
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+        lock.close()
@@ -0,0 +1,444 @@
+import os
+import ssl
+import time
+import zlib
+import socket
+import struct
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+
+# ---------------------------------------------------------
+#  SETTINGS
+# ---------------------------------------------------------
+# RENDER_CACHE_URL picks the backend:
+#   (unset)               → disk cache under ./cache/renders
+#   file:///some/dir      → disk cache in that folder
+#   redis://host:6379/0   → any Redis-protocol server
+#   rediss://host:6380/0  → same over TLS
+#   off                   → no caching
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+DEFAULT_DISK_DIR = os.path.join(PROJECT_ROOT, "cache", "renders")
+
+DEFAULT_TTL = int(os.getenv("RENDER_CACHE_TTL", 7 * 24 * 3600))
+DEFAULT_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+DEFAULT_MAX_ITEM_BYTES = int(os.getenv("RENDER_CACHE_MAX_ITEM_BYTES", 16 * 1024 * 1024))
+
+
+# ---------------------------------------------------------
+#  VALUE FORMAT
+# ---------------------------------------------------------
+# magic(4) | flags(1) | expires_at(8, unix secs, 0 = never) | payload
+# flag bit 0: payload is zlib-compressed
+
+MAGIC = b"CWR1"
+HEADER = struct.Struct(">4sBQ")
+FLAG_ZLIB = 1
+
+# Only keep the compressed form when it saves at least this much
+MIN_SAVING = 0.05
+
+
+def encode_value(data, ttl=None):
+    flags = 0
+    payload = data
+
+    packed = zlib.compress(data, 1)
+    if len(packed) < len(data) * (1 - MIN_SAVING):
+        flags |= FLAG_ZLIB
+        payload = packed
+
+    expires_at = int(time.time() + ttl) if ttl else 0
+    return HEADER.pack(MAGIC, flags, expires_at) + payload
+
+
+def decode_value(blob):
+    """Payload bytes, or None if the blob is malformed or expired."""
+    if not blob or len(blob) < HEADER.size:
+        return None
+
+    magic, flags, expires_at = HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        return None
+    if expires_at and expires_at < time.time():
+        return None
+
+    payload = blob[HEADER.size:]
+    if flags & FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+    return payload
+
+
+# ---------------------------------------------------------
+#  BACKEND INTERFACE
+# ---------------------------------------------------------
+
+class RenderCache:
+    """
+    Stores rendered images by spec key. Backends never raise on
+    get/set: a broken cache just behaves like a miss.
+    """
+
+    name = "none"
+
+    def __init__(self, ttl=DEFAULT_TTL, max_item_bytes=DEFAULT_MAX_ITEM_BYTES):
+        self.ttl = ttl
+        self.max_item_bytes = max_item_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        try:
+            value = decode_value(self._get(key))
+        except Exception:
+            value = None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def has(self, key):
+        """True if a live entry exists. Does not count as a hit or miss."""
+        try:
+            return decode_value(self._get(key)) is not None
+        except Exception:
+            return False
+
+    def set(self, key, data, ttl=None):
+        if len(data) > self.max_item_bytes:
+            return False
+        try:
+            self._set(key, encode_value(data, ttl or self.ttl), ttl or self.ttl)
+            return True
+        except Exception:
+            return False
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _get(self, key):
+        return None
+
+    def _set(self, key, blob, ttl):
+        pass
+
+
+class NullRenderCache(RenderCache):
+    pass
+
+
+# ---------------------------------------------------------
+#  IN-PROCESS MEMORY
+# ---------------------------------------------------------
+
+class MemoryRenderCache(RenderCache):
+    """Small per-process LRU, capped by total bytes."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, **kwargs):
+        super().__init__(**kwargs)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _get(self, key):
+        with self.lock:
+            blob = self.items.get(key)
+            if blob is not None:
+                self.items.move_to_end(key)
+            return blob
+
+    def _set(self, key, blob, ttl):
+        with self.lock:
+            old = self.items.pop(key, None)
+            if old is not None:
+                self.total_bytes -= len(old)
+
+            self.items[key] = blob
+            self.total_bytes += len(blob)
+
+            while self.total_bytes > self.max_bytes and len(self.items) > 1:
+                _, dropped = self.items.popitem(last=False)
+                self.total_bytes -= len(dropped)
+
+    def stats(self):
+        out = super().stats()
+        out["bytes"] = self.total_bytes
+        out["max_bytes"] = self.max_bytes
+        out["items"] = len(self.items)
+        return out
+
+
+# ---------------------------------------------------------
+#  LOCAL DISK
+# ---------------------------------------------------------
+
+class DiskRenderCache(RenderCache):
+    """
+    One file per key. Expiry lives in the value header; the total size
+    is capped by evicting least-recently-used files (hits bump mtime).
+    """
+
+    name = "disk"
+
+    def __init__(self, directory=DEFAULT_DISK_DIR, max_bytes=DEFAULT_MAX_BYTES, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(size for _, _, size in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".bin")
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".bin"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield path, st.st_mtime, st.st_size
+
+    def _get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+        except FileNotFoundError:
+            return None
+
+        if decode_value(blob) is None:
+            self._remove(path)  # expired or corrupt
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return blob
+
+    def _set(self, key, blob, ttl):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+
+        with self.lock:
+            old = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp, path)
+            self.total_bytes += len(blob) - old
+
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def _remove(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with self.lock:
+            self.total_bytes -= size
+
+    def evict(self):
+        """Drops the oldest files until the cache is 90% of max_bytes."""
+        target = self.max_bytes * 0.9
+        for path, _, _ in sorted(self._entries(), key=lambda e: e[1]):
+            if self.total_bytes <= target:
+                break
+            self._remove(path)
+
+    def stats(self):
+        out = super().stats()
+        out["bytes"] = self.total_bytes
+        out["max_bytes"] = self.max_bytes
+        return out
+
+
+# ---------------------------------------------------------
+#  REDIS PROTOCOL
+# ---------------------------------------------------------
+
+class RedisUnavailable(ConnectionError):
+    pass
+
+
+class RedisRenderCache(RenderCache):
+    """
+    Minimal RESP2 client (GET / SET PX) so any Redis-compatible server,
+    including a local stand-in, can share renders between replicas.
+    Total size is capped on the server via maxmemory + an LRU policy.
+
+    A connection failure opens a circuit breaker: for the next
+    `backoff` seconds (doubling on each further failure, up to
+    `max_backoff`) calls fail at once and read as misses instead of
+    each waiting out the socket timeout.
+    """
+
+    name = "redis"
+
+    def __init__(self, url, timeout=2.0, backoff=1.0, max_backoff=30.0, **kwargs):
+        super().__init__(**kwargs)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.tls = ssl.create_default_context() if parsed.scheme == "rediss" else None
+        self.timeout = timeout
+        self.prefix = "cwg:render:"
+        self.local = threading.local()
+
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.down_until = 0.0
+
+    # ---- circuit breaker ----
+
+    def _check_circuit(self):
+        if time.monotonic() < self.down_until:
+            raise RedisUnavailable(f"{self.host}:{self.port} marked down")
+
+    def _trip(self):
+        self.failures += 1
+        delay = min(self.backoff * 2 ** (self.failures - 1), self.max_backoff)
+        self.down_until = time.monotonic() + delay
+
+    def _reset(self):
+        self.failures = 0
+        self.down_until = 0.0
+
+    # ---- connection ----
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        try:
+            if self.tls is not None:
+                sock = self.tls.wrap_socket(sock, server_hostname=self.host)
+            conn = (sock, sock.makefile("rb"))
+
+            if self.password:
+                self._send(conn, b"AUTH", self.password.encode())
+            if self.db:
+                self._send(conn, b"SELECT", str(self.db).encode())
+        except Exception:
+            sock.close()
+            raise
+
+        self.local.conn = conn
+        return conn
+
+    def _close(self):
+        conn = getattr(self.local, "conn", None)
+        self.local.conn = None
+        if conn:
+            try:
+                conn[0].close()
+            except OSError:
+                pass
+
+    def _send(self, conn, *args):
+        sock, reader = conn
+
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+
+        sock.sendall(b"".join(out))
+        return self._read_reply(reader)
+
+    def _command(self, *args):
+        self._check_circuit()
+
+        try:
+            conn = getattr(self.local, "conn", None) or self._connect()
+            reply = self._send(conn, *args)
+        except (OSError, ConnectionError):
+            self._close()
+            self._trip()
+            raise
+
+        self._reset()
+        return reply
+
+    def _read_reply(self, reader):
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed")
+
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest
+        if kind == b"-":
+            raise RuntimeError(rest.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            if count < 0:
+                return None
+            return [self._read_reply(reader) for _ in range(count)]
+        raise ConnectionError(f"Unexpected reply: {line!r}")
+
+    # ---- cache ops ----
+
+    def has(self, key):
+        try:
+            return self._command(b"EXISTS", (self.prefix + key).encode()) == 1
+        except Exception:
+            return False
+
+    def _get(self, key):
+        return self._command(b"GET", (self.prefix + key).encode())
+
+    def _set(self, key, blob, ttl):
+        self._command(
+            b"SET", (self.prefix + key).encode(), blob,
+            b"PX", str(int(ttl * 1000)).encode(),
+        )
+
+    def stats(self):
+        out = super().stats()
+        out["circuit_open"] = time.monotonic() < self.down_until
+        return out
+
+
+# ---------------------------------------------------------
+#  FACTORY
+# ---------------------------------------------------------
+
+def make_render_cache(url=None):
+    url = url if url is not None else os.getenv("RENDER_CACHE_URL", "")
+
+    if url == "off":
+        return NullRenderCache()
+    if url.startswith(("redis://", "rediss://")):
+        return RedisRenderCache(url)
+    if url.startswith("file://"):
+        return DiskRenderCache(urlparse(url).path)
+    return DiskRenderCache()
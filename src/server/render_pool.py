@@ -0,0 +1,20 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ---------------------------------------------------------
+#  RENDER POOL
+# ---------------------------------------------------------
+# Every render (single, batch, warm-up excluded) runs here instead of
+# the default AnyIO threadpool, so render concurrency is one knob.
+# Pillow and numpy release the GIL for the heavy work.
+
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", os.cpu_count() or 1))
+
+render_pool = ThreadPoolExecutor(RENDER_WORKERS, thread_name_prefix="render")
+
+
+async def run_render(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(render_pool, fn, *args)
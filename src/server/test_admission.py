@@ -0,0 +1,105 @@
+import asyncio
+
+from src.server.admission import Admission, Overloaded, BROWNOUT_QUEUE_DEPTH
+
+
+# ---------------------------------------------------------
+#  HELPERS
+# ---------------------------------------------------------
+
+async def hold(admission, bounded, entered, release):
+    async with admission.slot(bounded=bounded):
+        entered.set()
+        await release.wait()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+# ---------------------------------------------------------
+#  TESTS
+# ---------------------------------------------------------
+
+def test_unbounded_waiters_do_not_fill_the_bounded_queue():
+    async def run():
+        admission = Admission(limit=1, max_waiting=2, timeout=5)
+        release = asyncio.Event()
+
+        # One render holding the only slot, then a batch-sized backlog
+        # of job/batch items queued behind it
+        tasks = [asyncio.create_task(hold(admission, False, asyncio.Event(), release))
+                 for _ in range(8)]
+        await settle()
+        assert admission.in_flight == 1
+        assert admission.unbounded_waiting == 7
+        assert admission.waiting >= admission.max_waiting
+
+        # An interactive request still gets a place in the queue
+        entered = asyncio.Event()
+        tasks.append(asyncio.create_task(hold(admission, True, entered, release)))
+        await settle()
+        assert admission.bounded_waiting == 1
+        assert admission.rejected == 0
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert entered.is_set()
+        assert admission.waiting == 0 and admission.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_bounded_queue_is_still_capped():
+    async def run():
+        admission = Admission(limit=1, max_waiting=2, timeout=5)
+        release = asyncio.Event()
+
+        tasks = [asyncio.create_task(hold(admission, True, asyncio.Event(), release))]
+        await settle()
+        tasks += [asyncio.create_task(hold(admission, True, asyncio.Event(), release))
+                  for _ in range(2)]
+        await settle()
+        assert admission.in_flight == 1 and admission.bounded_waiting == 2
+
+        try:
+            async with admission.slot():
+                raise AssertionError("should have been rejected")
+        except Overloaded:
+            pass
+        assert admission.rejected == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+
+
+def test_batch_in_flight_does_not_brown_out():
+    async def run():
+        admission = Admission(limit=1, max_waiting=BROWNOUT_QUEUE_DEPTH, timeout=5)
+        release = asyncio.Event()
+
+        tasks = [asyncio.create_task(hold(admission, False, asyncio.Event(), release))
+                 for _ in range(2 * BROWNOUT_QUEUE_DEPTH + 1)]
+        await settle()
+        assert admission.unbounded_waiting >= BROWNOUT_QUEUE_DEPTH
+        assert not admission.brownout()
+
+        tasks += [asyncio.create_task(hold(admission, True, asyncio.Event(), release))
+                  for _ in range(BROWNOUT_QUEUE_DEPTH)]
+        await settle()
+        assert admission.brownout()
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print("[OK]", name)
@@ -0,0 +1,151 @@
+import time
+import socket
+import threading
+import socketserver
+
+from src.server.render_cache import RedisRenderCache
+
+
+# ---------------------------------------------------------
+#  FAKE REDIS
+# ---------------------------------------------------------
+# Just enough RESP2 for RedisRenderCache: GET, SET [PX ms], EXISTS,
+# AUTH, SELECT. Runs in-process on a free port.
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+
+            name = args[0].upper()
+            self.server.commands.append(name)
+            now = time.monotonic()
+
+            if name == b"GET":
+                value, expires = store.get(args[1], (None, None))
+                if value is None or (expires is not None and expires <= now):
+                    self.wfile.write(b"$-1\r\n")
+                else:
+                    self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+            elif name == b"SET":
+                expires = None
+                if len(args) == 5 and args[3].upper() == b"PX":
+                    expires = now + int(args[4]) / 1000
+                store[args[1]] = (args[2], expires)
+                self.wfile.write(b"+OK\r\n")
+            elif name == b"EXISTS":
+                self.wfile.write(b":%d\r\n" % (args[1] in store))
+            elif name in (b"AUTH", b"SELECT"):
+                self.wfile.write(b"+OK\r\n")
+            else:
+                self.wfile.write(b"-ERR unknown command\r\n")
+
+
+class FakeRedis(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeRedisHandler)
+        self.store = {}
+        self.commands = []
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return "redis://127.0.0.1:%d/1" % self.server_address[1]
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# ---------------------------------------------------------
+#  TESTS
+# ---------------------------------------------------------
+
+def test_get_set_roundtrip():
+    server = FakeRedis()
+    try:
+        cache = RedisRenderCache(server.url)
+        assert cache.get("a") is None
+        assert cache.set("a", b"png bytes" * 100)
+        assert cache.get("a") == b"png bytes" * 100
+        assert cache.has("a")
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+        assert b"SELECT" in server.commands
+    finally:
+        server.stop()
+
+
+def test_expiry():
+    server = FakeRedis()
+    try:
+        cache = RedisRenderCache(server.url)
+        cache.set("short", b"x", ttl=1)
+        assert cache.get("short") == b"x"
+        time.sleep(1.1)
+        assert cache.get("short") is None
+    finally:
+        server.stop()
+
+
+def test_down_server_is_a_fast_miss():
+    cache = RedisRenderCache(f"redis://127.0.0.1:{free_port()}", backoff=60)
+
+    assert cache.get("a") is None
+    assert not cache.set("a", b"x")
+    assert cache.stats()["circuit_open"]
+
+    # Breaker open: no connection attempts at all
+    start = time.perf_counter()
+    for _ in range(100):
+        assert cache.get("a") is None
+    assert time.perf_counter() - start < 0.5
+    assert cache.failures == 1
+
+
+def test_recovers_after_backoff():
+    server = FakeRedis()
+    try:
+        cache = RedisRenderCache(server.url, backoff=0.2)
+        cache.set("a", b"x")
+
+        cache._close()
+        cache.port = free_port()  # "outage"
+        assert cache.get("a") is None
+        assert cache.stats()["circuit_open"]
+
+        cache.port = server.server_address[1]
+        assert cache.get("a") is None  # still inside the backoff
+        time.sleep(0.25)
+        assert cache.get("a") == b"x"
+        assert not cache.stats()["circuit_open"]
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print("[OK]", name)
@@ -0,0 +1,44 @@
+import io
+import time
+import zipfile
+
+
+# ---------------------------------------------------------
+#  STREAMING ZIP
+# ---------------------------------------------------------
+# zipfile can write to an unseekable stream (it falls back to data
+# descriptors), so each entry is flushed to the client as soon as it
+# is added and nothing but the central directory stays in memory.
+
+class _ChunkWriter(io.RawIOBase):
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        out = b"".join(self.chunks)
+        self.chunks.clear()
+        return out
+
+
+async def stream_zip(entries):
+    """
+    Async generator of ZIP bytes for an async iterable of (name, data).
+    Entries are stored, not deflated: PNGs are already compressed.
+    """
+    writer = _ChunkWriter()
+    date_time = time.localtime()[:6]
+
+    with zipfile.ZipFile(writer, "w", zipfile.ZIP_STORED) as zf:
+        async for name, data in entries:
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            zf.writestr(info, data)
+            yield writer.drain()
+
+    yield writer.drain()
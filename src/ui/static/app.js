@@ -102,9 +102,12 @@ function setPreviewGradient(css) {
     colorPreview.style.background = css;
 }
 
-function refreshPreview() {
+function refreshPreview(scale = 4) {
     const type = typeSelect.value;
 
+    // CSS approximation right away, the real render once it arrives
+    requestServerPreview(scale);
+
     /* ============================
        STICKERBOMB PREVIEW
     ============================ */
@@ -202,6 +205,91 @@ function refreshPreview() {
 }
 
 
+/* ----------------------------------------------------
+   SERVER PREVIEW — same renderer as /generate, 1/4 or 1/8 size
+---------------------------------------------------- */
+
+let previewTimer = null;
+let previewController = null;
+let previewUrl = null;
+
+function showServerPreview(blob) {
+    if (previewUrl) URL.revokeObjectURL(previewUrl);
+    previewUrl = URL.createObjectURL(blob);
+
+    colorPreview.style.background = `#111 url('${previewUrl}') center/contain no-repeat`;
+    previewTeamLogo.style.display = "none";
+}
+
+// Live channel: the server keeps this session's layers and only
+// redraws what a tweak changed. Falls back to GET /preview.
+let previewSocket = null;
+let previewSocketOpening = false;
+let previewSocketBroken = false;
+let previewSeq = 0;
+
+function openPreviewSocket() {
+    if (previewSocket || previewSocketOpening || previewSocketBroken) return;
+    if (!("WebSocket" in window)) return;
+    previewSocketOpening = true;
+
+    const proto = location.protocol === "https:" ? "wss" : "ws";
+    const socket = new WebSocket(`${proto}://${location.host}/ws/preview`);
+    socket.binaryType = "blob";
+
+    socket.onopen = () => {
+        previewSocketOpening = false;
+        previewSocket = socket;
+        refreshPreview();
+    };
+    socket.onmessage = (event) => {
+        if (typeof event.data !== "string") showServerPreview(event.data);
+    };
+    socket.onclose = () => {
+        // Never connected (proxy without WebSocket support): stay on HTTP
+        if (previewSocketOpening) previewSocketBroken = true;
+        previewSocketOpening = false;
+        previewSocket = null;
+    };
+}
+
+function requestServerPreview(scale = 4) {
+    clearTimeout(previewTimer);
+    if (!selectedTeam) return;
+
+    if (previewSocket && previewSocket.readyState === WebSocket.OPEN) {
+        // The server drops superseded messages, no debounce needed
+        const message = Object.fromEntries(buildRenderParams());
+        message.scale = scale;
+        message.seq = ++previewSeq;
+        previewSocket.send(JSON.stringify(message));
+        return;
+    }
+
+    openPreviewSocket();
+
+    previewTimer = setTimeout(async () => {
+        // Only the latest preview matters
+        if (previewController) previewController.abort();
+        previewController = new AbortController();
+
+        const params = buildRenderParams();
+        params.append("scale", scale);
+
+        try {
+            const res = await fetch(`/preview?${params.toString()}`, {
+                signal: previewController.signal,
+            });
+            if (!res.ok) return;
+
+            showServerPreview(await res.blob());
+        } catch (err) {
+            if (err.name !== "AbortError") console.error(err);
+        }
+    }, 120);
+}
+
+
 /* ----------------------------------------------------
    UI DISABLES FOR STICKERBOMB MODE
 ---------------------------------------------------- */
@@ -266,10 +354,35 @@ gradientToggle.addEventListener("change", () => {
 ---------------------------------------------------- */
 
 let searchBoxRef = null;
+let spriteMap = null;
+
+// One packed sheet for every dropdown icon (falls back to single PNGs)
+const spriteReady = fetch("/dropdown/sprite.json")
+    .then(res => (res.ok ? res.json() : null))
+    .then(map => {
+        spriteMap = map;
+        if (!map) return;
+
+        const png = `/dropdown/${map.image}?v=${map.version}`;
+        const sheet = map.webp
+            ? `image-set(url("/dropdown/${map.webp}?v=${map.version}") type("image/webp"), url("${png}") type("image/png"))`
+            : `url("${png}")`;
+        document.documentElement.style.setProperty("--team-sprite", sheet);
+    })
+    .catch(() => null);
+
+function teamIcon(logo) {
+    const icon = spriteMap && spriteMap.icons[logo];
+    if (!icon) {
+        return `<img src="/dropdown/${logo}">`;
+    }
+
+    const [x, y, w, h] = icon;
+    return `<span class="team-icon" style="width:${w}px;height:${h}px;background-position:-${x}px -${y}px"></span>`;
+}
 
-fetch("/teams")
-    .then(res => res.json())
-    .then(data => {
+Promise.all([fetch("/teams").then(res => res.json()), spriteReady])
+    .then(([data]) => {
         const teams = data.teams;
 
         const searchBox = document.createElement("input");
@@ -294,7 +407,7 @@ fetch("/teams")
             item.dataset.team = team.name;
 
             item.innerHTML = `
-                <img src="/dropdown/${team.logo}">
+                ${teamIcon(team.logo)}
                 <span>${team.name}</span>
             `;
 
@@ -303,7 +416,7 @@ fetch("/teams")
                 selectedTeam = team.name;
 
                 dropdownSelected.innerHTML = `
-                    <img src="/dropdown/${team.logo}">
+                    ${teamIcon(team.logo)}
                     ${team.name}
                 `;
 
@@ -379,35 +492,29 @@ gradHex2.addEventListener("input", () => {
     refreshPreview();
 });
 
-gradientToggle.addEventListener("change", refreshPreview);
-gradientStyle.addEventListener("change", refreshPreview);
+gradientToggle.addEventListener("change", () => refreshPreview());
+gradientStyle.addEventListener("change", () => refreshPreview());
 
+// 1/8 scale while dragging, 1/4 once the slider is released
 angleSlider.addEventListener("input", () => {
     angleValue.textContent = angleSlider.value;
-    refreshPreview();
+    refreshPreview(8);
 });
 
-noiseDetail.addEventListener("input", refreshPreview);
+angleSlider.addEventListener("change", () => refreshPreview(4));
+
+noiseDetail.addEventListener("input", () => refreshPreview());
+typeSelect.addEventListener("change", () => refreshPreview());
 
 
 /* ----------------------------------------------------
    GENERATE BUTTON
 ---------------------------------------------------- */
 
-generateBtn.onclick = async () => {
-    showLoading();
-
-    const type = typeSelect.value;
-
-    if (!selectedTeam) {
-        alert("Please select a team.");
-        hideLoading();
-        return;
-    }
-
+function buildRenderParams() {
     const params = new URLSearchParams({
         team: selectedTeam,
-        type,
+        type: typeSelect.value,
     });
 
     if (stickerBombEnabled) {
@@ -428,6 +535,20 @@ generateBtn.onclick = async () => {
         }
     }
 
+    return params;
+}
+
+generateBtn.onclick = async () => {
+    showLoading();
+
+    if (!selectedTeam) {
+        alert("Please select a team.");
+        hideLoading();
+        return;
+    }
+
+    const params = buildRenderParams();
+
     try {
         const res = await fetch(`/generate?${params.toString()}`);
         const blob = await res.blob();
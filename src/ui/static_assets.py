@@ -0,0 +1,210 @@
+import os
+import re
+import gzip
+import json
+import shutil
+import hashlib
+import mimetypes
+from functools import lru_cache
+from urllib.parse import parse_qs
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip variants still work
+    brotli = None
+
+
+# ---------------------------------------------------------
+#  PATHS + SETTINGS
+# ---------------------------------------------------------
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+BUILD_DIR = os.path.join(STATIC_DIR, "build")
+MANIFEST_PATH = os.path.join(BUILD_DIR, "manifest.json")
+
+# Files that get content-hashed names
+FINGERPRINT = ("app.js", "styles.css")
+
+# Extensions worth shipping precompressed
+COMPRESSIBLE = (".js", ".css", ".json", ".svg", ".html")
+
+# name.<10 hex>.ext  →  safe to cache forever
+HASHED_NAME = re.compile(r"\.[0-9a-f]{10}\.[a-z0-9]+$")
+
+ONE_YEAR = 31536000
+ONE_DAY = 86400
+
+
+# ---------------------------------------------------------
+#  BUILD STEP (python -m src.ui.static_assets)
+# ---------------------------------------------------------
+
+def content_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:10]
+
+
+def precompress(path):
+    """Writes .gz (and .br when available) next to path."""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def build_static_assets():
+    """
+    Copies each fingerprinted asset to static/build/<name>.<hash>.<ext>,
+    writes precompressed variants and a manifest the templates read.
+    """
+    if os.path.exists(BUILD_DIR):
+        shutil.rmtree(BUILD_DIR)
+    os.makedirs(BUILD_DIR)
+
+    manifest = {}
+
+    for name in FINGERPRINT:
+        src = os.path.join(STATIC_DIR, name)
+        stem, ext = os.path.splitext(name)
+        hashed = f"{stem}.{content_hash(src)}{ext}"
+
+        dst = os.path.join(BUILD_DIR, hashed)
+        shutil.copyfile(src, dst)
+
+        if ext in COMPRESSIBLE:
+            precompress(dst)
+
+        manifest[name] = f"build/{hashed}"
+        print("[OK]", name, "->", manifest[name])
+
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return manifest
+
+
+# ---------------------------------------------------------
+#  TEMPLATE HELPER
+# ---------------------------------------------------------
+
+@lru_cache(maxsize=1)
+def load_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def asset_url(name):
+    """
+    URL for a static asset: the fingerprinted copy when the build step
+    has run, otherwise the plain file.
+    """
+    return "/static/" + load_manifest().get(name, name)
+
+
+# ---------------------------------------------------------
+#  STATIC HANDLER
+# ---------------------------------------------------------
+
+def accepted_encodings(header):
+    """
+    Content codings an Accept-Encoding header allows: the listed ones
+    (or all, for "*") minus any with q=0.
+    """
+    allowed, refused = set(), set()
+    for token in header.split(","):
+        name, *params = token.strip().split(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+
+        q = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        (allowed if q > 0 else refused).add(name)
+
+    if "*" in allowed:
+        allowed |= {"br", "gzip"}
+    return allowed - refused
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles with cache headers and precompressed variants.
+
+    Fingerprinted names (and URLs carrying a ?v= version) are sent as
+    `Cache-Control: immutable`; everything else gets `max_age`.
+    When the client accepts it, a sibling .br / .gz file is served
+    with the matching Content-Encoding.
+    """
+
+    def __init__(self, *args, max_age=ONE_DAY, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_age = max_age
+
+    def cache_control(self, full_path, scope):
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        if HASHED_NAME.search(os.path.basename(full_path)) or query.get("v"):
+            return f"public, max-age={ONE_YEAR}, immutable"
+        return f"public, max-age={self.max_age}"
+
+    def pick_encoding(self, full_path, request_headers):
+        if not full_path.endswith(COMPRESSIBLE):
+            return None, None
+
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encoding in accepted and os.path.exists(full_path + suffix):
+                return encoding, full_path + suffix
+        return None, None
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+
+        headers = {"Cache-Control": self.cache_control(full_path, scope)}
+        encoding, encoded_path = self.pick_encoding(full_path, request_headers)
+
+        if full_path.endswith(COMPRESSIBLE):
+            headers["Vary"] = "Accept-Encoding"
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            media_type, _ = mimetypes.guess_type(full_path)
+            response = FileResponse(
+                encoded_path,
+                status_code=status_code,
+                headers=headers,
+                media_type=media_type or "application/octet-stream",
+                stat_result=os.stat(encoded_path),
+            )
+        else:
+            response = FileResponse(
+                full_path,
+                status_code=status_code,
+                headers=headers,
+                stat_result=stat_result,
+            )
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+if __name__ == "__main__":
+    build_static_assets()